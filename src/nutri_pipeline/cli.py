@@ -1,9 +1,13 @@
-"""커맨드라인 진입점."""
+"""커맨드라인 진입점.
+
+시작 속도를 위해 무거운 의존성(LangGraph, LangChain, SQLAlchemy, httpx 등)은
+각 명령어 핸들러 안에서 필요할 때만 import한다. ``python -m nutri_pipeline.import_bench``로 검사한다.
+"""
 
 import argparse
+import json
 import logging
 import sys
-from .pipeline import run_full_pipeline
 
 # 로깅 설정
 logging.basicConfig(
@@ -15,18 +19,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
-    """메인 CLI 함수."""
-    parser = argparse.ArgumentParser(description="논문 영양소 추출 파이프라인")
-    parser.add_argument(
-        "command",
-        choices=["run"],
-        help="실행할 명령어",
-    )
+def _add_option_selection(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--option-ids",
         nargs="+",
-        help="처리할 특정 option_id 목록 (지정하지 않으면 모든 옵션 처리)",
+        help="처리할 옵션 목록. option_id 또는 question_id:option_id 형식 (지정하지 않으면 모든 옵션 처리)",
     )
     parser.add_argument(
         "--no-skip-processed",
@@ -34,23 +31,300 @@ def main():
         help="이미 처리된 옵션도 다시 처리",
     )
 
-    args = parser.parse_args()
 
-    if args.command == "run":
+def _print_json(data) -> None:
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    from .pipeline import run_full_pipeline
+    from .scheduler import RunBudget, parse_deadline
+
+    budget = RunBudget(
+        max_tokens=args.max_tokens,
+        max_cost=args.max_cost,
+        deadline=parse_deadline(args.deadline) if args.deadline else None,
+    )
+    run_full_pipeline(
+        option_ids=args.option_ids,
+        skip_processed=not args.no_skip_processed,
+        incremental=args.incremental,
+        budget=budget,
+        prioritize=args.prioritize,
+        profile=args.profile,
+    )
+    logger.info("프로그램 종료")
+
+
+def cmd_enqueue(args: argparse.Namespace) -> None:
+    from .db import init_db, load_processed_option_keys
+    from .survey_options import get_registry, option_key
+    from .work_queue import WorkQueue, enqueue_options
+
+    init_db()
+    registry = get_registry()
+    options = registry.resolve(args.option_ids) if args.option_ids else registry.all()
+    if args.option_ids and not options:
+        raise ValueError(f"지정한 옵션을 하나도 찾을 수 없습니다: {', '.join(args.option_ids)}")
+    if not args.no_skip_processed:
+        processed = set(load_processed_option_keys())
+        options = [opt for opt in options if option_key(opt) not in processed]
+    queue = WorkQueue()
+    enqueue_options(options, queue)
+    logger.info(f"큐 상태: {queue.stats()}")
+
+
+def cmd_worker(args: argparse.Namespace) -> None:
+    from .db import init_db
+    from .work_queue import Worker
+
+    init_db()
+    worker = Worker(concurrency=args.concurrency, kinds=args.kinds, exit_when_empty=args.exit_when_empty)
+    worker.run()
+    logger.info(f"큐 상태: {worker.queue.stats()}")
+
+
+def cmd_stub_server(args: argparse.Namespace) -> None:
+    from .config import STUB_LATENCY_MS, STUB_ERROR_RATE
+    from .llm_backend import serve_stub
+
+    server = serve_stub(
+        host=args.host,
+        port=args.port,
+        latency_ms=STUB_LATENCY_MS if args.latency_ms is None else args.latency_ms,
+        error_rate=STUB_ERROR_RATE if args.error_rate is None else args.error_rate,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("stub 서버 종료")
+    finally:
+        server.server_close()
+
+
+def _format_rate(rate) -> str:
+    return "-" if rate is None else f"{rate:.1%}"
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    from .stats import collect_status
+
+    status = collect_status()
+    if args.json:
+        _print_json(status)
+        return
+
+    print(f"DB: {status['db']}" + ("" if status["db_exists"] else " (없음)"))
+    if status.get("summary_missing"):
+        print("  요약 테이블 없음: `stats --rebuild`로 생성하세요")
+    for table, count in status.get("counts", {}).items():
+        print(f"  {table:<16} {count:>10,}")
+    if "counts" in status:
+        print(f"  마지막 실행      {status['last_run_at'] or '-'}")
+        print(f"  임베딩 캐시 적중률 {_format_rate(status['embedding_cache_hit_rate'])}")
+        print(f"  초록 토큰        {status['prompt_tokens']:,} (압축으로 {status['prompt_tokens_saved']:,} 절약)")
+    for kind, counts in status.get("queue", {}).items():
+        print(f"큐 {kind:<16} " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    for cache in status["embedding_cache"]:
+        print(f"임베딩 캐시 {cache['model']}: {cache['rows']:,}개 ({cache['size_bytes'] / 1e6:.1f}MB)")
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    from .stats import collect_option_stats, rebuild_option_stats
+
+    if args.rebuild:
+        logger.info(f"옵션 요약 통계 재집계: {rebuild_option_stats()}개 옵션")
+    rows = collect_option_stats()
+    if args.json:
+        _print_json(rows)
+        return
+
+    print(
+        f"{'question_id':<18} {'option_id':<20} {'papers':>7} {'nutrients':>10} "
+        f"{'no_abstract':>12} {'last_run':>20} {'seconds':>8} {'cache_hit':>10} {'tokens_saved':>13}"
+    )
+    for row in rows:
+        seconds = "-" if row["last_run_seconds"] is None else f"{row['last_run_seconds']:.1f}"
+        print(
+            f"{row['question_id']:<18} {row['option_id']:<20} {row['papers']:>7} "
+            f"{row['nutrients']:>10} {row['missing_abstract_ratio']:>12.1%} "
+            f"{row['last_run_at'] or '-':>20} {seconds:>8} {_format_rate(row['cache_hit_rate']):>10} "
+            f"{row['prompt_tokens_saved']:>13,}"
+        )
+
+
+def cmd_migrate(args: argparse.Namespace) -> None:
+    from .db import get_engine
+    from .migrations import HEAD_VERSION, SchemaDriftError, check_schema, current_version, upgrade
+
+    engine = get_engine()
+    if args.check:
         try:
-            run_full_pipeline(
-                option_ids=args.option_ids,
-                skip_processed=not args.no_skip_processed,
-            )
-            logger.info("프로그램 종료")
-        except KeyboardInterrupt:
-            logger.info("사용자에 의해 중단됨")
-            sys.exit(1)
-        except Exception as e:
-            logger.error(f"오류 발생: {e}", exc_info=True)
+            check_schema(engine)
+        except SchemaDriftError as e:
+            print(f"스키마 불일치: {e}")
             sys.exit(1)
+        print(f"스키마 최신 (버전 {HEAD_VERSION})")
+        return
+
+    applied = upgrade(engine)
+    check_schema(engine)
+    with engine.connect() as conn:
+        version = current_version(conn)
+    logger.info(f"마이그레이션 완료: 적용 {applied or '없음'}, 현재 버전 {version}")
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    from .export import export_tables
+
+    counts = export_tables(
+        args.out_dir,
+        tables=args.tables,
+        fmt=args.format,
+        partition_by=args.partition_by,
+        min_confidence=args.min_confidence,
+    )
+    logger.info(f"내보내기 완료: {counts}")
+
+
+def cmd_replay(args: argparse.Namespace) -> None:
+    from .db import init_db
+    from .journal import JournalCommitter
+
+    init_db()
+    count = JournalCommitter().drain(final=True, from_start=args.all)
+    logger.info(f"저널 반영 완료: 옵션 {count}개" + (" (저널 처음부터)" if args.all else ""))
+
+
+def cmd_cache(args: argparse.Namespace) -> None:
+    from .stats import clear_embedding_cache, collect_cache_info
+
+    if args.clear:
+        logger.info(f"임베딩 캐시 {clear_embedding_cache()}개 삭제")
+        return
+    caches = collect_cache_info()
+    if args.json:
+        _print_json(caches)
+        return
+    if not caches:
+        print("임베딩 캐시 없음")
+    for cache in caches:
+        print(f"{cache['model']}: {cache['rows']:,}개 ({cache['size_bytes'] / 1e6:.1f}MB)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """CLI 인자 파서 생성."""
+    parser = argparse.ArgumentParser(description="논문 영양소 추출 파이프라인")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    run = subparsers.add_parser("run", help="파이프라인 실행")
+    _add_option_selection(run)
+    run.add_argument(
+        "--incremental",
+        action="store_true",
+        help="처리된 옵션도 다시 검색하되 마지막 갱신 이후의 새 논문만 추출 (야간 갱신용)",
+    )
+    run.add_argument("--max-tokens", type=int, default=None, help="추출 토큰 한도 (프롬프트 입력+응답 출력)")
+    run.add_argument("--max-cost", type=float, default=None, help="추정 비용 한도 (USD, LLM_COST_PER_1K_TOKENS/LLM_OUTPUT_COST_PER_1K_TOKENS 기준)")
+    run.add_argument("--deadline", default=None, help="마감: 기간(90m, 2h) 또는 시각(2026-10-20T06:00)")
+    run.add_argument(
+        "--prioritize",
+        action="store_true",
+        help="기대 가치 순으로 옵션/논문 처리 (한도를 주면 자동으로 켜짐)",
+    )
+    run.add_argument(
+        "--profile",
+        action="store_true",
+        help="노드별 샘플링 프로파일/flamegraph/메모리 할당 리포트를 PROFILE_DIR에 기록",
+    )
+    run.set_defaults(func=cmd_run)
+
+    enqueue = subparsers.add_parser("enqueue", help="옵션별 검색 작업을 큐에 등록")
+    _add_option_selection(enqueue)
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    worker = subparsers.add_parser("worker", help="큐 작업 처리 워커 실행")
+    worker.add_argument("--concurrency", type=int, default=4, help="동시 처리 작업 수")
+    worker.add_argument(
+        "--kinds",
+        nargs="+",
+        choices=["search_option", "extract_paper", "persist_batch"],
+        help="처리할 작업 종류 (기본값: 전체)",
+    )
+    worker.add_argument("--exit-when-empty", action="store_true", help="큐가 비면 종료")
+    worker.set_defaults(func=cmd_worker)
+
+    stub = subparsers.add_parser("stub-server", help="OpenAI 호환 stub LLM 서버 실행")
+    stub.add_argument("--host", default="127.0.0.1", help="바인드 주소")
+    stub.add_argument("--port", type=int, default=8000, help="포트")
+    stub.add_argument("--latency-ms", type=float, default=None, help="평균 지연 (ms)")
+    stub.add_argument("--error-rate", type=float, default=None, help="오류율 (0~1)")
+    stub.set_defaults(func=cmd_stub_server)
+
+    status = subparsers.add_parser("status", help="DB/큐/캐시 상태 요약")
+    status.add_argument("--json", action="store_true", help="JSON으로 출력")
+    status.set_defaults(func=cmd_status)
+
+    stats = subparsers.add_parser("stats", help="옵션별 논문/영양소 통계")
+    stats.add_argument("--json", action="store_true", help="JSON으로 출력")
+    stats.add_argument("--rebuild", action="store_true", help="저장된 데이터로 요약 테이블 재집계 (기존 DB용)")
+    stats.set_defaults(func=cmd_stats)
+
+    migrate = subparsers.add_parser("migrate", help="DB 스키마 마이그레이션 적용")
+    migrate.add_argument("--check", action="store_true", help="적용하지 않고 스키마 일치 여부만 확인 (불일치 시 종료 코드 1)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    export = subparsers.add_parser("export", help="DB 테이블 내보내기")
+    export.add_argument("--out-dir", default="export", help="출력 디렉토리")
+    export.add_argument(
+        "--tables",
+        nargs="+",
+        choices=["survey_options", "papers", "nutrients"],
+        help="내보낼 테이블 (기본값: 전체)",
+    )
+    export.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv", help="출력 형식")
+    export.add_argument(
+        "--partition-by",
+        choices=["question_id"],
+        default=None,
+        help="컬럼 값별 디렉토리로 나눠 쓰기 (hive 형식)",
+    )
+    export.add_argument(
+        "--min-confidence",
+        type=float,
+        default=None,
+        help="nutrients는 추출 신뢰도가 이 값 이상인 행만 (신뢰도 없는 행 제외)",
+    )
+    export.set_defaults(func=cmd_export)
+
+    replay = subparsers.add_parser("replay", help="추출 저널을 DB에 반영 (저장 실패 복구, DB 재구성)")
+    replay.add_argument(
+        "--all",
+        action="store_true",
+        help="반영 위치(checkpoint)를 무시하고 저널 전체를 다시 반영 (빈 DB 재구성용)",
+    )
+    replay.set_defaults(func=cmd_replay)
+
+    cache = subparsers.add_parser("cache", help="임베딩 캐시 조회/삭제")
+    cache.add_argument("--clear", action="store_true", help="캐시 삭제")
+    cache.add_argument("--json", action="store_true", help="JSON으로 출력")
+    cache.set_defaults(func=cmd_cache)
+
+    return parser
+
+
+def main():
+    """메인 CLI 함수."""
+    args = build_parser().parse_args()
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        logger.info("사용자에 의해 중단됨")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"오류 발생: {e}", exc_info=True)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,184 @@
+"""관측된 지연 시간/오류에 따라 동시 요청 수를 조절하는 AIMD 제한기."""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """과부하 신호(429/5xx/타임아웃)인지 판별. openai/httpx/stub 오류를 모두 처리한다."""
+    if isinstance(error, TimeoutError):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status in OVERLOAD_STATUS_CODES:
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "RateLimit" in name
+
+
+@dataclass
+class LimitDecision:
+    """한도 변경 기록."""
+
+    at: float
+    old_limit: int
+    new_limit: int
+    reason: str
+
+
+class AdaptiveLimiter:
+    """AIMD(additive increase, multiplicative decrease) 동시성 제한기.
+
+    - ``window``개 요청이 완료될 때마다 p95 지연과 오류율을 평가해, 건강하고 한도를
+      실제로 채우고 있었다면 한도를 1 올린다.
+    - 429/5xx/타임아웃이 발생하거나 p95가 목표를 넘으면 한도에 ``backoff``를 곱한다.
+      같은 과부하 구간에서 연달아 줄이지 않도록 ``cooldown`` 초 동안은 한 번만 줄인다.
+
+    ``latency_target_ms``가 0이면 지금까지 관측된 가장 낮은 창(window) p95의
+    ``latency_tolerance``배를 목표로 사용한다.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        window: int = 20,
+        latency_target_ms: float = 0.0,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.05,
+        backoff: float = 0.5,
+        cooldown: float = 5.0,
+        name: str = "llm",
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.window = window
+        self.latency_target_ms = latency_target_ms
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._errors: Deque[bool] = deque(maxlen=window)
+        self._since_eval = 0
+        self._baseline_ms: Optional[float] = None
+        self._last_decrease = 0.0
+        self.decisions: List[LimitDecision] = []
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def fixed(self) -> bool:
+        return self.min_limit == self.max_limit
+
+    def acquire(self) -> None:
+        """한도 내에서 슬롯을 얻을 때까지 대기."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """슬롯 반환 및 결과 기록 (latency는 초 단위)."""
+        with self._cond:
+            self._in_flight -= 1
+            overload = error is not None and is_overload_error(error)
+            self.completed += 1
+            self.failed += error is not None
+            self._latencies.append(latency * 1000.0)
+            self._errors.append(error is not None)
+            self._since_eval += 1
+
+            if not self.fixed:
+                if overload:
+                    self._decrease(f"과부하 오류 ({type(error).__name__})")
+                elif self._since_eval >= self.window:
+                    self._evaluate()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """``with limiter.slot(): ...`` 형태로 슬롯 획득/지연 기록."""
+        self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.perf_counter() - start, e)
+            raise
+        self.release(time.perf_counter() - start)
+
+    def _percentile(self, q: float) -> float:
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def _evaluate(self) -> None:
+        """창 단위 평가 (락 보유 상태에서 호출)."""
+        self._since_eval = 0
+        p95 = self._percentile(0.95)
+        error_rate = sum(self._errors) / len(self._errors)
+        if self._baseline_ms is None or p95 < self._baseline_ms:
+            self._baseline_ms = p95
+        target = self.latency_target_ms or self._baseline_ms * self.latency_tolerance
+
+        if p95 > target:
+            self._decrease(f"p95 {p95:.0f}ms > 목표 {target:.0f}ms")
+        elif error_rate > self.max_error_rate:
+            self._decrease(f"오류율 {error_rate:.1%} > {self.max_error_rate:.1%}")
+        elif self._peak_in_flight >= self.limit and self._limit < self.max_limit:
+            # 한도를 실제로 채웠을 때만 늘림 (수요가 없으면 한도를 키울 근거가 없음)
+            self._set_limit(self._limit + 1, f"정상 (p95 {p95:.0f}ms, 오류율 {error_rate:.1%})")
+        self._peak_in_flight = self._in_flight
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._set_limit(max(self.min_limit, self._limit * self.backoff), reason)
+        self._latencies.clear()
+        self._errors.clear()
+        self._since_eval = 0
+
+    def _set_limit(self, new_limit: float, reason: str) -> None:
+        old = self.limit
+        self._limit = min(max(new_limit, self.min_limit), self.max_limit)
+        if self.limit != old:
+            self.decisions.append(LimitDecision(time.time(), old, self.limit, reason))
+            logger.info(f"[{self.name}] 동시성 한도 {old} → {self.limit}: {reason}")
+
+    def summary(self) -> str:
+        """실행 로그용 요약."""
+        increases = sum(1 for d in self.decisions if d.new_limit > d.old_limit)
+        decreases = len(self.decisions) - increases
+        return (
+            f"[{self.name}] 동시성 한도 {self.limit} (범위 {self.min_limit}~{self.max_limit}, "
+            f"증가 {increases}회, 감소 {decreases}회, 완료 {self.completed}건, 실패 {self.failed}건)"
+        )
@@ -0,0 +1,105 @@
+"""CPU 바운드 후처리(JSON 파싱, 정규화, 해싱, 메타데이터 projection)용 프로세스 풀.
+
+``CPU_POOL_WORKERS``가 0이면(기본값) 풀을 만들지 않고 호출한 스레드에서 그대로 실행한다.
+작은 입력은 프로세스 간 직렬화 비용이 더 크므로 호출자가 기준을 정하며, 풀을 쓰는 곳은 세 군데다.
+기본 기준은 기본 설정의 옵션 1개 분량(논문 10건, 재순위화 후보 50개)이 넘도록 잡았다.
+
+- CrossRef 검색 응답 파싱: 응답이 ``CPU_POOL_MIN_BYTES`` 이상일 때 ``run_cpu``
+- 검색 결과 병합/중복 제거(DOI 정규화, 논문 키): 후보가 ``CPU_POOL_MIN_PAPERS``개 이상일 때 옵션 단위로 ``run_cpu``
+- 해시 임베딩(재순위화): 텍스트가 ``CPU_POOL_MIN_TEXTS``개 이상일 때 ``SharedArray``로 chunk 분배
+
+결과는 가능한 한 작게 projection한 레코드로 돌려받고(pickle), 큰 숫자 배열은
+``SharedArray``(공유 메모리)로 복사 없이 주고받는다.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional, Tuple
+
+from .config import CPU_POOL_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """공유 프로세스 풀 반환 (비활성화 시 None)."""
+    global _pool
+    if CPU_POOL_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # fork는 httpx/스레드 풀 상태까지 복제하므로 spawn 사용
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=context)
+            atexit.register(shutdown_cpu_pool)
+            logger.info(f"CPU 프로세스 풀 시작: {CPU_POOL_WORKERS}개 워커")
+    return _pool
+
+
+def shutdown_cpu_pool() -> None:
+    """프로세스 풀 종료."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def run_cpu(fn: Callable, *args: Any, size: int = 0, min_size: int = 0) -> Any:
+    """fn(*args)를 프로세스 풀에서 실행. 풀이 없거나 size < min_size면 현재 스레드에서 실행.
+
+    fn과 인자는 pickle 가능해야 한다 (모듈 최상위 함수).
+    """
+    pool = get_cpu_pool()
+    if pool is None or size < min_size:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+class SharedArray:
+    """공유 메모리 위의 numpy 배열. ``spec``만 넘기면 다른 프로세스가 복사 없이 붙을 수 있다.
+
+    생성한 쪽에서 ``unlink()``로 해제해야 한다.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, ...], dtype: str, owner: bool):
+        import numpy as np
+
+        self._shm = shm
+        self._owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], dtype: str = "float32") -> "SharedArray":
+        import numpy as np
+
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, owner=True)
+        shared.array.fill(0)
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> "SharedArray":
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        return (self._shm.name, self.array.shape, self.array.dtype.str)
+
+    def close(self) -> None:
+        if self.array is not None:
+            self.array = None  # 버퍼 참조를 먼저 놓아야 close 가능
+            self._shm.close()
+
+    def unlink(self) -> None:
+        self.close()
+        if self._owner:
+            self._shm.unlink()
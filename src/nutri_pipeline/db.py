@@ -1,31 +1,99 @@
-"""DB 세션 생성 및 초기화 유틸리티."""
+"""DB 세션 생성 및 초기화 유틸리티.
 
-from sqlalchemy import create_engine
+``DATABASE_URL``로 SQLite 파일(기본값) 또는 Postgres를 사용한다. upsert는 두 DB 모두
+``INSERT ... ON CONFLICT``로 처리하고, Postgres에서는 영양소 대량 저장에 COPY를 사용한다.
+"""
+
+import csv
+import io
+import json
+from sqlalchemy import case, create_engine, delete, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
 import logging
 
-from .config import DB_PATH
-from .models import Base
+from .config import INCREMENTAL_SEEN_KEYS_LIMIT, DATABASE_URL, DB_AUTO_MIGRATE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
+from .models import SurveyOption, Paper, Nutrient, OptionStat, OptionWatermark
 
 logger = logging.getLogger(__name__)
 
-# SQLite 엔진 생성
-engine = create_engine(
-    f"sqlite:///{DB_PATH}",
-    connect_args={"check_same_thread": False},  # SQLite는 단일 스레드 기본
-    echo=False,
-)
+_engine = None
+_session_factory = None
+
+
+def database_path(url: str = DATABASE_URL) -> Optional[Path]:
+    """SQLite 파일 DB이면 파일 경로, 아니면(Postgres, 메모리 DB) None."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return Path(parsed.database)
+
+
+def database_label(url: str = DATABASE_URL) -> str:
+    """로그/상태 표시용 DB 이름 (비밀번호 가림)."""
+    return make_url(url).render_as_string(hide_password=True)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL: 읽기와 쓰기가 서로 막지 않음 / busy_timeout: 여러 워커의 쓰기 잠금 대기
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
 
-# 세션 팩토리
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_engine():
+    """SQLAlchemy 엔진 반환 (첫 사용 시 생성)."""
+    global _engine, _session_factory
+    if _engine is None:
+        url = make_url(DATABASE_URL)
+        kwargs = {"echo": False, "pool_pre_ping": True}
+        path = database_path(DATABASE_URL)
+        if url.get_backend_name() == "sqlite":
+            kwargs["connect_args"] = {"check_same_thread": False}  # 풀의 연결을 여러 스레드가 사용
+        if url.get_backend_name() != "sqlite" or path is not None:
+            # QueuePool 설정 (메모리 SQLite는 연결마다 DB가 달라 기본 풀 유지)
+            kwargs.update(
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+            )
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        _engine = create_engine(url, **kwargs)
+        if path is not None:
+            event.listen(_engine, "connect", _set_sqlite_pragmas)
+        # 세션 팩토리
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def SessionLocal() -> Session:
+    """새 세션 생성."""
+    get_engine()
+    return _session_factory()
 
 
 def init_db() -> None:
-    """데이터베이스 테이블 생성."""
-    logger.info(f"데이터베이스 초기화: {DB_PATH}")
-    Base.metadata.create_all(bind=engine)
-    logger.info("테이블 생성 완료")
+    """데이터베이스 스키마 준비: 마이그레이션 적용 후 모델과 일치하는지 확인.
+
+    DB_AUTO_MIGRATE가 꺼져 있으면 확인만 하고, 다르면 SchemaDriftError로 바로 중단한다.
+    """
+    from .migrations import check_schema, upgrade
+
+    logger.info(f"데이터베이스 초기화: {database_label()}")
+    engine = get_engine()
+    if DB_AUTO_MIGRATE:
+        upgrade(engine)
+    check_schema(engine)
+    logger.info("스키마 확인 완료")
 
 
 @contextmanager
@@ -46,3 +114,301 @@ def get_db() -> Session:
     """DB 세션 반환 (컨텍스트 매니저 없이 사용 시)."""
     return SessionLocal()
 
+
+
+def load_processed_option_keys() -> list:
+    """처리 완료된 옵션 키("question_id:option_id") 목록. 일부만 저장된 옵션은 포함하지 않는다."""
+    with get_db_session() as session:
+        rows = (
+            session.query(SurveyOption.question_id, SurveyOption.option_id)
+            .filter(SurveyOption.completed_at.isnot(None))
+            .all()
+        )
+        return [f"{question_id}:{option_id}" for question_id, option_id in rows]
+
+
+def load_option_summaries(session: Session) -> Dict[tuple, dict]:
+    """옵션 요약 통계 {(question_id, option_id): {papers, missing_abstracts, last_run_at}} (우선순위 계산용)."""
+    rows = session.execute(
+        select(
+            OptionStat.question_id,
+            OptionStat.option_id,
+            OptionStat.papers,
+            OptionStat.missing_abstracts,
+            OptionStat.last_run_at,
+        )
+    ).all()
+    return {
+        (row.question_id, row.option_id): {
+            "papers": row.papers,
+            "missing_abstracts": row.missing_abstracts,
+            "last_run_at": row.last_run_at,
+        }
+        for row in rows
+    }
+
+
+def load_watermark(session: Session, question_id: str, option_id: str) -> Optional[OptionWatermark]:
+    """옵션의 증분 갱신 기준점 (한 번도 갱신하지 않았으면 None)."""
+    return session.get(OptionWatermark, (question_id, option_id))
+
+
+def load_known_paper_keys(session: Session, question_id: str, option_id: str) -> set:
+    """옵션에 대해 이미 본 논문 키: 기준점의 최근 키 + DB에 저장된 옵션 논문."""
+    from .paper_search import PaperCandidate, paper_key
+
+    watermark = load_watermark(session, question_id, option_id)
+    keys = set(watermark.seen_keys or []) if watermark else set()
+    rows = session.execute(
+        select(Paper.title, Paper.doi).where(Paper.question_id == question_id, Paper.option_id == option_id)
+    )
+    keys.update(paper_key(PaperCandidate(title=title, url="", doi=doi)) for title, doi in rows)
+    return keys
+
+
+def update_watermark(
+    session: Session,
+    question_id: str,
+    option_id: str,
+    refreshed_at: datetime,
+    new_keys: List[str],
+    years: List[Optional[int]],
+) -> None:
+    """증분 갱신 기준점 갱신. 새 키를 앞에 붙이고 INCREMENTAL_SEEN_KEYS_LIMIT개까지만 유지."""
+    watermark = load_watermark(session, question_id, option_id)
+    if watermark is None:
+        watermark = OptionWatermark(question_id=question_id, option_id=option_id, seen_keys=[])
+        session.add(watermark)
+    seen = list(dict.fromkeys([*new_keys, *(watermark.seen_keys or [])]))
+    watermark.seen_keys = seen[:INCREMENTAL_SEEN_KEYS_LIMIT]
+    watermark.refreshed_at = refreshed_at
+    known_years = [y for y in years if y] + ([watermark.max_year] if watermark.max_year else [])
+    watermark.max_year = max(known_years) if known_years else None
+
+
+def _upsert(session: Session, model):
+    """현재 DB 방언의 ``INSERT ... ON CONFLICT``용 insert 문."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"지원하지 않는 DB: {dialect} (sqlite, postgresql만 지원)")
+
+
+def refresh_option_stats(
+    session: Session,
+    question_id: str,
+    option_id: str,
+    run_seconds: Optional[float] = None,
+    cache_hits: Optional[int] = None,
+    cache_misses: Optional[int] = None,
+    prompt_tokens: Optional[int] = None,
+    prompt_tokens_saved: Optional[int] = None,
+) -> None:
+    """옵션 1개의 요약 통계를 다시 집계해 option_stats에 반영.
+
+    (question_id, option_id) 인덱스와 nutrients covering index만 타므로 옵션 크기에 비례한다.
+    실행 시간/캐시 값이 None이면 기존 값을 유지한다.
+    """
+    session.flush()
+    papers, missing_abstracts = session.execute(
+        select(
+            func.count(Paper.id),
+            func.coalesce(func.sum(case((Paper.abstract.is_(None), 1), else_=0)), 0),
+        ).where(Paper.question_id == question_id, Paper.option_id == option_id)
+    ).one()
+    type_counts = dict(
+        session.execute(
+            select(Nutrient.type, func.count())
+            .join(Paper, Paper.id == Nutrient.paper_id)
+            .where(Paper.question_id == question_id, Paper.option_id == option_id)
+            .group_by(Nutrient.type)
+        ).all()
+    )
+
+    values = {
+        "papers": papers,
+        "missing_abstracts": missing_abstracts,
+        "good_nutrients": type_counts.get("good", 0),
+        "bad_nutrients": type_counts.get("bad", 0),
+        "nutrients": sum(type_counts.values()),
+    }
+    if run_seconds is not None:
+        values["last_run_at"] = datetime.now()
+        values["last_run_seconds"] = run_seconds
+    if cache_hits is not None:
+        values["cache_hits"] = cache_hits
+    if cache_misses is not None:
+        values["cache_misses"] = cache_misses
+    if prompt_tokens is not None:
+        values["prompt_tokens"] = prompt_tokens
+    if prompt_tokens_saved is not None:
+        values["prompt_tokens_saved"] = prompt_tokens_saved
+
+    stmt = _upsert(session, OptionStat).values(
+        question_id=question_id,
+        option_id=option_id,
+        **{"cache_hits": 0, "cache_misses": 0, "prompt_tokens": 0, "prompt_tokens_saved": 0, **values},
+    )
+    session.execute(stmt.on_conflict_do_update(index_elements=["question_id", "option_id"], set_=values))
+
+
+def rebuild_option_stats(session: Session) -> int:
+    """저장된 모든 옵션의 요약 통계를 다시 집계 (기존 DB 마이그레이션용). 옵션 수 반환."""
+    keys = session.execute(select(Paper.question_id, Paper.option_id).distinct()).all()
+    for question_id, option_id in keys:
+        refresh_option_stats(session, question_id, option_id)
+    return len(keys)
+
+
+NUTRIENT_DETAIL_COLUMNS = ("confidence", "span_start", "span_end", "quantity", "unit")
+_NUTRIENT_COPY_COLUMNS = ("paper_id", "name", "type", "extra_info", *NUTRIENT_DETAIL_COLUMNS)
+
+
+def _copy_nutrients(session: Session, rows: List[dict]) -> None:
+    """Postgres COPY로 영양소 대량 저장 (세션과 같은 트랜잭션). psycopg 3과 psycopg2 지원."""
+    sql = f"COPY {Nutrient.__tablename__} ({', '.join(_NUTRIENT_COPY_COLUMNS)}) FROM STDIN"
+    values = [
+        [json.dumps(row[c]) if c == "extra_info" and row[c] is not None else row[c] for c in _NUTRIENT_COPY_COLUMNS]
+        for row in rows
+    ]
+    dbapi_connection = session.connection().connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(sql) as copy:
+                for value in values:
+                    copy.write_row(value)
+        else:  # psycopg2: CSV 형식에서는 따옴표 없는 빈 값이 NULL
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(values)
+            buffer.seek(0)
+            cursor.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert_nutrients(session: Session, rows: List[dict]) -> None:
+    """영양소 행 대량 저장. Postgres는 COPY, 그 외는 executemany INSERT."""
+    if not rows:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        _copy_nutrients(session, rows)
+    else:
+        session.execute(insert(Nutrient), rows)
+
+
+def _upsert_paper(session: Session, option: dict, paper_candidate) -> tuple:
+    """논문 upsert (DOI 기준, 기존 논문은 유지). (id, question_id, option_id) 반환.
+
+    DOI가 없으면 같은 옵션의 같은 제목 논문을 기존 논문으로 본다 (저널 재반영, 재실행 시 중복 방지).
+    """
+    values = dict(
+        question_id=option["question_id"],
+        option_id=option["option_id"],
+        title=paper_candidate.title,
+        url=paper_candidate.url,
+        source=paper_candidate.source,
+        doi=paper_candidate.doi,
+        abstract=paper_candidate.abstract,
+        raw_metadata=paper_candidate.raw_metadata,
+    )
+    returning = (Paper.id, Paper.question_id, Paper.option_id)
+    if not paper_candidate.doi:
+        row = session.execute(
+            select(*returning).where(
+                Paper.question_id == option["question_id"],
+                Paper.option_id == option["option_id"],
+                Paper.doi.is_(None),
+                Paper.title == paper_candidate.title,
+            )
+        ).first()
+        if row is None:
+            row = session.execute(insert(Paper).values(**values).returning(*returning)).one()
+        return tuple(row)
+
+    stmt = _upsert(session, Paper).values(**values).on_conflict_do_nothing(index_elements=["doi"])
+    row = session.execute(stmt.returning(*returning)).first()
+    if row is None:  # 이미 있는 DOI
+        row = session.execute(select(*returning).where(Paper.doi == paper_candidate.doi)).one()
+    return tuple(row)
+
+
+def save_extracted_data(
+    session: Session,
+    option: dict,
+    extracted_data: list,
+    run_seconds: Optional[float] = None,
+    cache_hits: Optional[int] = None,
+    cache_misses: Optional[int] = None,
+    prompt_tokens: Optional[int] = None,
+    prompt_tokens_saved: Optional[int] = None,
+    completed: bool = True,
+) -> int:
+    """옵션 1개의 추출 결과(paper + nutrients 목록)를 세션에 저장하고 저장한 논문 수를 반환.
+
+    옵션 요약 통계(option_stats)도 함께 갱신한다. completed이면 옵션을 처리 완료로 기록하고,
+    아니면(예산으로 중단, 완료 기록 없는 저널) 완료 여부를 건드리지 않아 다음 실행에서 다시 처리된다.
+    커밋은 호출자가 한다.
+    """
+    # SurveyOption upsert
+    session.execute(
+        _upsert(session, SurveyOption)
+        .values(
+            question_id=option["question_id"],
+            question_label=option["question_label"],
+            option_id=option["option_id"],
+            option_label=option["option_label"],
+        )
+        .on_conflict_do_nothing(index_elements=["question_id", "option_id"])
+    )
+    if completed:
+        session.execute(
+            update(SurveyOption)
+            .where(
+                SurveyOption.question_id == option["question_id"],
+                SurveyOption.option_id == option["option_id"],
+            )
+            .values(completed_at=datetime.now())
+        )
+
+    # Paper upsert 후 영양소는 논문 단위로 교체 (기존 것 일괄 삭제 후 일괄 저장)
+    nutrients_by_paper: Dict[int, List[dict]] = {}
+    other_options = set()  # DOI가 겹쳐 다른 옵션 소속 논문의 영양소를 갱신한 경우
+    for item in extracted_data:
+        paper_id, question_id, option_id = _upsert_paper(session, option, item["paper"])
+        if (question_id, option_id) != (option["question_id"], option["option_id"]):
+            other_options.add((question_id, option_id))
+
+        nutrients = item["nutrients"]
+        details = nutrients.get("details") or {}
+        nutrients_by_paper[paper_id] = [
+            {
+                "paper_id": paper_id,
+                "name": name,
+                "type": nutrient_type,
+                "extra_info": None,
+                **{column: details.get(name, {}).get(column) for column in NUTRIENT_DETAIL_COLUMNS},
+            }
+            for nutrient_type, key in (("good", "good_nutrients"), ("bad", "bad_nutrients"))
+            for name in nutrients.get(key, [])
+        ]
+
+    if nutrients_by_paper:
+        session.execute(delete(Nutrient).where(Nutrient.paper_id.in_(list(nutrients_by_paper))))
+        bulk_insert_nutrients(session, [row for rows in nutrients_by_paper.values() for row in rows])
+
+    refresh_option_stats(
+        session,
+        option["question_id"],
+        option["option_id"],
+        run_seconds=run_seconds,
+        cache_hits=cache_hits,
+        cache_misses=cache_misses,
+        prompt_tokens=prompt_tokens,
+        prompt_tokens_saved=prompt_tokens_saved,
+    )
+    for question_id, option_id in other_options:
+        refresh_option_stats(session, question_id, option_id)
+    return len(extracted_data)
@@ -0,0 +1,258 @@
+"""DB 테이블 내보내기 (export 명령어용).
+
+행을 ``yield_per``(서버 측 커서)로 chunk 단위로 읽어 바로 파일에 쓰므로 DB 크기와 무관하게
+메모리가 일정하다. 형식:
+
+- ``csv``: 테이블별 CSV
+- ``parquet``: Parquet (chunk마다 row group 1개)
+- ``arrow``: Arrow IPC 파일 (Feather v2, chunk마다 record batch 1개)
+
+Parquet/Arrow에서는 영양소 이름처럼 반복되는 문자열 컬럼을 dictionary 인코딩한다
+(pandas에서는 category로 읽힌다). ``partition_by="question_id"``이면
+``{table}/question_id=<값>/part-0.<ext>`` hive 형식 디렉토리로 나눠 쓴다.
+``min_confidence``를 주면 nutrients는 추출 신뢰도가 그 이상인 행만 내보낸다.
+Parquet/Arrow는 pyarrow가 필요하다 (``pip install -e .[export]``).
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import EXPORT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("survey_options", "papers", "nutrients")
+FORMATS = ("csv", "parquet", "arrow")
+PARTITION_COLUMNS = ("question_id",)
+
+_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+
+# 값 종류가 적고 반복이 많아 dictionary 인코딩하는 컬럼
+DICTIONARY_COLUMNS = {
+    "survey_options": {"question_id"},
+    "papers": {"question_id", "option_id", "source"},
+    "nutrients": {"question_id", "option_id", "name", "type"},
+}
+
+
+def _build_query(table: str, min_confidence: Optional[float] = None):
+    """내보낼 SELECT 문. nutrients에는 분석 편의를 위해 논문의 question_id/option_id를 붙인다."""
+    from sqlalchemy import select
+
+    from .models import SurveyOption, Paper, Nutrient
+
+    if table == "survey_options":
+        return select(SurveyOption.__table__).order_by(SurveyOption.id)
+    if table == "papers":
+        return select(Paper.__table__).order_by(Paper.id)
+    if table == "nutrients":
+        query = (
+            select(Nutrient.__table__, Paper.question_id, Paper.option_id)
+            .join(Paper, Paper.id == Nutrient.paper_id)
+            .order_by(Nutrient.id)
+        )
+        if min_confidence is not None:
+            query = query.where(Nutrient.confidence >= min_confidence)
+        return query
+    raise ValueError(f"알 수 없는 테이블: {table} (가능: {', '.join(TABLES)})")
+
+
+def _arrow_type(sql_type, dictionary: bool):
+    import pyarrow as pa
+    from sqlalchemy import JSON, DateTime, Float, Integer
+
+    if dictionary:
+        return pa.dictionary(pa.int32(), pa.string())
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us")
+    # 문자열과 JSON(직렬화한 텍스트)
+    return pa.string()
+
+
+def _json_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return _json_text(value)
+
+
+class _DictionaryEncoder:
+    """chunk 간에 공유되는 증가형 dictionary.
+
+    이전 dictionary가 항상 새 dictionary의 앞부분이므로 Arrow IPC 파일에는 delta만 기록된다.
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, column: List[Optional[str]]):
+        import pyarrow as pa
+
+        indices = []
+        for value in column:
+            if value is None:
+                indices.append(None)
+                continue
+            code = self._index.get(value)
+            if code is None:
+                code = self._index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(code)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+
+class _CsvSink:
+    def __init__(self, path: Path, columns: List[str]):
+        self._file = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, columns: List[List[Any]]) -> None:
+        self._writer.writerows(zip(*[[_csv_value(v) for v in column] for column in columns]))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowSink:
+    def __init__(self, path: Path, fmt: str, schema, encoders: Dict[str, _DictionaryEncoder]):
+        import pyarrow as pa
+
+        self.schema = schema
+        self.encoders = encoders
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(str(path), schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(
+                str(path), schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            )
+
+    def write(self, columns: List[List[Any]]) -> None:
+        import pyarrow as pa
+
+        arrays = []
+        for field, column in zip(self.schema, columns):
+            if field.name in self.encoders:
+                arrays.append(self.encoders[field.name].encode(column))
+            elif pa.types.is_string(field.type):
+                arrays.append(pa.array([_json_text(v) for v in column], field.type))
+            else:
+                arrays.append(pa.array(column, field.type))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export_table(
+    table: str,
+    out_dir: Path,
+    fmt: str = "csv",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    partition_by: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+) -> int:
+    """테이블 1개를 내보내고 행 수 반환.
+
+    partition_by를 주면 해당 컬럼 값별 파일에 나눠 쓰고, 그 컬럼은 경로에만 남긴다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+    if partition_by is not None and partition_by not in PARTITION_COLUMNS:
+        raise ValueError(f"지원하지 않는 파티션 컬럼: {partition_by} (가능: {', '.join(PARTITION_COLUMNS)})")
+    if fmt != "csv":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"{fmt} 내보내기에는 pyarrow가 필요합니다: pip install -e .[export]") from e
+
+    from .db import get_db_session
+
+    query = _build_query(table, min_confidence)
+    names = [column.name for column in query.selected_columns]
+    partition_index = names.index(partition_by) if partition_by else None
+    kept = [i for i in range(len(names)) if i != partition_index]
+    kept_names = [names[i] for i in kept]
+
+    schema = None
+    encoders: Dict[str, _DictionaryEncoder] = {}
+    if fmt != "csv":
+        import pyarrow as pa
+
+        dictionary_columns = DICTIONARY_COLUMNS.get(table, set())
+        types = {column.name: column.type for column in query.selected_columns}
+        schema = pa.schema(
+            [pa.field(name, _arrow_type(types[name], name in dictionary_columns)) for name in kept_names]
+        )
+        encoders = {name: _DictionaryEncoder() for name in kept_names if name in dictionary_columns}
+
+    extension = _EXTENSIONS[fmt]
+    sinks: Dict[Optional[str], Any] = {}
+
+    def sink_for(value: Optional[str]):
+        if value not in sinks:
+            if partition_by is None:
+                path = Path(out_dir) / f"{table}.{extension}"
+            else:
+                path = Path(out_dir) / table / f"{partition_by}={value}" / f"part-0.{extension}"
+                path.parent.mkdir(parents=True, exist_ok=True)
+            sinks[value] = _CsvSink(path, kept_names) if fmt == "csv" else _ArrowSink(path, fmt, schema, encoders)
+        return sinks[value]
+
+    rows = 0
+    try:
+        with get_db_session() as session:
+            result = session.execute(query.execution_options(yield_per=chunk_size))
+            for chunk in result.partitions():
+                groups: Dict[Optional[str], List[tuple]] = {}
+                for row in chunk:
+                    key = row[partition_index] if partition_index is not None else None
+                    groups.setdefault(key, []).append(row)
+                for key, group in groups.items():
+                    columns = list(zip(*group))
+                    sink_for(key).write([list(columns[i]) for i in kept])
+                rows += len(chunk)
+        if partition_by is None:
+            sink_for(None)  # 빈 테이블도 헤더/스키마만 있는 파일을 만든다
+    finally:
+        for sink in sinks.values():
+            sink.close()
+
+    target = Path(out_dir) / (table if partition_by else f"{table}.{extension}")
+    logger.info(f"{table} → {target} ({rows}행)")
+    return rows
+
+
+def export_tables(
+    out_dir: Path,
+    tables: Optional[List[str]] = None,
+    fmt: str = "csv",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    partition_by: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+) -> Dict[str, int]:
+    """여러 테이블을 내보내고 {테이블: 행 수} 반환."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return {
+        table: export_table(
+            table, out_dir, fmt=fmt, chunk_size=chunk_size, partition_by=partition_by, min_confidence=min_confidence
+        )
+        for table in (tables or TABLES)
+    }
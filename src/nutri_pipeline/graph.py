@@ -3,15 +3,31 @@
 from typing import TypedDict, Annotated, Optional, List
 from operator import add
 import logging
+import time
+from datetime import datetime, timedelta
 
 from langgraph.graph import StateGraph, END
 
-from .survey_options import get_all_options
-from .paper_search import search_papers_for_option, PaperCandidate
+from .survey_options import get_all_options, option_key
+from .paper_search import search_papers_for_option, PaperCandidate, paper_key, paper_year
 from .nutrient_extractor import get_extractor
-from .db import get_db_session
-from .models import SurveyOption, Paper, Nutrient
-from .config import MAX_LOG_ENTRIES
+from .db import (
+    get_db_session,
+    save_extracted_data,
+    load_watermark,
+    load_known_paper_keys,
+    load_option_summaries,
+    update_watermark,
+)
+from .scheduler import RunBudget, estimate_paper_tokens, prioritize_options, prioritize_papers
+from .config import (
+    MAX_LOG_ENTRIES,
+    MAX_PAPERS_PER_OPTION,
+    RERANK_ENABLED,
+    RERANK_CANDIDATES,
+    INCREMENTAL_OVERLAP_DAYS,
+    JOURNAL_ENABLED,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +46,16 @@ def _append_logs(existing: List[str], new: List[str]) -> List[str]:
 class PipelineState(TypedDict):
     """파이프라인 상태 정의."""
 
-    options: List[dict]  # 모든 설문 옵션
-    processed_option_ids: List[str]  # 이미 처리된 option_id 목록
+    options: Optional[List[dict]]  # 처리할 설문 옵션 (None이면 load_options에서 전체 로드)
+    processed_option_keys: List[str]  # 이미 처리된 옵션 키("question_id:option_id") 목록
+    next_option_index: int  # 다음 탐색을 시작할 options 인덱스 (앞쪽은 모두 처리됨)
     current_option: Optional[dict]  # 현재 처리 중인 option
     papers: List[PaperCandidate]  # 검색된 논문들
     extracted_data: List[dict]  # 추출된 영양소 데이터 (paper + nutrients)
+    option_metrics: dict  # 현재 옵션의 실행 지표 (started_at, cache_hits, cache_misses, prompt_tokens 등)
+    incremental: bool  # 증분 갱신 모드 (옵션별 기준점 이후의 새 논문만 처리)
+    budget: Optional[RunBudget]  # 토큰/비용/마감 한도 (None이면 제한 없음)
+    prioritize: bool  # 옵션/논문을 기대 가치 순으로 처리
     logs: Annotated[List[str], add]  # 진행 로그
      # 진행 로그는 각 노드가 추가 로그만 반환하고 LangGraph가 누적한다.
     logs: Annotated[List[str], _append_logs]
@@ -42,34 +63,57 @@ class PipelineState(TypedDict):
 def load_options_node(state: PipelineState) -> PipelineState:
     """설문 옵션을 로드하는 노드."""
     logger.info("설문 옵션 로드 중...")
-    options = get_all_options()
+    # None이면 필터 없음 (전체 옵션). 빈 목록은 그대로 둔다
+    options = state.get("options")
+    if options is None:
+        options = get_all_options()
+    logs = [f"설문 옵션 {len(options)}개 로드 완료"]
+    if state.get("prioritize"):
+        with get_db_session() as session:
+            options = prioritize_options(options, load_option_summaries(session))
+        logs.append("옵션을 기대 가치 순으로 정렬 (논문 적음, 오래됨, 초록 누락 많음 우선)")
     return {
         **state,
         "options": options,
-        "processed_option_ids": state.get("processed_option_ids", []),
-        "logs": [f"설문 옵션 {len(options)}개 로드 완료"],
+        "processed_option_keys": state.get("processed_option_keys", []),
+        "next_option_index": 0,
+        "logs": logs,
     }
 
 
 def select_next_option_node(state: PipelineState) -> PipelineState:
-    """다음 처리할 옵션을 선택하는 노드."""
+    """다음 처리할 옵션을 선택하는 노드. 예산이 바닥났으면 남은 옵션을 건너뛰고 끝낸다."""
     options = state.get("options", [])
-    processed_ids = state.get("processed_option_ids", [])
+    budget = state.get("budget")
+    reason = budget.exhausted_reason() if budget is not None else None
+    if reason:
+        logger.warning(f"{reason}: 남은 옵션 처리 중단")
+        return {
+            **state,
+            "current_option": None,
+            "logs": [f"{reason}: 남은 옵션 처리 중단"],
+        }
+    processed_keys = set(state.get("processed_option_keys", []))
 
-    # 아직 처리하지 않은 옵션 찾기
+    # 아직 처리하지 않은 옵션 찾기 (커서 이후부터만 탐색)
     next_option = None
-    for option in options:
-        if option["option_id"] not in processed_ids:
+    index = state.get("next_option_index", 0)
+    while index < len(options):
+        option = options[index]
+        index += 1
+        if option_key(option) not in processed_keys:
             next_option = option
             break
 
     if next_option:
-        logger.info(f"다음 옵션 선택: {next_option['option_label']} ({next_option['option_id']})")
+        logger.info(f"다음 옵션 선택: {next_option['option_label']} ({option_key(next_option)})")
         return {
             **state,
             "current_option": next_option,
+            "next_option_index": index,
             "papers": [],
             "extracted_data": [],
+            "option_metrics": {"started_at": time.perf_counter()},
             "logs": [f"옵션 선택: {next_option['option_label']}"],
         }
     else:
@@ -77,6 +121,7 @@ def select_next_option_node(state: PipelineState) -> PipelineState:
         return {
             **state,
             "current_option": None,
+            "next_option_index": index,
             "logs": ["모든 옵션 처리 완료"],
         }
 
@@ -95,12 +140,57 @@ def search_papers_node(state: PipelineState) -> PipelineState:
         return {**state, "logs": []}
 
     logger.info(f"논문 검색 시작: {current_option['option_label']}")
-    papers = search_papers_for_option(current_option)
+    metrics = dict(state.get("option_metrics", {}))
+    since, known_keys = None, set()
+    if state.get("incremental"):
+        metrics["refreshed_at"] = datetime.now()
+        question_id, option_id = current_option["question_id"], current_option["option_id"]
+        with get_db_session() as session:
+            watermark = load_watermark(session, question_id, option_id)
+            if watermark is not None:
+                # provider 색인 지연을 감안해 기준점보다 조금 앞부터 검색
+                since = (watermark.refreshed_at - timedelta(days=INCREMENTAL_OVERLAP_DAYS)).date()
+            known_keys = load_known_paper_keys(session, question_id, option_id)
+
+    def new_only(papers: List[PaperCandidate]) -> List[PaperCandidate]:
+        return [paper for paper in papers if paper_key(paper) not in known_keys]
+
+    if not RERANK_ENABLED:
+        found = search_papers_for_option(current_option, since=since)
+        papers = new_only(found)
+        if state.get("prioritize"):
+            papers = prioritize_papers(papers)
+        log = f"논문 {len(papers)}개 검색 완료"
+        if state.get("incremental"):
+            log += f" (증분: since {since or '처음'}, 이미 본 논문 {len(found) - len(papers)}개 제외)"
+        return {
+            **state,
+            "papers": papers,
+            "option_metrics": metrics,
+            "logs": [log],
+        }
+
+    # 후보를 넉넉히 가져온 뒤 임베딩 유사도로 상위 MAX_PAPERS_PER_OPTION개만 남김 (numpy 필요)
+    from .rerank import get_reranker
+
+    candidates = new_only(
+        search_papers_for_option(
+            current_option, max_results=max(RERANK_CANDIDATES, MAX_PAPERS_PER_OPTION), since=since
+        )
+    )
+    reranker = get_reranker()
+    hits, misses = reranker.cache_hits, reranker.cache_misses
+    papers = reranker.rerank(current_option, candidates, top_k=MAX_PAPERS_PER_OPTION)
 
     return {
         **state,
         "papers": papers,
-        "logs": [f"논문 {len(papers)}개 검색 완료"],
+        "option_metrics": {
+            **metrics,
+            "cache_hits": reranker.cache_hits - hits,
+            "cache_misses": reranker.cache_misses - misses,
+        },
+        "logs": [f"논문 {len(candidates)}개 검색, 재순위화 후 {len(papers)}개 선택"],
     }
 
 
@@ -111,107 +201,138 @@ def extract_nutrients_node(state: PipelineState) -> PipelineState:
         return {**state, "logs": []}
 
     extractor = get_extractor()
-    extracted_data = []
-
-    for paper in papers:
-        logger.info(f"영양소 추출 중: {paper.title[:50]}...")
-        nutrients = extractor.extract_nutrients_from_paper(paper.title, paper.abstract)
-
-        extracted_data.append(
-            {
-                "paper": paper,
-                "nutrients": nutrients,
-            }
+    tokens, saved = extractor.prompt_tokens, extractor.prompt_tokens_saved
+    journal_paper = _journal_writer(state.get("current_option")) if JOURNAL_ENABLED else None
+    budget = state.get("budget")
+    budget_logs = []
+    if budget is not None and budget.bounded:
+        results, budget_logs = _extract_within_budget(extractor, papers, budget, journal_paper)
+        papers = papers[: len(results)]
+    else:
+        results = extractor.extract_many(
+            [(paper.title, paper.abstract) for paper in papers],
+            on_result=journal_paper and (lambda i, result: journal_paper(papers[i], result)),
         )
+    metrics = {
+        **state.get("option_metrics", {}),
+        "prompt_tokens": extractor.prompt_tokens - tokens,
+        "prompt_tokens_saved": extractor.prompt_tokens_saved - saved,
+        "partial": bool(budget_logs),
+    }
+    extracted_data = [
+        {
+            "paper": paper,
+            "nutrients": nutrients,
+        }
+        for paper, nutrients in zip(papers, results)
+    ]
 
     logger.info(f"영양소 추출 완료: {len(extracted_data)}개 논문")
     return {
         **state,
         "extracted_data": extracted_data,
-        "logs": [f"영양소 추출 완료: {len(extracted_data)}개 논문"],
+        "option_metrics": metrics,
+        "logs": [
+            f"영양소 추출 완료: {len(extracted_data)}개 논문 "
+            f"(초록 {metrics['prompt_tokens']}토큰, 압축으로 {metrics['prompt_tokens_saved']}토큰 절약)",
+            extractor.limiter.summary(),
+            *([extractor.tier_summary()] if extractor.cascade else []),
+            *budget_logs,
+        ],
     }
 
 
+def _journal_writer(option: dict):
+    """추출이 끝난 논문을 바로 저널에 기록하는 콜백 (paper, 결과)."""
+    from .journal import extraction_record, get_journal
+
+    journal = get_journal()
+    return lambda paper, nutrients: journal.append(extraction_record(option, paper, nutrients))
+
+
+def _extract_within_budget(extractor, papers: List[PaperCandidate], budget: RunBudget, journal_paper=None):
+    """LLM 동시성 크기 묶음으로 추출하며 예산을 차감. 예산이 모자라면 남은 논문은 건너뛴다.
+
+    (결과 목록, 중단 로그) 반환. 결과는 papers 앞쪽부터 순서대로다.
+    """
+    results = []
+    chunk_size = extractor.max_concurrency
+    for start in range(0, len(papers), chunk_size):
+        chunk = papers[start : start + chunk_size]
+        reason = budget.exhausted_reason()
+        overhead = extractor.prompt_overhead_tokens
+        count = 0 if reason else budget.affordable(
+            [estimate_paper_tokens(p.title, p.abstract, overhead) for p in chunk]
+        )
+        if count:
+            tokens, cost = extractor.usage()
+            results += extractor.extract_many(
+                [(paper.title, paper.abstract) for paper in chunk[:count]],
+                on_result=journal_paper and (lambda i, result, chunk=chunk: journal_paper(chunk[i], result)),
+            )
+            used_tokens, used_cost = extractor.usage()
+            budget.charge(used_tokens - tokens, used_cost - cost)
+        if count < len(chunk):
+            skipped = len(papers) - len(results)
+            reason = reason or budget.exhausted_reason() or "남은 예산으로 다음 논문 처리 불가"
+            # 우선순위가 가장 높은 남은 논문을 못 하면 여기서 멈춘다 (다음 옵션 검색도 하지 않음)
+            budget.stop(reason)
+            logger.warning(f"{reason}: 논문 {skipped}개 건너뜀")
+            return results, [f"{reason}: 논문 {skipped}개 건너뜀 (추출한 {len(results)}개만 저장)"]
+    return results, []
+
+
 def save_to_db_node(state: PipelineState) -> PipelineState:
     """DB 저장 노드."""
     current_option = state.get("current_option")
     extracted_data = state.get("extracted_data", [])
 
-    if not current_option or not extracted_data:
+    incremental = state.get("incremental", False)
+    if not current_option or (not extracted_data and not incremental):
         return {**state, "logs": []}
 
+    metrics = state.get("option_metrics", {})
+    started_at = metrics.get("started_at")
+    if JOURNAL_ENABLED:
+        return _journal_option_done(state, current_option, extracted_data, metrics)
     try:
         with get_db_session() as session:
-            # SurveyOption upsert
-            option_record = session.query(SurveyOption).filter_by(option_id=current_option["option_id"]).first()
-            if not option_record:
-                option_record = SurveyOption(
-                    question_id=current_option["question_id"],
-                    question_label=current_option["question_label"],
-                    option_id=current_option["option_id"],
-                    option_label=current_option["option_label"],
-                )
-                session.add(option_record)
-                session.flush()
-
-            # Paper 및 Nutrient 저장
             saved_count = 0
-            for item in extracted_data:
-                paper_candidate = item["paper"]
-                nutrients = item["nutrients"]
-
-                # Paper upsert (DOI 기준)
-                paper_record = None
-                if paper_candidate.doi:
-                    paper_record = session.query(Paper).filter_by(doi=paper_candidate.doi).first()
-
-                if not paper_record:
-                    paper_record = Paper(
-                        option_id=current_option["option_id"],
-                        title=paper_candidate.title,
-                        url=paper_candidate.url,
-                        source=paper_candidate.source,
-                        doi=paper_candidate.doi,
-                        abstract=paper_candidate.abstract,
-                        raw_metadata=paper_candidate.raw_metadata,
-                    )
-                    session.add(paper_record)
-                    session.flush()
-
-                # Nutrient 저장 (기존 것 삭제 후 재생성)
-                session.query(Nutrient).filter_by(paper_id=paper_record.id).delete()
-
-                for nutrient_name in nutrients.get("good_nutrients", []):
-                    nutrient = Nutrient(
-                        paper_id=paper_record.id,
-                        name=nutrient_name,
-                        type="good",
-                        extra_info=None,
-                    )
-                    session.add(nutrient)
-
-                for nutrient_name in nutrients.get("bad_nutrients", []):
-                    nutrient = Nutrient(
-                        paper_id=paper_record.id,
-                        name=nutrient_name,
-                        type="bad",
-                        extra_info=None,
-                    )
-                    session.add(nutrient)
-
-                saved_count += 1
-
+            if extracted_data:
+                saved_count = save_extracted_data(
+                    session,
+                    current_option,
+                    extracted_data,
+                    run_seconds=time.perf_counter() - started_at if started_at is not None else None,
+                    cache_hits=metrics.get("cache_hits"),
+                    cache_misses=metrics.get("cache_misses"),
+                    prompt_tokens=metrics.get("prompt_tokens"),
+                    prompt_tokens_saved=metrics.get("prompt_tokens_saved"),
+                    completed=not metrics.get("partial"),
+                )
+            if incremental and not metrics.get("partial"):
+                # 새 논문이 없어도 기준점은 전진시킨다 (예산 때문에 일부만 처리했으면 다음 실행에서 이어서)
+                papers = [item["paper"] for item in extracted_data]
+                update_watermark(
+                    session,
+                    current_option["question_id"],
+                    current_option["option_id"],
+                    refreshed_at=metrics.get("refreshed_at") or datetime.now(),
+                    new_keys=[paper_key(paper) for paper in papers],
+                    years=[paper_year(paper) for paper in papers],
+                )
             session.commit()
             logger.info(f"DB 저장 완료: {saved_count}개 논문")
 
-            # 처리된 옵션 ID 추가
-            processed_ids = state.get("processed_option_ids", [])
-            if current_option["option_id"] not in processed_ids:
-                processed_ids.append(current_option["option_id"])
+            # 처리된 옵션 키 추가
+            processed_keys = state.get("processed_option_keys", [])
+            key = option_key(current_option)
+            if key not in processed_keys:
+                processed_keys.append(key)
 
             return {
                 **state,
-                "processed_option_ids": processed_ids,
+                "processed_option_keys": processed_keys,
                 "logs": [f"DB 저장 완료: {saved_count}개 논문"],
             }
 
@@ -223,17 +344,67 @@ def save_to_db_node(state: PipelineState) -> PipelineState:
         }
 
 
-def build_graph() -> StateGraph:
-    """LangGraph 그래프 빌드."""
+def _journal_option_done(state: PipelineState, option: dict, extracted_data: List[dict], metrics: dict) -> PipelineState:
+    """저널 모드의 저장 노드: 옵션 완료를 저널에 기록하고 fsync. DB 반영은 JournalCommitter가 한다."""
+    from .journal import get_journal, option_done_record
+
+    started_at = metrics.get("started_at")
+    watermark = None
+    if state.get("incremental", False) and not metrics.get("partial"):
+        papers = [item["paper"] for item in extracted_data]
+        watermark = {
+            "refreshed_at": (metrics.get("refreshed_at") or datetime.now()).isoformat(),
+            "keys": [paper_key(paper) for paper in papers],
+            "years": [paper_year(paper) for paper in papers],
+        }
+    journal = get_journal()
+    try:
+        journal.append(
+            option_done_record(
+                option,
+                {
+                    "run_seconds": time.perf_counter() - started_at if started_at is not None else None,
+                    "cache_hits": metrics.get("cache_hits"),
+                    "cache_misses": metrics.get("cache_misses"),
+                    "prompt_tokens": metrics.get("prompt_tokens"),
+                    "prompt_tokens_saved": metrics.get("prompt_tokens_saved"),
+                },
+                watermark,
+                completed=not metrics.get("partial"),
+            )
+        )
+        journal.sync()
+    except Exception as e:
+        logger.error(f"저널 기록 중 오류: {e}")
+        return {**state, "logs": [f"저널 기록 오류: {str(e)}"]}
+
+    processed_keys = state.get("processed_option_keys", [])
+    key = option_key(option)
+    if key not in processed_keys:
+        processed_keys.append(key)
+    logger.info(f"저널 기록 완료: {len(extracted_data)}개 논문 (DB 반영은 committer)")
+    return {
+        **state,
+        "processed_option_keys": processed_keys,
+        "logs": [f"저널 기록 완료: {len(extracted_data)}개 논문"],
+    }
+
+
+def build_graph(profiler=None) -> StateGraph:
+    """LangGraph 그래프 빌드. profiler(profiling.Profiler)를 주면 각 노드를 감싸 프로파일링한다."""
     # 그래프 생성
     workflow = StateGraph(PipelineState)
 
     # 노드 추가
-    workflow.add_node("load_options", load_options_node)
-    workflow.add_node("select_next_option", select_next_option_node)
-    workflow.add_node("search_papers", search_papers_node)
-    workflow.add_node("extract_nutrients", extract_nutrients_node)
-    workflow.add_node("save_to_db", save_to_db_node)
+    nodes = {
+        "load_options": load_options_node,
+        "select_next_option": select_next_option_node,
+        "search_papers": search_papers_node,
+        "extract_nutrients": extract_nutrients_node,
+        "save_to_db": save_to_db_node,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, profiler.wrap(name, node) if profiler is not None else node)
 
     # 엣지 설정
     workflow.set_entry_point("load_options")
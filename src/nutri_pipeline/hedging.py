@@ -0,0 +1,178 @@
+"""꼬리 지연을 줄이는 요청 계층: hedged request와 single-flight 합류.
+
+- ``Hedger``: 요청이 지금까지 관측된 지연의 ``HEDGE_PERCENTILE`` 백분위를 넘도록 끝나지 않으면
+  같은 요청을 한 번 더 보내고 먼저 끝난 응답을 쓴다. 평균 부하가 크게 늘지 않도록 hedge 비율은
+  ``HEDGE_MAX_RATIO`` 이하로 제한한다. 늦게 끝난 쪽은 취소하지 못하고 결과만 버린다.
+- ``SingleFlight``: 같은 키로 동시에 들어온 요청을 진행 중인 하나의 Future로 합친다.
+
+둘 다 스레드 기반이며, 비동기 경로는 ``asyncio.to_thread``로 감싼 동기 호출을 거친다.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Hashable, List, Optional, TypeVar
+
+from .config import (
+    HEDGE_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_DELAY_MS,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_MAX_RATIO,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """같은 키의 동시 요청을 하나로 합치는 스레드 안전 그룹."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """key로 진행 중인 요청이 있으면 그 결과를 기다리고, 없으면 fn을 실행한다.
+
+        합류한 호출자는 같은 결과 객체를 받으므로, 바꿔 쓸 결과는 호출자가 복사한다.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class Hedger:
+    """관측 지연의 백분위를 기준으로 중복 요청(hedge)을 보내는 실행기."""
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = HEDGE_ENABLED,
+        percentile: float = HEDGE_PERCENTILE,
+        min_delay_ms: float = HEDGE_MIN_DELAY_MS,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        max_ratio: float = HEDGE_MAX_RATIO,
+        window: int = 200,
+        max_workers: int = 32,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.single_flight = SingleFlight()
+
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"hedge-{name}")
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _record(self, started: float) -> None:
+        with self._lock:
+            self._latencies.append((time.perf_counter() - started) * 1000.0)
+
+    def hedge_delay(self) -> Optional[float]:
+        """hedge를 보낼 대기 시간(초). 표본이 부족하면 None (hedge 안 함)."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        p = ordered[min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)]
+        return max(p, self.min_delay_ms) / 1000.0
+
+    def _attempt(self, fn: Callable[[], T]) -> T:
+        started = time.perf_counter()
+        result = fn()
+        self._record(started)
+        return result
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_ratio * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """fn을 실행하고, 지연 기준을 넘기면 hedge를 보내 먼저 끝난 결과를 반환.
+
+        둘 중 하나라도 성공하면 그 결과를, 모두 실패하면 먼저 난 오류를 올린다.
+        """
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay() if self.enabled else None
+        if delay is None:
+            return self._attempt(fn)
+
+        primary = self._pool.submit(self._attempt, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge():
+            return primary.result()
+
+        hedge = self._pool.submit(self._attempt, fn)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def summary(self) -> str:
+        """실행 로그용 요약."""
+        delay = self.hedge_delay()
+        delay_text = f"{delay * 1000:.0f}ms" if delay is not None else "-"
+        return (
+            f"[hedge:{self.name}] 요청 {self.calls}건, hedge {self.hedged}건 (대기 p{self.percentile:g} {delay_text}), "
+            f"hedge 승 {self.hedge_wins}건, 합류 {self.single_flight.coalesced}건"
+        )
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(name: str) -> Hedger:
+    """이름별 Hedger 인스턴스 (provider/모델마다 지연 분포가 달라 따로 둔다)."""
+    with _hedgers_lock:
+        if name not in _hedgers:
+            _hedgers[name] = Hedger(name)
+        return _hedgers[name]
+
+
+def summaries() -> List[str]:
+    """지금까지 쓰인 Hedger들의 요약."""
+    with _hedgers_lock:
+        return [hedger.summary() for hedger in _hedgers.values() if hedger.calls]
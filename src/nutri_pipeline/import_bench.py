@@ -0,0 +1,93 @@
+"""CLI 시작 시간 벤치마크 및 회귀 검사.
+
+새 인터프리터에서 ``nutri_pipeline.cli``를 import하고 가벼운 명령어를 실행해
+1) 금지된 무거운 모듈(LangGraph, LangChain, SQLAlchemy, httpx 등)이 딸려 오지 않았는지,
+2) 소요 시간이 예산 안인지 검사한다. 실패 시 종료 코드 1.
+
+    python -m nutri_pipeline.import_bench --budget-ms 400
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# `import nutri_pipeline.cli`만으로는 로드되면 안 되는 모듈
+FORBIDDEN_ON_IMPORT = (
+    "langgraph",
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "openai",
+    "sqlalchemy",
+    "httpx",
+    "bs4",
+    "numpy",
+)
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import nutri_pipeline.cli
+elapsed = time.perf_counter() - start
+loaded = sorted({name.split(".")[0] for name in sys.modules})
+print(json.dumps({"import_ms": elapsed * 1000, "modules": loaded}))
+"""
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def measure_import(repeat: int = 5) -> Dict[str, object]:
+    """``import nutri_pipeline.cli``의 import 시간(중앙값)과 로드된 최상위 모듈."""
+    samples = []
+    modules: List[str] = []
+    for _ in range(repeat):
+        data = json.loads(_run(["-c", _PROBE]).stdout.strip().splitlines()[-1])
+        samples.append(data["import_ms"])
+        modules = data["modules"]
+    return {"import_ms": statistics.median(samples), "modules": modules}
+
+
+def measure_command(argv: List[str], repeat: int = 3) -> float:
+    """``python -m nutri_pipeline.cli <argv>`` 전체 실행 시간 중앙값 (ms)."""
+    import time
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(["-m", "nutri_pipeline.cli", *argv])
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CLI 시작 시간 벤치마크")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="`--help` 실행 시간 예산 (ms)")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 측정 횟수")
+    args = parser.parse_args()
+
+    result = measure_import(args.repeat)
+    help_ms = measure_command(["--help"], args.repeat)
+    forbidden = [m for m in FORBIDDEN_ON_IMPORT if m in result["modules"]]
+
+    print(f"import nutri_pipeline.cli: {result['import_ms']:.1f}ms")
+    print(f"nutri-pipeline --help:     {help_ms:.1f}ms (예산 {args.budget_ms:.0f}ms)")
+
+    failed = False
+    if forbidden:
+        print(f"실패: import 시 무거운 모듈이 로드됨: {', '.join(forbidden)}")
+        failed = True
+    if help_ms > args.budget_ms:
+        print("실패: --help 실행 시간이 예산을 초과함")
+        failed = True
+    if not failed:
+        print("통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
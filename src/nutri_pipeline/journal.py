@@ -0,0 +1,370 @@
+"""추출 결과 write-ahead 저널과 DB committer.
+
+LLM 추출이 끝난 논문은 바로 ``JOURNAL_DIR``의 append-only JSONL segment에 기록하고,
+DB 반영은 ``JournalCommitter``가 따로 모아서 큰 트랜잭션으로 한다. DB 저장이 실패하거나
+프로세스가 죽어도 비용을 낸 추출 결과는 저널에 남아 다음 drain(또는 ``replay`` 명령)에서
+반영된다.
+
+레코드 (한 줄에 JSON 하나):
+
+- ``{"type": "extraction", "option": {...}, "paper": {...}, "nutrients": {...}}``: 논문 1개 추출 결과
+- ``{"type": "option_done", "option": {...}, "metrics": {...}, "watermark": {...} | null, "completed": bool}``:
+  옵션 저장 (completed가 false면 예산으로 일부만 추출)
+
+committer는 ``option_done``까지 모인 옵션만 반영하고, ``checkpoint.json``에 다시 읽을 위치
+(완료 기록을 기다리는 추출의 첫 레코드)와 반영을 마친 위치를 따로 기록한다. 다시 읽을 때
+반영을 마친 위치까지의 ``option_done``은 건너뛴다. 완료 기록이 없는 추출(실행 중 중단)은
+``final`` drain에서 함께 반영하되, 옵션을 처리 완료로 기록하지 않아 다음 실행에서 다시 처리된다.
+반영은 DOI(없으면 옵션+제목) 기준 upsert라 같은 레코드를 다시 반영해도 결과가 같다.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import profiling
+from .config import (
+    JOURNAL_DIR,
+    JOURNAL_SEGMENT_BYTES,
+    JOURNAL_FSYNC_BATCH,
+    JOURNAL_FSYNC_INTERVAL_MS,
+    JOURNAL_COMMIT_INTERVAL,
+    JOURNAL_COMMIT_MAX_OPTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# (segment 번호, 바이트 offset)
+Position = Tuple[int, int]
+
+_SEGMENT_PREFIX = "segment-"
+_CHECKPOINT = "checkpoint.json"
+
+
+def _segment_path(directory: Path, number: int) -> Path:
+    return directory / f"{_SEGMENT_PREFIX}{number:06d}.jsonl"
+
+
+def list_segments(directory: Path = JOURNAL_DIR) -> List[Tuple[int, Path]]:
+    """저널 segment 목록 [(번호, 경로)] (번호 순)."""
+    if not directory.exists():
+        return []
+    segments = []
+    for path in directory.glob(f"{_SEGMENT_PREFIX}*.jsonl"):
+        try:
+            segments.append((int(path.stem[len(_SEGMENT_PREFIX):]), path))
+        except ValueError:
+            continue
+    return sorted(segments)
+
+
+def _truncate_torn_tail(path: Path) -> None:
+    """쓰다 만 마지막 줄(중단된 쓰기)을 잘라낸다. 그대로 두면 다음 레코드와 붙어 손상된다."""
+    with path.open("rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            step = min(4096, end)
+            f.seek(end - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                end = end - step + newline + 1
+                break
+            end -= step
+        if end < size:
+            logger.warning(f"저널 끝의 불완전한 레코드 제거: {path.name} ({size - end}바이트)")
+            f.truncate(end)
+
+
+class Journal:
+    """append-only JSONL 저널 (스레드 안전).
+
+    쓰기마다 OS 버퍼로 flush하고, fsync는 ``fsync_batch``개 레코드 또는 ``fsync_interval_ms``마다
+    한 번씩 묶어서 한다. 옵션 완료처럼 내구성이 필요한 시점에는 ``sync()``를 호출한다.
+    """
+
+    def __init__(
+        self,
+        directory: Path = JOURNAL_DIR,
+        segment_bytes: int = JOURNAL_SEGMENT_BYTES,
+        fsync_batch: int = JOURNAL_FSYNC_BATCH,
+        fsync_interval_ms: float = JOURNAL_FSYNC_INTERVAL_MS,
+    ):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync_batch = max(1, fsync_batch)
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self._lock = threading.Lock()
+        self._file = None
+        self._number = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = list_segments(self.directory)
+        self._number = segments[-1][0] if segments else 1
+        path = _segment_path(self.directory, self._number)
+        if path.exists():
+            _truncate_torn_tail(path)
+        self._file = path.open("ab")
+
+    def _rotate(self) -> None:
+        self._fsync()
+        self._file.close()
+        self._number += 1
+        self._file = _segment_path(self.directory, self._number).open("ab")
+
+    def _fsync(self) -> None:
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """레코드 1개 추가 (fsync는 묶어서)."""
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self._open()
+            elif self._file.tell() + len(line) > self.segment_bytes and self._file.tell() > 0:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._fsync()
+
+    def sync(self) -> None:
+        """아직 fsync하지 않은 레코드를 디스크에 내린다."""
+        with self._lock:
+            if self._file is not None:
+                self._fsync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+
+_journal: Optional[Journal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> Journal:
+    """프로세스 공용 저널."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+        return _journal
+
+
+def extraction_record(option: Dict, paper, nutrients: Dict) -> Dict[str, Any]:
+    return {
+        "type": "extraction",
+        "at": datetime.now().isoformat(),
+        "option": option,
+        "paper": asdict(paper),
+        "nutrients": nutrients,
+    }
+
+
+def option_done_record(
+    option: Dict, metrics: Dict, watermark: Optional[Dict] = None, completed: bool = True
+) -> Dict[str, Any]:
+    return {
+        "type": "option_done",
+        "at": datetime.now().isoformat(),
+        "option": option,
+        "metrics": metrics,
+        "watermark": watermark,
+        "completed": completed,
+    }
+
+
+def read_records(directory: Path, start: Position = (0, 0)) -> Iterator[Tuple[Position, Position, Dict]]:
+    """start 위치부터 레코드를 읽어 (레코드 시작 위치, 다음 위치, 레코드)를 낸다.
+
+    마지막 줄이 쓰다 만 상태(개행 없음, JSON 오류)이면 거기서 멈춘다.
+    """
+    for number, path in list_segments(directory):
+        if number < start[0]:
+            continue
+        with path.open("rb") as f:
+            if number == start[0]:
+                f.seek(start[1])
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.error(f"저널 레코드 손상: {path.name}@{offset}, 이후 레코드는 건너뜀")
+                    return
+                yield (number, offset), (number, f.tell()), record
+
+
+def load_checkpoint(directory: Path = JOURNAL_DIR) -> Tuple[Position, Position]:
+    """(다시 읽을 위치, 반영을 마친 위치). 반영 위치가 없는 이전 형식은 읽을 위치와 같게 본다."""
+    path = Path(directory) / _CHECKPOINT
+    if not path.exists():
+        return (0, 0), (0, 0)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    position = (data["segment"], data["offset"])
+    return position, tuple(data.get("applied") or position)
+
+
+def save_checkpoint(position: Position, applied: Position, directory: Path = JOURNAL_DIR) -> None:
+    """checkpoint를 원자적으로 교체."""
+    path = Path(directory) / _CHECKPOINT
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"segment": position[0], "offset": position[1], "applied": list(applied)}), encoding="utf-8"
+    )
+    os.replace(tmp, path)
+
+
+class JournalCommitter:
+    """저널을 DB에 반영하는 committer. ``start()``로 백그라운드 스레드에서 주기적으로 drain한다."""
+
+    def __init__(
+        self,
+        directory: Path = JOURNAL_DIR,
+        interval: float = JOURNAL_COMMIT_INTERVAL,
+        max_options: int = JOURNAL_COMMIT_MAX_OPTIONS,
+    ):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.max_options = max(1, max_options)
+        self._drain_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.committed_options = 0
+
+    def _apply(self, batch: List[Tuple[Dict, List[Dict], Dict, Optional[Dict], bool]]) -> None:
+        """옵션 묶음을 트랜잭션 하나로 반영."""
+        from .db import get_db_session, save_extracted_data, update_watermark
+        from .paper_search import PaperCandidate
+
+        with get_db_session() as session:
+            for option, items, metrics, watermark, completed in batch:
+                extracted = [{"paper": PaperCandidate(**i["paper"]), "nutrients": i["nutrients"]} for i in items]
+                if extracted:
+                    save_extracted_data(session, option, extracted, completed=completed, **metrics)
+                if watermark is not None:
+                    update_watermark(
+                        session,
+                        option["question_id"],
+                        option["option_id"],
+                        refreshed_at=datetime.fromisoformat(watermark["refreshed_at"]),
+                        new_keys=watermark["keys"],
+                        years=watermark["years"],
+                    )
+            session.commit()
+
+    def _drain_once(self, start: Position, applied: Position, final: bool) -> Tuple[int, Position, Position, bool]:
+        """start부터 최대 max_options개 옵션을 반영. (옵션 수, 다시 읽을 위치, 반영을 마친 위치, 더 남았는지) 반환.
+
+        applied 이전의 ``option_done``은 이미 반영했으므로 그 추출과 함께 건너뛴다.
+        """
+        from .survey_options import option_key
+
+        groups: Dict[str, Tuple[Position, Dict, List[Dict]]] = {}  # 완료 기록을 기다리는 추출
+        batch = []
+        end = start
+        more = False
+        for position, next_position, record in read_records(self.directory, start):
+            key = option_key(record["option"])
+            if record["type"] == "extraction":
+                groups.setdefault(key, (position, record["option"], []))[2].append(record)
+            elif record["type"] == "option_done":
+                _, _, items = groups.pop(key, (position, record["option"], []))
+                if position < applied:
+                    end = next_position
+                    continue
+                batch.append(
+                    (
+                        record["option"],
+                        items,
+                        record.get("metrics") or {},
+                        record.get("watermark"),
+                        record.get("completed", True),
+                    )
+                )
+            end = next_position
+            if len(batch) >= self.max_options:
+                more = True
+                break
+
+        if final and not more:
+            # 완료 기록 없이 끝난 옵션(중단된 실행)의 추출도 버리지 않고 반영 (처리 완료로는 기록하지 않음)
+            batch += [(option, items, {}, None, False) for _, option, items in groups.values()]
+            groups = {}
+        if not batch:
+            return 0, start, applied, False
+
+        with profiling.section("db:journal"):
+            self._apply(batch)
+        # 아직 완료 기록을 기다리는 추출이 있으면 그 첫 레코드부터 다시 읽는다
+        checkpoint = min([first for first, _, _ in groups.values()] + [end])
+        applied = max(applied, end)
+        save_checkpoint(checkpoint, applied, self.directory)
+        return len(batch), checkpoint, applied, more
+
+    def drain(self, final: bool = False, from_start: bool = False) -> int:
+        """반영할 수 있는 저널을 모두 반영하고 반영한 옵션 수를 반환.
+
+        final이면 완료 기록이 없는 추출도 반영한다. from_start이면 checkpoint를 무시하고
+        저널 처음부터 다시 반영한다 (DB 재구성).
+        """
+        with self._drain_lock:
+            position, applied = ((0, 0), (0, 0)) if from_start else load_checkpoint(self.directory)
+            total = 0
+            while True:
+                count, position, applied, more = self._drain_once(position, applied, final)
+                total += count
+                if not more:
+                    break
+            if total:
+                self.committed_options += total
+                logger.info(f"저널 DB 반영: 옵션 {total}개")
+            return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.drain()
+            except Exception as e:
+                # 반영하지 못한 레코드는 저널에 남아 다음 drain에서 다시 시도된다
+                logger.error(f"저널 DB 반영 실패 (다음에 재시도): {e}")
+
+    def start(self) -> None:
+        """백그라운드 drain 스레드 시작."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="journal-committer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """스레드를 멈추고 남은 저널을 모두 반영 (완료 기록 없는 추출 포함)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        get_journal().sync()
+        self.drain(final=True)
@@ -0,0 +1,103 @@
+"""영양소 키워드 사전 및 텍스트 매칭 유틸리티."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 표준 영양소 이름 → 텍스트에서 찾을 동의어/표기 (소문자)
+GOOD_NUTRIENTS: Dict[str, List[str]] = {
+    "fiber": ["fiber", "fibre", "dietary fiber", "dietary fibre"],
+    "beta-glucan": ["beta-glucan", "β-glucan", "beta glucan"],
+    "resistant starch": ["resistant starch"],
+    "protein": ["protein"],
+    "magnesium": ["magnesium"],
+    "potassium": ["potassium"],
+    "iron": ["iron"],
+    "zinc": ["zinc"],
+    "calcium": ["calcium"],
+    "selenium": ["selenium"],
+    "folate": ["folate", "folic acid"],
+    "vitamin B": ["vitamin b", "b vitamins", "thiamine", "riboflavin", "niacin"],
+    "vitamin E": ["vitamin e", "tocopherol", "tocotrienol"],
+    "vitamin D": ["vitamin d"],
+    "vitamin C": ["vitamin c", "ascorbic acid"],
+    "omega-3": ["omega-3", "n-3 fatty acid", "dha", "epa"],
+    "antioxidants": ["antioxidant", "antioxidants"],
+    "polyphenols": ["polyphenol", "polyphenols", "flavonoid", "flavonoids", "phenolic"],
+    "anthocyanins": ["anthocyanin", "anthocyanins"],
+    "gamma-oryzanol": ["oryzanol", "γ-oryzanol"],
+    "GABA": ["gaba", "gamma-aminobutyric acid"],
+    "lignans": ["lignan", "lignans"],
+}
+
+BAD_NUTRIENTS: Dict[str, List[str]] = {
+    "sodium": ["sodium", "salt intake"],
+    "saturated fat": ["saturated fat", "saturated fatty acid"],
+    "trans fat": ["trans fat", "trans fatty acid"],
+    "cholesterol": ["dietary cholesterol", "ldl cholesterol", "cholesterol"],
+    "added sugar": ["added sugar", "sucrose", "sugar-sweetened", "fructose"],
+    "refined carbohydrates": ["refined carbohydrate", "refined grain", "white rice", "refined rice"],
+    "arsenic": ["arsenic"],
+    "cadmium": ["cadmium"],
+    "phytic acid": ["phytic acid", "phytate"],
+    "acrylamide": ["acrylamide"],
+}
+
+_patterns: Dict[str, re.Pattern] = {}
+
+
+def _pattern(name: str, synonyms: List[str]) -> re.Pattern:
+    if name not in _patterns:
+        alternatives = "|".join(re.escape(s) for s in sorted(synonyms, key=len, reverse=True))
+        _patterns[name] = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+    return _patterns[name]
+
+
+def find_nutrients(text: str, lexicon: Dict[str, List[str]], limit: int = 5) -> List[str]:
+    """텍스트에 등장하는 영양소 표준 이름을 처음 등장한 순서대로 반환."""
+    hits = []
+    for name, synonyms in lexicon.items():
+        match = _pattern(name, synonyms).search(text)
+        if match:
+            hits.append((match.start(), name))
+    return [name for _, name in sorted(hits)[:limit]]
+
+
+def count_mentions(text: str) -> int:
+    """텍스트에 등장하는 영양소 표기(좋은/나쁜 전체) 개수."""
+    return sum(
+        len(_pattern(name, synonyms).findall(text))
+        for lexicon in (GOOD_NUTRIENTS, BAD_NUTRIENTS)
+        for name, synonyms in lexicon.items()
+    )
+
+
+def synonyms_for(name: str) -> List[str]:
+    """표준 이름의 표기 목록. 사전에 없으면 이름 자체."""
+    for lexicon in (GOOD_NUTRIENTS, BAD_NUTRIENTS):
+        if name in lexicon:
+            return lexicon[name]
+    return [name.lower()]
+
+
+def locate(text: str, name: str) -> Optional[Tuple[int, int]]:
+    """텍스트에서 영양소가 처음 언급된 (시작, 끝) 문자 위치. 없으면 None."""
+    match = _pattern(name, synonyms_for(name)).search(text)
+    return match.span() if match else None
+
+
+_QUANTITY = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(mg|µg|μg|mcg|g|kg|kcal|kJ|IU|%|mmol|ppm|ppb)(?:\s*/\s*(day|d|kg|100\s*g|g|L))?(?![\w/])",
+    re.IGNORECASE,
+)
+
+
+def find_quantity(text: str, start: int, end: int, window: int = 40) -> Optional[Tuple[float, str]]:
+    """언급 위치(start, end) 주변 window 글자 안에서 가장 가까운 (수치, 단위). 없으면 None."""
+    lo, hi = max(0, start - window), min(len(text), end + window)
+    best = None
+    for match in _QUANTITY.finditer(text, lo, hi):
+        distance = match.start() - end if match.start() >= end else start - match.end()
+        if best is None or abs(distance) < best[0]:
+            unit = match.group(2) + (f"/{match.group(3).replace(' ', '')}" if match.group(3) else "")
+            best = (abs(distance), float(match.group(1).replace(",", ".")), unit)
+    return (best[1], best[2]) if best else None
@@ -0,0 +1,244 @@
+"""LLM 백엔드 구성 모듈.
+
+- ``build_chat_model``: OpenAI 또는 OpenAI 호환 서버(vLLM, llama.cpp 등)용 ``ChatOpenAI`` 생성
+- ``StubNutrientModel``: 네트워크 없이 스키마에 맞는 ``NutrientList``를 돌려주는 가짜 모델
+- ``serve_stub``: 같은 응답을 OpenAI Chat Completions 형식으로 제공하는 HTTP 서버
+
+stub은 입력 텍스트에 대해 결정적인 결과를 내며, 지연 시간과 오류율을 주입할 수 있다.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .config import (
+    OPENAI_API_KEY,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    LLM_BASE_URL,
+    LLM_TIMEOUT,
+    LLM_MAX_RETRIES,
+    STUB_LATENCY_MS,
+    STUB_ERROR_RATE,
+    STUB_SEED,
+)
+from .lexicon import GOOD_NUTRIENTS, BAD_NUTRIENTS, find_nutrients, find_quantity, locate
+
+logger = logging.getLogger(__name__)
+
+
+def build_chat_model(model: Optional[str] = None):
+    """설정에 따라 ChatOpenAI 인스턴스 생성. model을 주면 LLM_MODEL 대신 사용."""
+    from langchain_openai import ChatOpenAI
+
+    if not OPENAI_API_KEY and not LLM_BASE_URL:
+        raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다. (OpenAI 호환 서버는 LLM_BASE_URL 설정)")
+
+    return ChatOpenAI(
+        model=model or LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        # 로컬 호환 서버는 보통 키를 검사하지 않지만 클라이언트는 값이 필요함
+        api_key=OPENAI_API_KEY or "not-needed",
+        base_url=LLM_BASE_URL,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+    )
+
+
+class StubLLMError(Exception):
+    """stub이 주입한 API 오류 (OpenAI 오류처럼 status_code를 가짐)."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"stub 주입 오류 (HTTP {status_code})")
+        self.status_code = status_code
+
+
+def stub_response(text: str) -> Dict[str, list]:
+    """입력 텍스트에서 사전 기반으로 결정적인 NutrientList 형식의 dict 생성."""
+    good = find_nutrients(text, GOOD_NUTRIENTS)
+    bad = find_nutrients(text, BAD_NUTRIENTS)
+    evidence = []
+    for name in good + bad:
+        start, end = locate(text, name)
+        quantity = find_quantity(text, start, end)
+        evidence.append(
+            {
+                "name": name,
+                "confidence": 0.9,
+                "quote": text[start:end],
+                "quantity": quantity[0] if quantity else None,
+                "unit": quantity[1] if quantity else None,
+            }
+        )
+    if not good and not bad:
+        # 실제 모델의 "잡곡 기본 영양소" 추론을 흉내냄 (본문 근거 없음)
+        good = ["fiber"]
+        evidence = [{"name": "fiber", "confidence": 0.3, "quote": None, "quantity": None, "unit": None}]
+    return {"good_nutrients": good, "bad_nutrients": bad, "evidence": evidence}
+
+
+class _FaultInjector:
+    """시드 고정 난수로 지연 시간과 오류를 주입."""
+
+    def __init__(self, latency_ms: float, error_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """(지연 초, 오류 상태 코드 또는 None) 반환. 지연은 평균 latency_ms의 지수분포."""
+        with self._lock:
+            delay = self._rng.expovariate(1000.0 / self.latency_ms) if self.latency_ms > 0 else 0.0
+            status = None
+            if self._rng.random() < self.error_rate:
+                status = self._rng.choice((429, 429, 500, 503))
+        return delay, status
+
+
+class StubNutrientModel:
+    """구조화 출력 LLM을 대신하는 가짜 모델 (``prompt | model`` 체인에 그대로 연결 가능)."""
+
+    def __init__(
+        self,
+        latency_ms: float = STUB_LATENCY_MS,
+        error_rate: float = STUB_ERROR_RATE,
+        seed: int = STUB_SEED,
+    ):
+        self._faults = _FaultInjector(latency_ms, error_rate, seed)
+
+    def _respond(self, prompt: Any, status: Optional[int]):
+        from .nutrient_extractor import NutrientList
+
+        if status is not None:
+            raise StubLLMError(status)
+        # 시스템 프롬프트의 예시 영양소가 섞이지 않도록 마지막(사용자) 메시지만 사용
+        if hasattr(prompt, "to_messages"):
+            text = str(prompt.to_messages()[-1].content)
+        else:
+            text = str(prompt)
+        return NutrientList(**stub_response(text))
+
+    def invoke(self, prompt: Any, config: Optional[Dict] = None, **kwargs):
+        delay, status = self._faults.draw()
+        if delay:
+            time.sleep(delay)
+        return self._respond(prompt, status)
+
+    async def ainvoke(self, prompt: Any, config: Optional[Dict] = None, **kwargs):
+        delay, status = self._faults.draw()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(prompt, status)
+
+    def as_runnable(self):
+        """LangChain Runnable로 감싸서 반환."""
+        from langchain_core.runnables import RunnableLambda
+
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name="StubNutrientModel")
+
+
+# ---------------------------------------------------------------------------
+# OpenAI 호환 stub 서버
+# ---------------------------------------------------------------------------
+
+
+def _completion_body(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Chat Completions 요청에 대한 응답 본문 생성 (tool calling / json_schema 모두 지원)."""
+    messages = request.get("messages", [])
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    user_text = next((str(m.get("content") or "") for m in reversed(messages) if m.get("role") == "user"), prompt)
+    arguments = json.dumps(stub_response(user_text), ensure_ascii=False)
+
+    message: Dict[str, Any] = {"role": "assistant", "content": arguments}
+    finish_reason = "stop"
+    tools = request.get("tools") or []
+    if tools:
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": tools[0]["function"]["name"], "arguments": arguments},
+                }
+            ],
+        }
+        finish_reason = "tool_calls"
+
+    prompt_tokens = len(prompt.split())
+    completion_tokens = len(arguments.split())
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def serve_stub(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    latency_ms: float = STUB_LATENCY_MS,
+    error_rate: float = STUB_ERROR_RATE,
+    seed: int = STUB_SEED,
+) -> ThreadingHTTPServer:
+    """OpenAI 호환 stub 서버 생성 (``serve_forever()``로 실행).
+
+    ``LLM_BASE_URL=http://{host}:{port}/v1``로 파이프라인을 연결할 수 있다.
+    """
+    faults = _FaultInjector(latency_ms, error_rate, seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": LLM_MODEL, "object": "model"}]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            delay, status = faults.draw()
+            if delay:
+                time.sleep(delay)
+            if status is not None:
+                error_type = "rate_limit_error" if status == 429 else "server_error"
+                self._send_json(status, {"error": {"message": "stub 주입 오류", "type": error_type}})
+                return
+            self._send_json(200, _completion_body(request))
+
+        def log_message(self, format, *args):
+            logger.debug("stub-server: " + format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    logger.info(f"stub 서버 준비: http://{host}:{port}/v1 (지연 {latency_ms}ms, 오류율 {error_rate})")
+    return server
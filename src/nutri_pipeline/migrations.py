@@ -0,0 +1,295 @@
+"""DB 스키마 마이그레이션 (버전 관리 러너).
+
+적용한 버전을 ``schema_migrations`` 테이블에 기록하고, 아직 적용하지 않은 마이그레이션을
+버전 순서대로 하나씩 트랜잭션으로 실행한다. 빈 DB는 현재 모델로 테이블을 만든 뒤 최신
+버전으로 기록한다.
+
+스키마를 바꿀 때는 models.py를 고치고, 기존 DB를 같은 상태로 만드는 단계를 ``MIGRATIONS``
+끝에 추가한다. 각 단계는 이미 반영된 부분을 건너뛰도록 작성한다.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from .models import Base, Nutrient, OptionStat, OptionWatermark, Paper, RawMetadataYear, SurveyOption
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaDriftError(RuntimeError):
+    """DB 스키마가 코드(모델/마이그레이션)와 맞지 않음."""
+
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """마이그레이션 1단계."""
+
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_indexes(conn: Connection, table: Table, names: set) -> None:
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+_SQLITE_SURVEY_OPTIONS = """
+CREATE TABLE survey_options_new (
+    id INTEGER NOT NULL PRIMARY KEY,
+    question_id VARCHAR(100) NOT NULL,
+    question_label VARCHAR(200) NOT NULL,
+    option_id VARCHAR(100) NOT NULL,
+    option_label VARCHAR(200) NOT NULL,
+    CONSTRAINT uq_survey_options_question_option UNIQUE (question_id, option_id)
+)"""
+
+_SQLITE_PAPERS = """
+CREATE TABLE papers_new (
+    id INTEGER NOT NULL PRIMARY KEY,
+    question_id VARCHAR(100) NOT NULL,
+    option_id VARCHAR(100) NOT NULL,
+    title VARCHAR(500) NOT NULL,
+    url VARCHAR(1000),
+    source VARCHAR(100) NOT NULL,
+    doi VARCHAR(200),
+    abstract TEXT,
+    raw_metadata JSON,
+    FOREIGN KEY(question_id, option_id) REFERENCES survey_options (question_id, option_id)
+)"""
+
+_PAPER_COLUMNS = "id, option_id, title, url, source, doi, abstract, raw_metadata"
+
+
+def _check_orphan_papers(conn: Connection) -> None:
+    orphans = conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM papers p WHERE NOT EXISTS "
+        "(SELECT 1 FROM survey_options s WHERE s.option_id = p.option_id)"
+    ).scalar()
+    if orphans:
+        raise SchemaDriftError(f"survey_options에 없는 option_id를 가진 논문 {orphans}개: question_id를 채울 수 없습니다")
+
+
+def _rekey_sqlite(conn: Connection) -> None:
+    # SQLite는 제약 변경을 지원하지 않아 새 테이블로 복사 후 이름을 바꾼다. 기존 테이블 이름을 먼저
+    # 바꾸면 nutrients의 외래 키가 바뀐 이름을 따라가므로, 새 테이블을 만들어 옮기는 순서를 지킨다.
+    conn.exec_driver_sql("DROP TABLE IF EXISTS papers_new")
+    conn.exec_driver_sql("DROP TABLE IF EXISTS survey_options_new")
+    conn.exec_driver_sql(_SQLITE_SURVEY_OPTIONS)
+    conn.exec_driver_sql(
+        "INSERT INTO survey_options_new (id, question_id, question_label, option_id, option_label) "
+        "SELECT id, question_id, question_label, option_id, option_label FROM survey_options"
+    )
+    conn.exec_driver_sql(_SQLITE_PAPERS)
+    conn.exec_driver_sql(
+        f"INSERT INTO papers_new (question_id, {_PAPER_COLUMNS}) "
+        f"SELECT s.question_id, {', '.join('p.' + c for c in _PAPER_COLUMNS.split(', '))} "
+        "FROM papers p JOIN survey_options s ON s.option_id = p.option_id"
+    )
+    conn.exec_driver_sql("DROP TABLE papers")
+    conn.exec_driver_sql("DROP TABLE survey_options")
+    conn.exec_driver_sql("ALTER TABLE survey_options_new RENAME TO survey_options")
+    conn.exec_driver_sql("ALTER TABLE papers_new RENAME TO papers")
+
+
+def _rekey_postgresql(conn: Connection) -> None:
+    conn.exec_driver_sql("ALTER TABLE papers ADD COLUMN question_id VARCHAR(100)")
+    conn.exec_driver_sql(
+        "UPDATE papers p SET question_id = s.question_id FROM survey_options s WHERE s.option_id = p.option_id"
+    )
+    conn.exec_driver_sql("ALTER TABLE papers ALTER COLUMN question_id SET NOT NULL")
+    # option_id 단독 unique를 참조하는 외래 키를 먼저 지워야 unique 인덱스를 지울 수 있다
+    for fk in inspect(conn).get_foreign_keys("papers"):
+        if fk["referred_table"] == "survey_options" and fk.get("name"):
+            conn.exec_driver_sql(f'ALTER TABLE papers DROP CONSTRAINT "{fk["name"]}"')
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_survey_options_option_id")
+    conn.exec_driver_sql(
+        "ALTER TABLE survey_options ADD CONSTRAINT uq_survey_options_question_option UNIQUE (question_id, option_id)"
+    )
+    conn.exec_driver_sql(
+        "ALTER TABLE papers ADD FOREIGN KEY (question_id, option_id) "
+        "REFERENCES survey_options (question_id, option_id)"
+    )
+
+
+def _rekey_survey_options(conn: Connection) -> None:
+    """baseline 스키마(option_id 단독 unique, papers.question_id 없음)를 (question_id, option_id) 키로 전환.
+
+    papers.question_id는 survey_options.option_id로 조인해 채운다.
+    """
+    if "question_id" in {column["name"] for column in inspect(conn).get_columns("papers")}:
+        return
+    _check_orphan_papers(conn)
+    if conn.dialect.name == "sqlite":
+        _rekey_sqlite(conn)
+    else:
+        _rekey_postgresql(conn)
+    _create_indexes(conn, SurveyOption.__table__, {"ix_survey_options_option_id"})
+    _create_indexes(conn, Paper.__table__, {"ix_papers_question_id", "ix_papers_option_id", "ix_papers_doi"})
+    logger.info("survey_options/papers를 (question_id, option_id) 키로 전환")
+
+
+def _add_summary_table(conn: Connection) -> None:
+    _rekey_survey_options(conn)
+    OptionStat.__table__.create(conn, checkfirst=True)
+    # 이 단계의 (question_id, option_id) 인덱스는 8단계의 (question_id, option_id, doi)로 대체됨
+    _create_indexes(conn, Nutrient.__table__, {"ix_nutrients_paper_type_name"})
+
+
+def _add_lookup_indexes(conn: Connection) -> None:
+    # 이 단계의 (option_id, doi) 인덱스는 8단계의 (question_id, option_id, doi)로 대체됨
+    _create_indexes(conn, Nutrient.__table__, {"ix_nutrients_name_type"})
+
+
+def _add_year_column(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("papers")}
+    if "year" not in columns:
+        expression = RawMetadataYear().compile(dialect=conn.dialect)
+        # SQLite는 ALTER TABLE로 STORED 생성 컬럼을 추가할 수 없다 (VIRTUAL + 인덱스로 충분)
+        storage = "VIRTUAL" if conn.dialect.name == "sqlite" else "STORED"
+        conn.exec_driver_sql(f"ALTER TABLE papers ADD COLUMN year INTEGER GENERATED ALWAYS AS ({expression}) {storage}")
+    _create_indexes(conn, Paper.__table__, {"ix_papers_year"})
+
+
+def _add_watermark_table(conn: Connection) -> None:
+    OptionWatermark.__table__.create(conn, checkfirst=True)
+
+
+def _add_prompt_token_columns(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("option_stats")}
+    for name in ("prompt_tokens", "prompt_tokens_saved"):
+        if name not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE option_stats ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_evidence_columns(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("nutrients")}
+    for name, sql_type in (
+        ("confidence", "FLOAT"),
+        ("span_start", "INTEGER"),
+        ("span_end", "INTEGER"),
+        ("quantity", "FLOAT"),
+        ("unit", "VARCHAR(20)"),
+    ):
+        if name not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE nutrients ADD COLUMN {name} {sql_type}")
+    _create_indexes(conn, Nutrient.__table__, {"ix_nutrients_name_confidence"})
+
+
+def _add_option_completion_column(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("survey_options")}
+    if "completed_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE survey_options ADD COLUMN completed_at TIMESTAMP")
+        # 이전에는 저장된 옵션을 모두 처리 완료로 봤으므로 기존 옵션은 완료로 기록
+        conn.exec_driver_sql("UPDATE survey_options SET completed_at = CURRENT_TIMESTAMP")
+
+
+# 모델에서 뺀 인덱스 (남아 있으면 스키마 불일치)
+_RETIRED_INDEXES = {"papers": {"ix_papers_question_option", "ix_papers_option_doi"}}
+
+
+def _replace_paper_option_indexes(conn: Connection) -> None:
+    # (question_id, option_id)와 (option_id, doi)를 (question_id, option_id, doi) 하나로 대체
+    for name in sorted(_RETIRED_INDEXES["papers"]):
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    _create_indexes(conn, Paper.__table__, {"ix_papers_question_option_doi"})
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "(question_id, option_id) 키 전환, option_stats 요약 테이블과 covering index", _add_summary_table),
+    Migration(2, "영양소 이름/타입, (option_id, doi) 인덱스", _add_lookup_indexes),
+    Migration(3, "raw_metadata 연도 생성 컬럼", _add_year_column),
+    Migration(4, "옵션별 증분 갱신 기준점 테이블", _add_watermark_table),
+    Migration(5, "option_stats 프롬프트 토큰 컬럼", _add_prompt_token_columns),
+    Migration(6, "영양소 근거 컬럼 (신뢰도, 위치, 수치)과 신뢰도 인덱스", _add_evidence_columns),
+    Migration(7, "survey_options 처리 완료 시각", _add_option_completion_column),
+    Migration(8, "papers (question_id, option_id, doi) 인덱스로 옵션 인덱스 대체", _replace_paper_option_indexes),
+]
+HEAD_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    """DB에 적용된 최신 마이그레이션 버전 (기록이 없으면 0)."""
+    if not inspect(conn).has_table(schema_migrations.name):
+        return 0
+    return conn.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+def _stamp(conn: Connection, migrations: List[Migration]) -> None:
+    now = datetime.now()
+    conn.execute(
+        schema_migrations.insert(),
+        [{"version": m.version, "name": m.name, "applied_at": now} for m in migrations],
+    )
+
+
+def upgrade(engine: Engine) -> List[int]:
+    """적용하지 않은 마이그레이션을 순서대로 실행하고 적용한 버전 목록을 반환."""
+    with engine.begin() as conn:
+        fresh = not inspect(conn).has_table(Paper.__tablename__)
+        schema_migrations.create(conn, checkfirst=True)
+        if fresh:
+            Base.metadata.create_all(conn)
+            _stamp(conn, MIGRATIONS)
+            logger.info(f"새 DB 스키마 생성 (버전 {HEAD_VERSION})")
+            return [m.version for m in MIGRATIONS]
+        version = current_version(conn)
+
+    if version > HEAD_VERSION:
+        raise SchemaDriftError(f"DB 스키마 버전({version})이 코드({HEAD_VERSION})보다 최신입니다. 코드를 업데이트하세요")
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            _stamp(conn, [migration])
+        logger.info(f"마이그레이션 적용: {migration.version} {migration.name}")
+        applied.append(migration.version)
+    return applied
+
+
+def check_schema(engine: Engine) -> None:
+    """DB 스키마가 코드와 일치하는지 확인하고, 다르면 SchemaDriftError."""
+    with engine.connect() as conn:
+        version = current_version(conn)
+        if version != HEAD_VERSION:
+            raise SchemaDriftError(
+                f"DB 스키마 버전 {version}, 코드 버전 {HEAD_VERSION}: `nutri-pipeline migrate`를 실행하세요"
+            )
+
+        inspector = inspect(conn)
+        problems = []
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                problems.append(f"테이블 없음 {table.name}")
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)}
+            problems += [f"컬럼 없음 {table.name}.{c.name}" for c in table.columns if c.name not in columns]
+            for index in table.indexes:
+                if index.name not in indexes:
+                    problems.append(f"인덱스 없음 {index.name}")
+                elif indexes[index.name] != [c.name for c in index.columns]:
+                    problems.append(f"인덱스 컬럼 불일치 {index.name} {indexes[index.name]}")
+            problems += [f"제거된 인덱스 남음 {name}" for name in sorted(_RETIRED_INDEXES.get(table.name, ())) if name in indexes]
+
+    if problems:
+        raise SchemaDriftError("DB 스키마가 모델과 다릅니다: " + ", ".join(problems))
@@ -2,16 +2,23 @@
 
 from sqlalchemy import (
     Column,
+    Computed,
     Integer,
+    Float,
+    DateTime,
+    Index,
     String,
     Text,
     ForeignKey,
     JSON,
     Enum as SQLEnum,
     UniqueConstraint,
+    ForeignKeyConstraint,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import ColumnElement
 import enum
 
 Base = declarative_base()
@@ -24,37 +31,79 @@ class NutrientType(str, enum.Enum):
     BAD = "bad"
 
 
+class RawMetadataYear(ColumnElement):
+    """papers.raw_metadata의 출판 연도 (``year`` 또는 Europe PMC의 ``pubYear``) 추출식.
+
+    생성 컬럼 정의용이며 DB 방언별로 JSON 함수가 달라 컴파일 시점에 SQL을 고른다.
+    """
+
+    inherit_cache = True
+    type = Integer()
+
+
+@compiles(RawMetadataYear, "sqlite")
+def _compile_year_sqlite(element, compiler, **kw):
+    # JSON1: 숫자가 아닌 값은 CAST 결과가 0이므로 NULL로 바꾼다
+    return (
+        "NULLIF(CAST(COALESCE(json_extract(raw_metadata, '$.year'), "
+        "json_extract(raw_metadata, '$.pubYear')) AS INTEGER), 0)"
+    )
+
+
+@compiles(RawMetadataYear, "postgresql")
+def _compile_year_postgresql(element, compiler, **kw):
+    value = "COALESCE(raw_metadata->>'year', raw_metadata->>'pubYear')"
+    return f"CASE WHEN {value} ~ '^[0-9]{{4}}$' THEN ({value})::integer END"
+
+
 class SurveyOption(Base):
     """설문 옵션 테이블."""
 
     __tablename__ = "survey_options"
+    # option_id는 질문마다 중복될 수 있으므로 (question_id, option_id) 복합 유니크
+    __table_args__ = (UniqueConstraint("question_id", "option_id", name="uq_survey_options_question_option"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     question_id = Column(String(100), nullable=False)
     question_label = Column(String(200), nullable=False)
-    option_id = Column(String(100), unique=True, nullable=False, index=True)
+    option_id = Column(String(100), nullable=False, index=True)
     option_label = Column(String(200), nullable=False)
+    # 모든 논문을 처리한 시각. 예산/마감으로 일부만 처리했거나 중단된 옵션은 비어 있어 다시 처리된다
+    completed_at = Column(DateTime, nullable=True)
 
     # 관계
     papers = relationship("Paper", back_populates="option", cascade="all, delete-orphan")
 
     def __repr__(self) -> str:
-        return f"<SurveyOption(option_id='{self.option_id}', option_label='{self.option_label}')>"
+        return f"<SurveyOption(question_id='{self.question_id}', option_id='{self.option_id}', option_label='{self.option_label}')>"
 
 
 class Paper(Base):
     """논문 테이블."""
 
     __tablename__ = "papers"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["question_id", "option_id"],
+            ["survey_options.question_id", "survey_options.option_id"],
+        ),
+        # 옵션별 집계 (stats), 옵션 논문 키 조회, DOI 없는 논문 upsert의 (question_id, option_id) 범위 스캔.
+        # DOI 중복 확인은 ix_papers_doi(unique)가 맡는다
+        Index("ix_papers_question_option_doi", "question_id", "option_id", "doi"),
+        Index("ix_papers_year", "year"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    option_id = Column(String(100), ForeignKey("survey_options.option_id"), nullable=False, index=True)
+    question_id = Column(String(100), nullable=False, index=True)
+    option_id = Column(String(100), nullable=False, index=True)
     title = Column(String(500), nullable=False)
     url = Column(String(1000), nullable=True)
     source = Column(String(100), nullable=False)  # "semantic_scholar", "crossref", "manual"
     doi = Column(String(200), nullable=True, unique=True, index=True)
     abstract = Column(Text, nullable=True)
     raw_metadata = Column(JSON, nullable=True)
+    # raw_metadata에서 파생되는 생성 컬럼 (연도 필터용, 직접 쓰지 않음)
+    year = Column(Integer, Computed(RawMetadataYear(), persisted=True), nullable=True)
 
     # 관계
     option = relationship("SurveyOption", back_populates="papers")
@@ -68,12 +117,26 @@ class Nutrient(Base):
     """영양소 테이블."""
 
     __tablename__ = "nutrients"
+    # 논문별 good/bad 집계를 테이블 접근 없이 인덱스만으로 처리하는 covering index
+    __table_args__ = (
+        Index("ix_nutrients_paper_type_name", "paper_id", "type", "name"),
+        # 영양소 이름별 집계/검색
+        Index("ix_nutrients_name_type", "name", "type"),
+        # 신뢰도 임계값 조회 (예: fiber 중 confidence >= 0.8)
+        Index("ix_nutrients_name_confidence", "name", "confidence"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False, index=True)
+    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False)
     name = Column(String(200), nullable=False)
     type = Column(String(20), nullable=False)  # "good" or "bad"
     extra_info = Column(JSON, nullable=True)
+    # 추출 근거 (모델이 주지 않았으면 NULL)
+    confidence = Column(Float, nullable=True)  # 0~1
+    span_start = Column(Integer, nullable=True)  # 근거 구절의 초록(Paper.abstract) 내 문자 위치
+    span_end = Column(Integer, nullable=True)
+    quantity = Column(Float, nullable=True)  # 섭취량/함량 수치
+    unit = Column(String(20), nullable=True)
 
     # 관계
     paper = relationship("Paper", back_populates="nutrients")
@@ -81,3 +144,48 @@ class Nutrient(Base):
     def __repr__(self) -> str:
         return f"<Nutrient(id={self.id}, name='{self.name}', type='{self.type}')>"
 
+
+
+class OptionStat(Base):
+    """옵션별 요약 통계 테이블.
+
+    옵션 저장 시마다 해당 옵션만 다시 집계해 갱신하므로, status/stats 명령어는
+    papers/nutrients 전체를 스캔하지 않고 이 테이블만 읽는다.
+    """
+
+    __tablename__ = "option_stats"
+
+    question_id = Column(String(100), primary_key=True)
+    option_id = Column(String(100), primary_key=True)
+    papers = Column(Integer, nullable=False, default=0)
+    nutrients = Column(Integer, nullable=False, default=0)
+    good_nutrients = Column(Integer, nullable=False, default=0)
+    bad_nutrients = Column(Integer, nullable=False, default=0)
+    missing_abstracts = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime, nullable=True)
+    last_run_seconds = Column(Float, nullable=True)
+    cache_hits = Column(Integer, nullable=False, default=0)  # 마지막 실행의 임베딩 캐시 적중 수
+    cache_misses = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)  # 마지막 실행의 추출 프롬프트 초록 토큰 수 (압축 후)
+    prompt_tokens_saved = Column(Integer, nullable=False, default=0)  # 초록 압축으로 줄인 토큰 수
+
+    def __repr__(self) -> str:
+        return f"<OptionStat(question_id='{self.question_id}', option_id='{self.option_id}', papers={self.papers})>"
+
+
+class OptionWatermark(Base):
+    """옵션별 증분 갱신 기준점 (high-water mark).
+
+    마지막 갱신 시각 이후로만 provider를 검색하고, 이미 본 논문 키는 다시 추출하지 않는다.
+    """
+
+    __tablename__ = "option_watermarks"
+
+    question_id = Column(String(100), primary_key=True)
+    option_id = Column(String(100), primary_key=True)
+    refreshed_at = Column(DateTime, nullable=False)  # 마지막 갱신 시작 시각
+    max_year = Column(Integer, nullable=True)  # 지금까지 본 논문의 최신 출판 연도
+    seen_keys = Column(JSON, nullable=True)  # 최근 본 논문 키 목록 (paper_key, 최신순 상한 있음)
+
+    def __repr__(self) -> str:
+        return f"<OptionWatermark(question_id='{self.question_id}', option_id='{self.option_id}', refreshed_at={self.refreshed_at})>"
@@ -1,17 +1,60 @@
 """LLM 기반 영양소 추출 모듈 (LangChain v1 사용)."""
 
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import copy
 import logging
-from langchain_openai import ChatOpenAI
+import re
+import threading
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
-from .config import OPENAI_API_KEY, LLM_MODEL, LLM_TEMPERATURE
+from .config import (
+    LLM_BACKEND,
+    LLM_MAX_CONCURRENCY,
+    LLM_ADAPTIVE_CONCURRENCY,
+    LLM_MIN_CONCURRENCY,
+    LLM_INITIAL_CONCURRENCY,
+    LLM_LATENCY_TARGET_MS,
+    LLM_MODEL,
+    LLM_COST_PER_1K_TOKENS,
+    LLM_OUTPUT_COST_PER_1K_TOKENS,
+    PROMPT_TOKEN_BUDGET,
+    EXTRACTION_CASCADE,
+    CASCADE_FAST_MODEL,
+    CASCADE_FAST_COST_PER_1K_TOKENS,
+    CASCADE_FAST_OUTPUT_COST_PER_1K_TOKENS,
+    CASCADE_MIN_CONFIDENCE,
+    CASCADE_MIN_AGREEMENT,
+)
+from .concurrency import AdaptiveLimiter
+from . import profiling
+from .hedging import get_hedger
+from .lexicon import GOOD_NUTRIENTS, BAD_NUTRIENTS, find_nutrients, find_quantity, locate
+from .llm_backend import build_chat_model, StubNutrientModel
+from .prompt_budget import compact_abstract, count_tokens
 
 logger = logging.getLogger(__name__)
 
 
+class NutrientEvidence(BaseModel):
+    """영양소 1개의 근거 (신뢰도, 원문 구절, 수치)."""
+
+    name: str = Field(description="good_nutrients/bad_nutrients에 쓴 영양소 이름 그대로")
+    confidence: float = Field(
+        ge=0.0, le=1.0, description="논문이 이 영양소를 해당 방향(좋음/나쁨)으로 다룬다는 확신도 (0~1)"
+    )
+    quote: Optional[str] = Field(
+        default=None, description="근거가 되는 초록 원문 구절을 그대로 복사 (짧게, 없으면 null)"
+    )
+    quantity: Optional[float] = Field(default=None, description="초록에 나온 섭취량/함량 수치 (없으면 null)")
+    unit: Optional[str] = Field(default=None, description="quantity의 단위 (예: g/day, mg, %)")
+
+
 class NutrientList(BaseModel):
     """영양소 리스트 스키마."""
 
@@ -21,21 +64,230 @@ class NutrientList(BaseModel):
     bad_nutrients: List[str] = Field(
         description="논문에서 언급된 나쁜 영양소 목록 (최대 5개, 실제로 논문에 언급된 것만)"
     )
+    evidence: List[NutrientEvidence] = Field(
+        default_factory=list, description="추출한 영양소마다 1개씩의 근거"
+    )
+
+
+def _evidence_details(result: NutrientList, abstract: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """모델이 준 근거를 {영양소: {confidence, span_start, span_end, quantity, unit}}로 변환.
+
+    span은 원문 초록(압축 전, DB에 저장되는 값)의 문자 위치다. 모델이 준 구절을 원문에서 찾고,
+    없으면 사전 표기로 영양소 언급 위치를 찾는다. 수치가 없으면 언급 주변에서 찾는다.
+    """
+    evidence = {item.name: item for item in result.evidence}
+    details = {}
+    for name in [*result.good_nutrients, *result.bad_nutrients]:
+        item = evidence.get(name)
+        span = None
+        if abstract:
+            if item is not None and item.quote:
+                start = abstract.lower().find(item.quote.strip().lower())
+                if start >= 0:
+                    span = (start, start + len(item.quote.strip()))
+            span = span or locate(abstract, name)
+
+        quantity, unit = (item.quantity, item.unit) if item is not None else (None, None)
+        if quantity is None and span is not None:
+            quantity, unit = find_quantity(abstract, *span) or (None, None)
+        details[name] = {
+            "confidence": item.confidence if item is not None else None,
+            "span_start": span[0] if span else None,
+            "span_end": span[1] if span else None,
+            "quantity": quantity,
+            "unit": unit[:20] if unit else None,
+        }
+    return details
+
+
+# 언급 문장에 있으면 영양소의 방향(좋음/나쁨)이 애매하다고 보는 표현
+_AMBIGUITY_CUES = re.compile(
+    r"\b(?:no|not|neither|nor|without|unclear|inconsistent|conflicting|controversial|mixed|"
+    r"paradox\w*|however|whereas|but)\b",
+    re.IGNORECASE,
+)
+
+
+def _sentence_around(text: str, start: int, end: int) -> str:
+    lo = max(text.rfind(mark, 0, start) for mark in ".!?\n") + 1
+    his = [i for i in (text.find(mark, end) for mark in ".!?\n") if i >= 0]
+    return text[lo : min(his) if his else len(text)]
+
+
+def lexicon_extract(title: str, abstract: Optional[str] = None) -> NutrientList:
+    """키워드 사전만으로 추출 (cascade의 빠른 단계, 비교 기준).
+
+    사전 일치만으로는 방향을 확신할 수 없으므로, 언급 주변에 수치가 있고 같은 문장에 부정/대조
+    표현이 없을 때만 신뢰도 0.85로 두고, 수치가 없으면 0.6, 부정/대조 표현이 있으면 0.5로 둔다.
+    기본 CASCADE_MIN_CONFIDENCE(0.7)에서는 모든 영양소가 수치로 뒷받침될 때만 채택된다.
+    """
+    text = f"{title}\n{abstract}" if abstract else title
+    good = find_nutrients(text, GOOD_NUTRIENTS)
+    bad = find_nutrients(text, BAD_NUTRIENTS)
+    evidence = []
+    for name in good + bad:
+        start, end = locate(text, name)
+        quantity = find_quantity(text, start, end)
+        if _AMBIGUITY_CUES.search(_sentence_around(text, start, end)):
+            confidence = 0.5
+        else:
+            confidence = 0.85 if quantity else 0.6
+        evidence.append(
+            NutrientEvidence(
+                name=name,
+                confidence=confidence,
+                quote=text[start:end],
+                quantity=quantity[0] if quantity else None,
+                unit=quantity[1] if quantity else None,
+            )
+        )
+    return NutrientList(good_nutrients=good, bad_nutrients=bad, evidence=evidence)
+
+
+def _labels(result: NutrientList) -> set:
+    return {("good", name) for name in result.good_nutrients} | {("bad", name) for name in result.bad_nutrients}
+
+
+def agreement(result: NutrientList, reference: NutrientList) -> float:
+    """두 결과의 (방향, 영양소) 집합 Jaccard 일치도. 둘 다 비었으면 1."""
+    a, b = _labels(result), _labels(reference)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def min_confidence(result: NutrientList) -> float:
+    """추출한 영양소 신뢰도의 최솟값 (근거가 없는 영양소는 0)."""
+    confidences = {item.name: item.confidence for item in result.evidence}
+    names = [*result.good_nutrients, *result.bad_nutrients]
+    return min((confidences.get(name, 0.0) for name in names), default=0.0)
+
+
+def _response_usage(message: Any) -> Optional[Tuple[int, int]]:
+    """모델 응답 메시지의 (입력 토큰, 출력 토큰). 사용량 정보가 없으면 None."""
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage")
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    return None
+
+
+def _unpack_output(chain, inputs: Dict[str, str], output: Any) -> Tuple[NutrientList, int, int]:
+    """체인 출력에서 (결과, 입력 토큰, 출력 토큰).
+
+    ``include_raw`` 출력이면 응답의 토큰 사용량을 쓰고, 없으면(stub, 사용량 미제공 서버)
+    포맷한 프롬프트 전체(시스템+사용자 메시지)와 출력 JSON을 직접 센다.
+    """
+    raw = None
+    if isinstance(output, dict):
+        if output.get("parsing_error") is not None:
+            raise output["parsing_error"]
+        raw, output = output.get("raw"), output.get("parsed")
+        if output is None:
+            raise ValueError("구조화 출력 파싱 실패")
+    usage = _response_usage(raw)
+    if usage is None:
+        messages = chain.first.format_messages(**inputs)
+        usage = sum(count_tokens(str(m.content)) for m in messages), count_tokens(output.model_dump_json())
+    return output, *usage
+
+
+@dataclass
+class TierStats:
+    """cascade 단계별 누적 지표. 토큰은 응답의 사용량(없으면 프롬프트와 출력을 직접 센 값)."""
+
+    name: str
+    cost_per_1k_tokens: float = 0.0  # 입력
+    output_cost_per_1k_tokens: float = 0.0
+    papers: int = 0  # 이 단계까지 온 논문 수
+    accepted: int = 0  # 이 단계 결과를 채택한 논문 수
+    calls: int = 0  # 모델/사전 호출 수 (재시도 포함)
+    seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cost(self) -> float:
+        return (
+            self.input_tokens / 1000 * self.cost_per_1k_tokens
+            + self.output_tokens / 1000 * self.output_cost_per_1k_tokens
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "papers": self.papers,
+            "accepted": self.accepted,
+            "hit_rate": self.accepted / self.papers if self.papers else None,
+            "calls": self.calls,
+            "avg_latency_ms": self.seconds / self.calls * 1000 if self.calls else None,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": self.cost,
+        }
+
+    def summary(self) -> str:
+        hit_rate = f"{self.accepted / self.papers:.0%}" if self.papers else "-"
+        latency = f"{self.seconds / self.calls * 1000:.0f}ms" if self.calls else "-"
+        return (
+            f"{self.name}: 논문 {self.papers}건, 채택 {hit_rate}, 평균 지연 {latency}, "
+            f"토큰 입력 {self.input_tokens:,}/출력 {self.output_tokens:,}, 비용 ${self.cost:.4f}"
+        )
 
 
 class NutrientExtractor:
     """영양소 추출기 클래스."""
 
-    def __init__(self):
-        """초기화."""
-        if not OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        cascade: Optional[bool] = None,
+    ):
+        """초기화.
 
-        self.llm = ChatOpenAI(
-            model=LLM_MODEL,
-            temperature=LLM_TEMPERATURE,
-            api_key=OPENAI_API_KEY,
-        )
+        backend가 "stub"이면 네트워크 없이 내장 가짜 모델을 사용한다 (부하 테스트용).
+        cascade이면 빠른 단계(CASCADE_FAST_MODEL)를 먼저 시도하고, 채택 기준을 넘지 못한
+        논문만 LLM_MODEL로 승격한다.
+        """
+        backend = backend or LLM_BACKEND
+        self.max_concurrency = max(1, max_concurrency)
+        self.cascade = EXTRACTION_CASCADE if cascade is None else cascade
+
+        # 초록 압축 (논문당 토큰 예산) 누적 지표. 옵션별 값은 호출 전후 차이로 계산
+        self.token_budget = PROMPT_TOKEN_BUDGET
+        self.prompt_tokens = 0
+        self.prompt_tokens_saved = 0
+        self._stats_lock = threading.Lock()
+
+        # LLM 호출 동시성 제한기 (적응형이 아니면 max_concurrency로 고정)
+        if LLM_ADAPTIVE_CONCURRENCY:
+            self.limiter = AdaptiveLimiter(
+                initial_limit=LLM_INITIAL_CONCURRENCY,
+                min_limit=LLM_MIN_CONCURRENCY,
+                max_limit=self.max_concurrency,
+                latency_target_ms=LLM_LATENCY_TARGET_MS,
+            )
+        else:
+            self.limiter = AdaptiveLimiter(
+                initial_limit=self.max_concurrency,
+                min_limit=self.max_concurrency,
+                max_limit=self.max_concurrency,
+            )
+
+        if backend == "stub":
+            self.llm = None
+            structured_llm = StubNutrientModel().as_runnable()
+        elif backend == "openai":
+            self.llm = build_chat_model()
+            # include_raw: 파싱 결과와 함께 응답 메시지를 받아 실제 토큰 사용량을 기록
+            structured_llm = self.llm.with_structured_output(NutrientList, include_raw=True)
+        else:
+            raise ValueError(f"알 수 없는 LLM_BACKEND: {backend}")
 
         # 구조화된 출력 파서
         self.parser = JsonOutputParser(pydantic_object=NutrientList)
@@ -55,6 +307,7 @@ class NutrientExtractor:
 4. 제목만 있어도 제목에서 추론 가능한 영양소를 추출하세요
 5. 영양소 이름은 영어로 표준 용어를 사용하세요 (예: "fiber" not "fibre", "vitamin C" not "vit C")
 6. 논문이 잡곡(whole grain) 관련이면 일반적인 잡곡 영양소도 포함 가능합니다
+7. evidence: 추출한 영양소마다 confidence(0~1, 초록에 직접 근거가 있으면 높게, 추론이면 낮게), quote(근거가 되는 초록 원문 구절을 고치지 말고 그대로), 수치가 있으면 quantity와 unit을 적으세요
 
 출력 형식은 JSON이어야 합니다.""",
                 ),
@@ -67,47 +320,165 @@ class NutrientExtractor:
 초록:
 {abstract}
 
-JSON 형식으로 good_nutrients와 bad_nutrients를 반환하세요. 각각 최대 5개까지 추출하세요.""",
+JSON 형식으로 good_nutrients, bad_nutrients(각각 최대 5개)와 evidence를 반환하세요.""",
                 ),
             ]
         )
 
+        # 재시도용 프롬프트 (더 적극적인 추출)
+        self.retry_prompt = ChatPromptTemplate.from_messages([
+            ("system", "당신은 영양학 논문 분석 전문가입니다. 제목과 초록에서 영양소를 적극적으로 찾아주세요. 잡곡(whole grain) 논문이라면 일반적인 잡곡 영양소(fiber, B vitamins, minerals 등)도 포함하세요."),
+            ("human", "제목: {title}\n초록: {abstract}\n\n이 논문에서 언급되거나 추론 가능한 영양소를 찾아주세요. good_nutrients, bad_nutrients와 영양소별 evidence(추론한 영양소는 confidence를 낮게)를 JSON 형식으로 반환하세요.")
+        ])
+
         # 체인 구성
-        self.chain = self.prompt | self.llm.with_structured_output(NutrientList)
+        self.chain = self.prompt | structured_llm
+        self.retry_chain = self.retry_prompt | structured_llm
+
+        # cascade 빠른 단계: "lexicon"이면 사전, 아니면 같은 프롬프트의 작은 모델
+        self.fast_chain = None
+        self.tiers: Dict[str, TierStats] = {}
+        if self.cascade:
+            # 사전 단계는 호출 비용이 없어 hedge 대상이 아니다 (_fast_extract에서 직접 실행)
+            self.tiers["fast"] = TierStats(
+                CASCADE_FAST_MODEL, CASCADE_FAST_COST_PER_1K_TOKENS, CASCADE_FAST_OUTPUT_COST_PER_1K_TOKENS
+            )
+            if CASCADE_FAST_MODEL != "lexicon":
+                if backend == "stub":
+                    fast_llm = StubNutrientModel().as_runnable()
+                else:
+                    fast_llm = build_chat_model(CASCADE_FAST_MODEL).with_structured_output(
+                        NutrientList, include_raw=True
+                    )
+                self.fast_chain = self.prompt | fast_llm
+        self.tiers["large"] = TierStats(LLM_MODEL, LLM_COST_PER_1K_TOKENS, LLM_OUTPUT_COST_PER_1K_TOKENS)
+        self._prompt_overhead_tokens: Optional[int] = None
+
+    def _record(self, tier: str, **increments) -> None:
+        with self._stats_lock:
+            stats = self.tiers[tier]
+            for field, value in increments.items():
+                setattr(stats, field, getattr(stats, field) + value)
+
+    def _invoke(self, chain, inputs: Dict[str, str], tier: str = "large"):
+        """동시성 제한기 슬롯 안에서 체인 호출 (지연/오류가 한도 조절에 반영됨).
 
-    def extract_nutrients_from_paper(self, title: str, abstract: Optional[str] = None) -> Dict[str, List[str]]:
-        """논문에서 영양소 추출."""
+        느린 호출에는 모델별 Hedger가 hedge를 보내며, hedge도 슬롯 하나를 쓴다.
+        토큰은 응답을 받은 호출만 입력/출력으로 나눠 기록한다.
+        """
+
+        def attempt():
+            started = time.perf_counter()
+            tokens = {}
+            try:
+                with self.limiter.slot(), profiling.section(f"llm:{tier}"):
+                    output = chain.invoke(inputs)
+                result, tokens["input_tokens"], tokens["output_tokens"] = _unpack_output(chain, inputs, output)
+                return result
+            finally:
+                self._record(tier, calls=1, seconds=time.perf_counter() - started, **tokens)
+
+        return get_hedger(f"llm:{self.tiers[tier].name}").call(attempt)
+
+    def _fast_extract(self, title: str, abstract: str, original: Optional[str]) -> Optional[NutrientList]:
+        """cascade 빠른 단계. 신뢰도/일치도 기준을 넘으면 결과를, 아니면 None(승격)을 반환."""
+        self._record("fast", papers=1)
+        started = time.perf_counter()
+        reference = lexicon_extract(title, original)
+        if self.fast_chain is None:
+            # 사전 단계는 비교할 두 번째 결과가 없어 일치도 검사를 하지 않고, 신뢰도(수치 근거)로만 거른다
+            self._record("fast", calls=1, seconds=time.perf_counter() - started)
+            result, score = reference, 1.0
+        else:
+            try:
+                result = self._invoke(self.fast_chain, {"title": title, "abstract": abstract}, tier="fast")
+            except Exception as e:
+                logger.warning(f"빠른 단계 추출 오류, 승격: {e}")
+                return None
+            score = agreement(result, reference)
+
+        if not _labels(result):
+            return None
+        confidence = min_confidence(result)
+        if confidence < CASCADE_MIN_CONFIDENCE or score < CASCADE_MIN_AGREEMENT:
+            logger.debug(f"승격: '{title[:50]}' (신뢰도 {confidence:.2f}, 일치도 {score:.2f})")
+            return None
+        self._record("fast", accepted=1)
+        return result
+
+    @property
+    def prompt_overhead_tokens(self) -> int:
+        """제목/초록을 뺀 프롬프트 템플릿(시스템+사용자 메시지)의 토큰 수 (예산 추정용)."""
+        if self._prompt_overhead_tokens is None:
+            messages = self.prompt.format_messages(title="", abstract="")
+            self._prompt_overhead_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        return self._prompt_overhead_tokens
+
+    def usage(self) -> Tuple[int, float]:
+        """지금까지 모든 단계의 (입력+출력 토큰, 추정 비용). 예산 계산은 호출 전후 차이로 한다."""
+        with self._stats_lock:
+            return sum(t.tokens for t in self.tiers.values()), sum(t.cost for t in self.tiers.values())
+
+    def tier_summary(self) -> str:
+        """실행 로그용 cascade 단계별 요약."""
+        return "[cascade] " + " / ".join(stats.summary() for stats in self.tiers.values())
+
+    def _compact(self, abstract: str) -> str:
+        """초록을 토큰 예산에 맞게 압축하고 누적 지표에 반영."""
+        if self.token_budget <= 0:
+            return abstract
+        result = compact_abstract(abstract, self.token_budget)
+        with self._stats_lock:
+            self.prompt_tokens += result.tokens
+            self.prompt_tokens_saved += result.saved_tokens
+        if result.saved_tokens:
+            logger.info(
+                f"초록 압축: {result.original_tokens} → {result.tokens} 토큰 (문장 {result.dropped_sentences}개 제외)"
+            )
+        return result.text
+
+    def extract_nutrients_from_paper(self, title: str, abstract: Optional[str] = None) -> Dict[str, Any]:
+        """논문에서 영양소 추출.
+
+        {"good_nutrients": [...], "bad_nutrients": [...], "details": {영양소: 근거}} 반환.
+        근거의 span은 입력 abstract(원문)의 문자 위치다. 같은 논문(제목+초록)을 동시에 추출하면
+        한 번만 호출하고 결과를 나눠 받는다.
+        """
+        flight = get_hedger(f"llm:{self.tiers['large'].name}").single_flight
+        result = flight.do((title, abstract), lambda: self._extract(title, abstract))
+        return copy.deepcopy(result)
+
+    def _extract(self, title: str, abstract: Optional[str]) -> Dict[str, Any]:
+        original = abstract
         # 초록이 없거나 너무 짧으면 제목만으로 추출 시도
         if not abstract or len(abstract.strip()) < 20:
+            original = None
             abstract = "초록 정보 없음. 제목만으로 분석해주세요."
             logger.warning(f"초록이 없거나 짧음. 제목만으로 추출 시도: '{title[:50]}...'")
         else:
+            abstract = self._compact(abstract)
             logger.info(f"영양소 추출 중: '{title[:50]}...'")
 
         try:
-            result = self.chain.invoke({"title": title, "abstract": abstract})
+            result = self._fast_extract(title, abstract, original) if self.cascade else None
+            if result is None:
+                self._record("large", papers=1)
+                result = self._invoke(self.chain, {"title": title, "abstract": abstract})
+
+                # 결과가 비어있으면 재시도 (더 적극적인 프롬프트로)
+                if not result.good_nutrients and not result.bad_nutrients:
+                    logger.warning(f"영양소 추출 실패, 재시도 중: '{title[:50]}...'")
+                    # 재시도 시 더 적극적인 프롬프트 사용
+                    result = self._invoke(self.retry_chain, {"title": title, "abstract": abstract})
+                self._record("large", accepted=1)
 
             # Pydantic 모델을 dict로 변환
             nutrients = {
-                "good_nutrients": result.good_nutrients if result.good_nutrients else [],
-                "bad_nutrients": result.bad_nutrients if result.bad_nutrients else [],
+                "good_nutrients": result.good_nutrients or [],
+                "bad_nutrients": result.bad_nutrients or [],
+                "details": _evidence_details(result, original),
             }
 
-            # 결과가 비어있으면 재시도 (더 적극적인 프롬프트로)
-            if not nutrients["good_nutrients"] and not nutrients["bad_nutrients"]:
-                logger.warning(f"영양소 추출 실패, 재시도 중: '{title[:50]}...'")
-                # 재시도 시 더 적극적인 프롬프트 사용
-                retry_prompt = ChatPromptTemplate.from_messages([
-                    ("system", "당신은 영양학 논문 분석 전문가입니다. 제목과 초록에서 영양소를 적극적으로 찾아주세요. 잡곡(whole grain) 논문이라면 일반적인 잡곡 영양소(fiber, B vitamins, minerals 등)도 포함하세요."),
-                    ("human", "제목: {title}\n초록: {abstract}\n\n이 논문에서 언급되거나 추론 가능한 영양소를 찾아주세요. good_nutrients와 bad_nutrients를 JSON 형식으로 반환하세요.")
-                ])
-                retry_chain = retry_prompt | self.llm.with_structured_output(NutrientList)
-                retry_result = retry_chain.invoke({"title": title, "abstract": abstract})
-                nutrients = {
-                    "good_nutrients": retry_result.good_nutrients if retry_result.good_nutrients else [],
-                    "bad_nutrients": retry_result.bad_nutrients if retry_result.bad_nutrients else [],
-                }
-
             logger.info(
                 f"추출 완료 - 좋은 영양소: {len(nutrients['good_nutrients'])}개, "
                 f"나쁜 영양소: {len(nutrients['bad_nutrients'])}개"
@@ -116,7 +487,34 @@ JSON 형식으로 good_nutrients와 bad_nutrients를 반환하세요. 각각 최
 
         except Exception as e:
             logger.error(f"영양소 추출 중 오류 발생: {e}")
-            return {"good_nutrients": [], "bad_nutrients": []}
+            return {"good_nutrients": [], "bad_nutrients": [], "details": {}}
+
+    async def aextract_nutrients_from_paper(self, title: str, abstract: Optional[str] = None) -> Dict[str, Any]:
+        """논문에서 영양소 추출 (비동기). 이벤트 루프를 막지 않도록 스레드에서 실행."""
+        return await asyncio.to_thread(self.extract_nutrients_from_paper, title, abstract)
+
+    def extract_many(
+        self,
+        papers: List[Tuple[str, Optional[str]]],
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """(제목, 초록) 목록을 동시에 추출. 입력 순서대로 반환.
+
+        실제 동시 요청 수는 limiter가 정하며, 스레드 풀은 상한(max_concurrency)만큼만 만든다.
+        on_result가 있으면 논문 하나가 끝날 때마다 (입력 인덱스, 결과)로 바로 호출한다 (저널 기록용).
+        """
+
+        def run(index: int) -> Dict[str, Any]:
+            result = self.extract_nutrients_from_paper(*papers[index])
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        if self.max_concurrency == 1 or len(papers) <= 1:
+            return [run(index) for index in range(len(papers))]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(papers))) as pool:
+            return list(pool.map(run, range(len(papers))))
 
 
 # 전역 인스턴스 (필요시)
@@ -131,7 +529,7 @@ def get_extractor() -> NutrientExtractor:
     return _extractor_instance
 
 
-def extract_nutrients_from_paper(title: str, abstract: Optional[str] = None) -> Dict[str, List[str]]:
+def extract_nutrients_from_paper(title: str, abstract: Optional[str] = None) -> Dict[str, Any]:
     """논문에서 영양소 추출 (편의 함수)."""
     extractor = get_extractor()
     return extractor.extract_nutrients_from_paper(title, abstract)
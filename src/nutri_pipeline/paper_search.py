@@ -1,10 +1,41 @@
-"""논문 검색 및 메타데이터 수집 모듈."""
+"""논문 검색 및 메타데이터 수집 모듈.
 
-from dataclasses import dataclass
-from typing import List, Dict, Optional
-import httpx
+검색 provider는 ``SearchProvider``를 상속해 ``register_provider``로 등록한다.
+``search_papers_for_option``은 설정된 provider들을 순서대로(fallback) 또는
+모두(merge) 호출하고, 결과를 DOI 기준으로 병합한다. ``since``를 주면 각 provider의
+날짜 필터로 그 이후에 등록된 논문만 검색한다 (증분 갱신).
+"""
+
+import asyncio
+import json
 import logging
-from .config import SEMANTIC_SCHOLAR_API_KEY, CROSSREF_API_EMAIL, MAX_PAPERS_PER_OPTION
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+from .config import (
+    SEMANTIC_SCHOLAR_API_KEY,
+    CROSSREF_API_EMAIL,
+    MAX_PAPERS_PER_OPTION,
+    SEARCH_PROVIDERS,
+    SEARCH_MODE,
+    ABSTRACT_PROVIDERS,
+    SEARCH_FIXTURE_PATH,
+    NCBI_API_KEY,
+    CPU_POOL_MIN_BYTES,
+    CPU_POOL_MIN_PAPERS,
+)
+from .cpu_pool import run_cpu
+from . import profiling
+from .hedging import get_hedger
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +52,476 @@ class PaperCandidate:
     raw_metadata: Optional[Dict] = None
 
 
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """DOI 정규화 (소문자, URL 접두어 제거)."""
+    if not doi:
+        return None
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+def paper_key(paper: PaperCandidate) -> str:
+    """논문 식별 키: DOI가 있으면 DOI, 없으면 정규화된 제목 (병합/캐시 키로 사용)."""
+    doi = normalize_doi(paper.doi)
+    if doi:
+        return f"doi:{doi}"
+    return "title:" + re.sub(r"\W+", " ", paper.title.lower()).strip()
+
+
+def paper_year(paper: PaperCandidate) -> Optional[int]:
+    """raw_metadata의 출판 연도 (``year``, Europe PMC는 ``pubYear``)."""
+    metadata = paper.raw_metadata or {}
+    year = metadata.get("year") or metadata.get("pubYear")
+    try:
+        return int(year) if year else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _strip_markup(text: Optional[str]) -> Optional[str]:
+    """JATS/HTML 태그 제거 (CrossRef 초록 등)."""
+    if not text:
+        return None
+    return BeautifulSoup(text, "html.parser").get_text(" ", strip=True) or None
+
+
+# ---------------------------------------------------------------------------
+# Provider 인터페이스
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """provider 호출 속도 제한 메타데이터."""
+
+    requests_per_second: float
+    max_batch_size: int = 100
+
+
+class RateLimiter:
+    """최소 호출 간격을 보장하는 스레드 안전 limiter."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        """다음 호출 가능 시점까지 대기."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class SearchProvider:
+    """논문 검색 provider 기본 클래스.
+
+    하위 클래스는 ``_search``와 (지원 시) ``_lookup_by_doi``를 구현한다.
+    ``_search``의 ``since``는 provider가 지원하는 가장 가까운 날짜 필터로 옮긴다
+    (연도 단위만 지원하면 연도로). 공개 메서드는 예외를 로깅하고 빈 결과를 반환한다.
+    """
+
+    name: str = ""
+    rate_limit: RateLimit = RateLimit(requests_per_second=1.0)
+    supports_doi_lookup: bool = False
+    timeout: float = 30.0
+
+    def __init__(self):
+        self._limiter = RateLimiter(self.rate_limit.requests_per_second)
+
+    # --- 하위 클래스 구현 지점 ---
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        raise NotImplementedError
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        raise NotImplementedError
+
+    # --- 공개 API ---
+
+    def search(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[PaperCandidate]:
+        """쿼리로 논문 검색. since를 주면 그 날짜 이후 등록/출판된 논문만.
+
+        같은 쿼리의 동시 검색은 하나로 합치고, 느린 응답에는 hedge를 보낸다 (hedging.py).
+        """
+        hedger = get_hedger(f"search:{self.name}")
+
+        def attempt() -> List[PaperCandidate]:
+            with profiling.section(f"search:{self.name}"):
+                return self._search(query, max_results, since)[:max_results]
+
+        try:
+            papers = hedger.single_flight.do((query, max_results, since), lambda: hedger.call(attempt))
+            # 합류한 호출자끼리 같은 객체를 공유하지 않도록 복사 (초록 보강이 객체를 바꿈)
+            papers = [replace(paper) for paper in papers]
+            suffix = f" (since {since.isoformat()})" if since else ""
+            logger.info(f"{self.name}에서 {len(papers)}개 논문 검색: '{query}'{suffix}")
+            return papers
+        except httpx.HTTPError as e:
+            logger.error(f"{self.name} API 오류: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"{self.name} 논문 검색 중 예외 발생: {e}")
+            return []
+
+    def lookup_by_doi(self, dois: List[str]) -> Dict[str, PaperCandidate]:
+        """DOI 목록을 배치로 조회해 {정규화 DOI: 논문} 반환."""
+        if not self.supports_doi_lookup:
+            return {}
+
+        wanted = [d for d in dict.fromkeys(normalize_doi(d) for d in dois) if d]
+        found: Dict[str, PaperCandidate] = {}
+        batch_size = self.rate_limit.max_batch_size
+        for start in range(0, len(wanted), batch_size):
+            batch = wanted[start:start + batch_size]
+            try:
+                with profiling.section(f"doi:{self.name}"):
+                    found_papers = self._lookup_by_doi(batch)
+                for paper in found_papers:
+                    doi = normalize_doi(paper.doi)
+                    if doi in batch:
+                        found[doi] = paper
+            except httpx.HTTPError as e:
+                logger.error(f"{self.name} DOI 조회 API 오류: {e}")
+            except Exception as e:
+                logger.error(f"{self.name} DOI 조회 중 예외 발생: {e}")
+        logger.info(f"{self.name} DOI 배치 조회: {len(found)}/{len(wanted)}개")
+        return found
+
+    async def asearch(self, query: str, max_results: int = 10, since: Optional[date] = None) -> List[PaperCandidate]:
+        """검색 (비동기). 기본 구현은 스레드에서 동기 검색을 실행한다."""
+        return await asyncio.to_thread(self.search, query, max_results, since)
+
+    async def alookup_by_doi(self, dois: List[str]) -> Dict[str, PaperCandidate]:
+        """DOI 배치 조회 (비동기)."""
+        return await asyncio.to_thread(self.lookup_by_doi, dois)
+
+    # --- HTTP 헬퍼 ---
+
+    def _get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> httpx.Response:
+        self._limiter.wait()
+        with httpx.Client(timeout=self.timeout) as client:
+            response = client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            return response
+
+    def _post(self, url: str, json_body: Dict, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> httpx.Response:
+        self._limiter.wait()
+        with httpx.Client(timeout=self.timeout) as client:
+            response = client.post(url, json=json_body, params=params, headers=headers)
+            response.raise_for_status()
+            return response
+
+
+_PROVIDER_FACTORIES: Dict[str, Callable[[], SearchProvider]] = {}
+_provider_instances: Dict[str, SearchProvider] = {}
+
+
+def register_provider(name: str):
+    """provider 클래스(또는 팩토리)를 이름으로 등록하는 데코레이터."""
+
+    def decorator(factory):
+        _PROVIDER_FACTORIES[name] = factory
+        return factory
+
+    return decorator
+
+
+def get_provider(name: str) -> SearchProvider:
+    """등록된 provider 인스턴스 반환 (rate limiter 공유를 위해 캐시)."""
+    if name not in _provider_instances:
+        if name not in _PROVIDER_FACTORIES:
+            raise ValueError(f"알 수 없는 검색 provider: {name} (사용 가능: {', '.join(available_providers())})")
+        _provider_instances[name] = _PROVIDER_FACTORIES[name]()
+    return _provider_instances[name]
+
+
+def available_providers() -> List[str]:
+    """등록된 provider 이름 목록."""
+    return sorted(_PROVIDER_FACTORIES)
+
+
+# ---------------------------------------------------------------------------
+# Provider 구현
+# ---------------------------------------------------------------------------
+
+
+@register_provider("semantic_scholar")
+class SemanticScholarProvider(SearchProvider):
+    """Semantic Scholar Graph API."""
+
+    name = "semantic_scholar"
+    rate_limit = RateLimit(requests_per_second=1.0, max_batch_size=500)
+    supports_doi_lookup = True
+    base_url = "https://api.semanticscholar.org/graph/v1"
+    fields = "title,url,externalIds,abstract,authors,year"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": SEMANTIC_SCHOLAR_API_KEY} if SEMANTIC_SCHOLAR_API_KEY else {}
+
+    def _to_candidate(self, item: Dict) -> PaperCandidate:
+        doi = (item.get("externalIds") or {}).get("DOI") or item.get("doi")
+        return PaperCandidate(
+            title=item.get("title") or "",
+            url=item.get("url") or "",
+            doi=doi,
+            abstract=item.get("abstract"),
+            source=self.name,
+            raw_metadata=item,
+        )
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        params = {"query": query, "limit": min(max_results, 100), "fields": self.fields}
+        if since:
+            params["year"] = f"{since.year}-"  # 연도 단위 필터만 지원
+        data = self._get(f"{self.base_url}/paper/search", params=params, headers=self._headers()).json()
+        return [self._to_candidate(item) for item in data.get("data", [])]
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        body = {"ids": [f"DOI:{doi}" for doi in dois]}
+        data = self._post(
+            f"{self.base_url}/paper/batch", body, params={"fields": self.fields}, headers=self._headers()
+        ).json()
+        return [self._to_candidate(item) for item in data if item]
+
+
+# CrossRef 응답에서 보존할 메타데이터 필드 (reference 목록 등 큰 필드는 버림)
+CROSSREF_METADATA_FIELDS = (
+    "DOI",
+    "URL",
+    "type",
+    "container-title",
+    "publisher",
+    "issued",
+    "subject",
+    "language",
+    "is-referenced-by-count",
+)
+
+
+def project_crossref_item(item: Dict) -> Dict:
+    """CrossRef work 항목을 필요한 필드만 남긴 작은 레코드로 변환."""
+    record = {field: item[field] for field in CROSSREF_METADATA_FIELDS if field in item}
+    record["title"] = " ".join(item.get("title", []))
+    record["abstract"] = _strip_markup(item.get("abstract"))  # 일부 논문만 JATS 초록 제공
+    record["author"] = [
+        " ".join(filter(None, (a.get("given"), a.get("family")))) for a in item.get("author", [])[:20]
+    ]
+    date_parts = (item.get("issued") or {}).get("date-parts") or [[None]]
+    record["year"] = date_parts[0][0] if date_parts[0] else None
+    return record
+
+
+def parse_crossref_response(content: bytes) -> List[Dict]:
+    """CrossRef /works 응답 본문 파싱 + projection (프로세스 풀에서 실행 가능한 순수 함수)."""
+    data = json.loads(content)
+    return [project_crossref_item(item) for item in data.get("message", {}).get("items", [])]
+
+
+@register_provider("crossref")
+class CrossRefProvider(SearchProvider):
+    """CrossRef REST API (polite pool)."""
+
+    name = "crossref"
+    rate_limit = RateLimit(requests_per_second=10.0, max_batch_size=50)
+    supports_doi_lookup = True
+    base_url = "https://api.crossref.org/works"
+
+    def _to_candidate(self, record: Dict) -> PaperCandidate:
+        doi = record.get("DOI")
+        abstract = record.pop("abstract", None)
+        return PaperCandidate(
+            title=record.pop("title", ""),
+            url=f"https://doi.org/{doi}" if doi else "",
+            doi=doi,
+            abstract=abstract,
+            source=self.name,
+            raw_metadata=record,
+        )
+
+    def _fetch(self, params: Dict) -> List[PaperCandidate]:
+        content = self._get(self.base_url, params=params).content
+        # 큰 응답의 JSON 파싱/projection은 프로세스 풀에서 수행하고 작은 레코드만 돌려받음
+        records = run_cpu(parse_crossref_response, content, size=len(content), min_size=CPU_POOL_MIN_BYTES)
+        return [self._to_candidate(record) for record in records]
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        params = {"query": query, "rows": min(max_results, 100), "mailto": CROSSREF_API_EMAIL}
+        if since:
+            # 출판일이 아닌 CrossRef 색인일 기준: 늦게 등록된 과거 논문도 놓치지 않음
+            params["filter"] = f"from-index-date:{since.isoformat()}"
+        return self._fetch(params)
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        return self._fetch(
+            {
+                "filter": ",".join(f"doi:{doi}" for doi in dois),
+                "rows": len(dois),
+                "mailto": CROSSREF_API_EMAIL,
+            }
+        )
+
+
+@register_provider("pubmed")
+class PubMedProvider(SearchProvider):
+    """NCBI PubMed E-utilities (esearch + 배치 efetch)."""
+
+    name = "pubmed"
+    rate_limit = RateLimit(requests_per_second=10.0 if NCBI_API_KEY else 3.0, max_batch_size=200)
+    supports_doi_lookup = True
+    base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+    def _params(self, **params) -> Dict:
+        params["db"] = "pubmed"
+        if NCBI_API_KEY:
+            params["api_key"] = NCBI_API_KEY
+        return params
+
+    def _esearch(self, term: str, retmax: int, since: Optional[date] = None) -> List[str]:
+        params = self._params(term=term, retmax=retmax, retmode="json")
+        if since:
+            # Entrez 등록일(edat) 기준
+            params.update(datetype="edat", mindate=since.strftime("%Y/%m/%d"), maxdate="3000/12/31")
+        data = self._get(f"{self.base_url}/esearch.fcgi", params=params).json()
+        return data.get("esearchresult", {}).get("idlist", [])
+
+    def _efetch(self, pmids: List[str]) -> List[PaperCandidate]:
+        """PMID 목록의 초록을 한 번의 efetch로 가져온다."""
+        if not pmids:
+            return []
+        params = self._params(id=",".join(pmids), retmode="xml", rettype="abstract")
+        root = ET.fromstring(self._get(f"{self.base_url}/efetch.fcgi", params=params).content)
+        return [self._parse_article(article) for article in root.iter("PubmedArticle")]
+
+    def _parse_article(self, article: ET.Element) -> PaperCandidate:
+        pmid = article.findtext(".//MedlineCitation/PMID")
+        title = "".join(article.find(".//ArticleTitle").itertext()) if article.find(".//ArticleTitle") is not None else ""
+
+        sections = []
+        for node in article.findall(".//Abstract/AbstractText"):
+            text = "".join(node.itertext()).strip()
+            label = node.get("Label")
+            sections.append(f"{label}: {text}" if label else text)
+
+        doi = None
+        for node in article.findall(".//PubmedData/ArticleIdList/ArticleId"):
+            if node.get("IdType") == "doi":
+                doi = node.text
+                break
+
+        year = article.findtext(".//JournalIssue/PubDate/Year")
+        return PaperCandidate(
+            title=title.strip(),
+            url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else "",
+            doi=doi,
+            abstract="\n".join(sections) or None,
+            source=self.name,
+            raw_metadata={"pmid": pmid, "doi": doi, "year": int(year) if year and year.isdigit() else None},
+        )
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        return self._efetch(self._esearch(query, max_results, since))
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        term = " OR ".join(f'"{doi}"[doi]' for doi in dois)
+        return self._efetch(self._esearch(term, len(dois)))
+
+
+@register_provider("europe_pmc")
+class EuropePmcProvider(SearchProvider):
+    """Europe PMC REST API (resultType=core로 초록 포함)."""
+
+    name = "europe_pmc"
+    rate_limit = RateLimit(requests_per_second=10.0, max_batch_size=100)
+    supports_doi_lookup = True
+    base_url = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+
+    def _to_candidate(self, item: Dict) -> PaperCandidate:
+        doi = item.get("doi")
+        url = f"https://doi.org/{doi}" if doi else f"https://europepmc.org/article/{item.get('source')}/{item.get('id')}"
+        return PaperCandidate(
+            title=(item.get("title") or "").strip(),
+            url=url,
+            doi=doi,
+            abstract=_strip_markup(item.get("abstractText")),
+            source=self.name,
+            raw_metadata=item,
+        )
+
+    def _query(self, query: str, page_size: int) -> List[PaperCandidate]:
+        params = {"query": query, "format": "json", "resultType": "core", "pageSize": min(page_size, 1000)}
+        data = self._get(self.base_url, params=params).json()
+        return [self._to_candidate(item) for item in data.get("resultList", {}).get("result", [])]
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        if since:
+            # Europe PMC 최초 색인일 기준
+            query = f"({query}) AND FIRST_IDATE:[{since.isoformat()} TO 3000-12-31]"
+        return self._query(query, max_results)
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        return self._query(" OR ".join(f'DOI:"{doi}"' for doi in dois), len(dois))
+
+
+@register_provider("fixture")
+class JsonlFixtureProvider(SearchProvider):
+    """JSONL 파일 기반 오프라인 provider.
+
+    각 줄은 ``PaperCandidate`` 필드(title, url, doi, abstract, source, raw_metadata)를 가진 JSON 객체다.
+    검색은 쿼리 토큰과 제목/초록 토큰의 겹침 수로 순위를 매긴다.
+    """
+
+    name = "fixture"
+    rate_limit = RateLimit(requests_per_second=0.0, max_batch_size=10_000)
+    supports_doi_lookup = True
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        path = path or SEARCH_FIXTURE_PATH
+        if not path:
+            raise ValueError("fixture provider를 사용하려면 SEARCH_FIXTURE_PATH를 설정하세요.")
+
+        self.papers: List[PaperCandidate] = []
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    item.setdefault("url", "")
+                    item.setdefault("source", self.name)
+                    self.papers.append(PaperCandidate(**item))
+
+        self._by_doi = {normalize_doi(p.doi): p for p in self.papers if p.doi}
+        self._tokens = [set(re.findall(r"\w+", f"{p.title} {p.abstract or ''}".lower())) for p in self.papers]
+        # since 필터용 연도 (raw_metadata.year, 없으면 필터에서 제외)
+        self._years = [(p.raw_metadata or {}).get("year") for p in self.papers]
+
+    def _search(self, query: str, max_results: int, since: Optional[date] = None) -> List[PaperCandidate]:
+        query_tokens = set(re.findall(r"\w+", query.lower()))
+        scored = [
+            (len(query_tokens & tokens), i)
+            for i, tokens in enumerate(self._tokens)
+            if since is None or (self._years[i] or 0) >= since.year
+        ]
+        ranked = sorted((s for s in scored if s[0] > 0), key=lambda s: (-s[0], s[1]))
+        return [self.papers[i] for _, i in ranked[:max_results]]
+
+    def _lookup_by_doi(self, dois: List[str]) -> List[PaperCandidate]:
+        return [self._by_doi[doi] for doi in dois if doi in self._by_doi]
+
+
+# ---------------------------------------------------------------------------
+# 검색 쿼리 및 병합
+# ---------------------------------------------------------------------------
+
+
 def build_search_query(option: Dict[str, str]) -> str:
     """옵션 정보를 기반으로 검색 쿼리 생성."""
     option_label = option.get("option_label", "")
@@ -63,103 +564,116 @@ def build_search_query(option: Dict[str, str]) -> str:
     return query
 
 
-def search_semantic_scholar(query: str, max_results: int = 10) -> List[PaperCandidate]:
-    """Semantic Scholar API를 사용한 논문 검색."""
-    url = "https://api.semanticscholar.org/graph/v1/paper/search"
-    headers = {}
-    if SEMANTIC_SCHOLAR_API_KEY:
-        headers["x-api-key"] = SEMANTIC_SCHOLAR_API_KEY
-
-    params = {
-        "query": query,
-        "limit": min(max_results, 100),
-        "fields": "title,url,doi,abstract,authors,year",
-    }
+def merge_by_doi(result_lists: List[List[PaperCandidate]], max_results: int) -> List[PaperCandidate]:
+    """여러 provider 결과를 DOI(없으면 제목) 기준으로 병합.
 
-    try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+    먼저 등장한 provider의 레코드를 기준으로 하고, 비어 있는 필드(DOI, 초록, URL)는
+    다른 provider 값으로 채운다. 순위는 provider 내 최고 순위, 그다음 발견된 provider 수 순이다.
+    """
+    merged: Dict[str, PaperCandidate] = {}
+    best_rank: Dict[str, int] = {}
+    hits: Dict[str, int] = {}
 
-        papers = []
-        for item in data.get("data", [])[:max_results]:
-            paper = PaperCandidate(
-                title=item.get("title", ""),
-                url=item.get("url", ""),
-                doi=item.get("doi"),
-                abstract=item.get("abstract"),
-                source="semantic_scholar",
-                raw_metadata=item,
-            )
-            papers.append(paper)
-
-        logger.info(f"Semantic Scholar에서 {len(papers)}개 논문 검색: '{query}'")
-        return papers
-
-    except httpx.HTTPError as e:
-        logger.error(f"Semantic Scholar API 오류: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"논문 검색 중 예외 발생: {e}")
-        return []
+    for papers in result_lists:
+        for rank, paper in enumerate(papers):
+            key = paper_key(paper)
+            if key not in merged:
+                merged[key] = PaperCandidate(**vars(paper))
+                best_rank[key] = rank
+                hits[key] = 1
+                continue
+
+            existing = merged[key]
+            existing.doi = existing.doi or paper.doi
+            existing.abstract = existing.abstract or paper.abstract
+            existing.url = existing.url or paper.url
+            best_rank[key] = min(best_rank[key], rank)
+            hits[key] += 1
+
+    order = sorted(merged, key=lambda k: (best_rank[k], -hits[k]))
+    return [merged[key] for key in order[:max_results]]
+
+
+def _merge(result_lists: List[List[PaperCandidate]], max_results: int) -> List[PaperCandidate]:
+    """옵션 1개의 검색 결과 병합/중복 제거. 후보가 많으면 프로세스 풀에서 한 번에 처리."""
+    size = sum(len(papers) for papers in result_lists)
+    return run_cpu(merge_by_doi, result_lists, max_results, size=size, min_size=CPU_POOL_MIN_PAPERS)
+
+
+def enrich_abstracts(papers: List[PaperCandidate], provider_names: Optional[List[str]] = None) -> int:
+    """초록이 없는 논문을 DOI 배치 조회로 보강. 보강된 논문 수 반환."""
+    provider_names = ABSTRACT_PROVIDERS if provider_names is None else provider_names
+    enriched = 0
+    for name in provider_names:
+        missing = {normalize_doi(p.doi): p for p in papers if p.doi and not p.abstract}
+        if not missing:
+            break
+        for doi, found in get_provider(name).lookup_by_doi(list(missing)).items():
+            if found.abstract and doi in missing:
+                missing[doi].abstract = found.abstract
+                enriched += 1
+    if enriched:
+        logger.info(f"초록 보강 완료: {enriched}개")
+    return enriched
+
+
+def search_semantic_scholar(query: str, max_results: int = 10) -> List[PaperCandidate]:
+    """Semantic Scholar API를 사용한 논문 검색."""
+    return get_provider("semantic_scholar").search(query, max_results)
 
 
 def search_crossref(query: str, max_results: int = 10) -> List[PaperCandidate]:
     """CrossRef API를 사용한 논문 검색 (대체 옵션)."""
-    url = "https://api.crossref.org/works"
-    params = {
-        "query": query,
-        "rows": min(max_results, 100),
-        "mailto": CROSSREF_API_EMAIL,
-    }
+    return get_provider("crossref").search(query, max_results)
 
-    try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
 
-        papers = []
-        for item in data.get("message", {}).get("items", [])[:max_results]:
-            # DOI URL 생성
-            doi = item.get("DOI")
-            url_str = f"https://doi.org/{doi}" if doi else ""
-
-            paper = PaperCandidate(
-                title=" ".join(item.get("title", [])),
-                url=url_str,
-                doi=doi,
-                abstract=None,  # CrossRef는 초록을 직접 제공하지 않음
-                source="crossref",
-                raw_metadata=item,
-            )
-            papers.append(paper)
-
-        logger.info(f"CrossRef에서 {len(papers)}개 논문 검색: '{query}'")
-        return papers
-
-    except httpx.HTTPError as e:
-        logger.error(f"CrossRef API 오류: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"논문 검색 중 예외 발생: {e}")
-        return []
-
-
-def search_papers_for_option(option: Dict[str, str], max_results: int = None) -> List[PaperCandidate]:
-    """옵션에 대한 관련 논문 검색."""
+def search_papers_for_option(
+    option: Dict[str, str], max_results: int = None, since: Optional[date] = None
+) -> List[PaperCandidate]:
+    """옵션에 대한 관련 논문 검색. since를 주면 그 이후 등록된 논문만 (증분 갱신)."""
     if max_results is None:
         max_results = MAX_PAPERS_PER_OPTION
 
     query = build_search_query(option)
     logger.info(f"옵션 '{option.get('option_label')}'에 대한 논문 검색: '{query}'")
 
-    # Semantic Scholar 우선 사용, 실패 시 CrossRef 시도
-    papers = search_semantic_scholar(query, max_results)
-    if not papers:
-        logger.warning("Semantic Scholar 검색 실패, CrossRef 시도...")
-        papers = search_crossref(query, max_results)
+    if SEARCH_MODE == "merge":
+        papers = _merge([get_provider(name).search(query, max_results, since) for name in SEARCH_PROVIDERS], max_results)
+    else:
+        # 앞 provider가 결과를 못 내면 다음 provider 시도
+        papers = []
+        for name in SEARCH_PROVIDERS:
+            papers = get_provider(name).search(query, max_results, since)
+            if papers:
+                break
+            logger.warning(f"{name} 검색 결과 없음, 다음 provider 시도...")
+        # provider 안에서 같은 DOI/제목이 중복된 결과도 제거
+        papers = _merge([papers], max_results)
 
+    enrich_abstracts(papers)
     return papers
 
+
+async def search_papers_for_option_async(
+    option: Dict[str, str], max_results: int = None, since: Optional[date] = None
+) -> List[PaperCandidate]:
+    """옵션에 대한 관련 논문 검색 (비동기, merge 모드에서는 provider를 동시에 호출)."""
+    if max_results is None:
+        max_results = MAX_PAPERS_PER_OPTION
+
+    query = build_search_query(option)
+    if SEARCH_MODE == "merge":
+        results = await asyncio.gather(
+            *(get_provider(name).asearch(query, max_results, since) for name in SEARCH_PROVIDERS)
+        )
+        papers = await asyncio.to_thread(_merge, list(results), max_results)
+    else:
+        papers = []
+        for name in SEARCH_PROVIDERS:
+            papers = await get_provider(name).asearch(query, max_results, since)
+            if papers:
+                break
+        papers = await asyncio.to_thread(_merge, [papers], max_results)
+
+    await asyncio.to_thread(enrich_abstracts, papers)
+    return papers
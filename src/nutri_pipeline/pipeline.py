@@ -3,58 +3,133 @@
 import logging
 from typing import Optional, List
 
-from .config import GRAPH_RECURSION_LIMIT
+from .config import GRAPH_RECURSION_LIMIT, JOURNAL_ENABLED
+from . import hedging
 from .db import init_db
 from .graph import build_graph, PipelineState
+from .scheduler import RunBudget
 
 logger = logging.getLogger(__name__)
 
 
-def run_full_pipeline(
-    option_ids: Optional[List[str]] = None,
-    skip_processed: bool = True,
-) -> None:
-    """전체 파이프라인 실행."""
-    logger.info("파이프라인 시작")
+def _start_committer():
+    """저널 committer 시작. 이전 실행이 남긴 저널을 먼저 DB에 반영한다 (저널을 끄면 None)."""
+    if not JOURNAL_ENABLED:
+        return None
+    from .journal import JournalCommitter
 
-    # DB 초기화
-    init_db()
+    committer = JournalCommitter()
+    recovered = committer.drain(final=True)
+    if recovered:
+        logger.info(f"이전 실행의 저널 반영: 옵션 {recovered}개")
+    committer.start()
+    return committer
+
+
+def _stop_committer(committer) -> None:
+    """남은 저널을 모두 DB에 반영. 실패해도 저널은 남아 다음 실행이나 `replay`로 반영된다."""
+    if committer is None:
+        return
+    try:
+        committer.stop()
+    except Exception as e:
+        logger.error(f"저널 DB 반영 실패: {e} (`nutri-pipeline replay`로 다시 반영하세요)")
+
+
+def _start_profiler():
+    from .profiling import Profiler
 
-    # 그래프 빌드
-    graph = build_graph()
+    profiler = Profiler()
+    profiler.start()
+    logger.info(f"프로파일링 시작: {profiler.run_dir}")
+    return profiler
 
-    # 초기 상태
+
+def _stop_profiler(profiler) -> None:
+    if profiler is None:
+        return
+    run_dir = profiler.stop()
+    logger.info(f"프로파일 결과: {run_dir} (summary.txt, flame-*.svg, stacks-*.txt, alloc-*.txt)")
+
+
+def _build_initial_state(
+    option_ids: Optional[List[str]],
+    skip_processed: bool,
+    incremental: bool = False,
+    budget: Optional[RunBudget] = None,
+    prioritize: bool = False,
+) -> PipelineState:
+    """그래프 초기 상태 구성. 증분 갱신이면 처리된 옵션도 건너뛰지 않는다.
+
+    예산(토큰/비용/마감)이 있으면 가장 가치 있는 작업부터 쓰도록 우선순위 정렬도 켠다.
+    """
     initial_state: PipelineState = {
-        "options": [],
-        "processed_option_ids": [],
+        "options": None,
+        "processed_option_keys": [],
+        "next_option_index": 0,
         "current_option": None,
         "papers": [],
         "extracted_data": [],
+        "option_metrics": {},
+        "incremental": incremental,
+        "budget": budget,
+        "prioritize": prioritize or (budget is not None and budget.bounded),
         "logs": [],
     }
 
-    # 특정 옵션만 처리하는 경우
+    # 특정 옵션만 처리하는 경우 ("option_id" 또는 "question_id:option_id")
     if option_ids:
-        from .survey_options import get_all_options
+        from .survey_options import get_registry
 
-        all_options = get_all_options()
-        filtered_options = [opt for opt in all_options if opt["option_id"] in option_ids]
+        filtered_options = get_registry().resolve(option_ids)
+        if not filtered_options:
+            raise ValueError(f"지정한 옵션을 하나도 찾을 수 없습니다: {', '.join(option_ids)}")
         initial_state["options"] = filtered_options
         logger.info(f"특정 옵션만 처리: {len(filtered_options)}개")
 
     # 이미 처리된 옵션 건너뛰기
-    if skip_processed:
-        from .db import get_db_session
-        from .models import SurveyOption
+    if skip_processed and not incremental:
+        from .db import load_processed_option_keys
+
+        processed_keys = load_processed_option_keys()
+        initial_state["processed_option_keys"] = processed_keys
+        logger.info(f"이미 처리된 옵션 {len(processed_keys)}개 건너뛰기")
+
+    return initial_state
 
-        with get_db_session() as session:
-            processed = session.query(SurveyOption.option_id).all()
-            processed_ids = [row[0] for row in processed]
-            initial_state["processed_option_ids"] = processed_ids
-            logger.info(f"이미 처리된 옵션 {len(processed_ids)}개 건너뛰기")
 
-    # 그래프 실행
+def run_full_pipeline(
+    option_ids: Optional[List[str]] = None,
+    skip_processed: bool = True,
+    incremental: bool = False,
+    budget: Optional[RunBudget] = None,
+    prioritize: bool = False,
+    profile: bool = False,
+) -> None:
+    """전체 파이프라인 실행. incremental이면 옵션별 마지막 갱신 이후의 새 논문만 처리.
+
+    budget을 주면 한도 안에서 기대 가치가 높은 옵션/논문부터 처리하고 멈춘다.
+    profile이면 노드별 프로파일을 PROFILE_DIR의 실행 디렉터리에 남긴다.
+    """
+    logger.info("파이프라인 시작")
+
+    # DB 초기화
+    init_db()
+
+    # 프로파일러 (노드를 감싸므로 그래프 빌드 전에 준비)
+    profiler = _start_profiler() if profile else None
+    committer = None
     try:
+        # 그래프 빌드
+        graph = build_graph(profiler)
+
+        # 저널 committer (이전 실행의 미반영 결과를 먼저 반영해 처리된 옵션에 포함)
+        committer = _start_committer()
+
+        # 초기 상태
+        initial_state = _build_initial_state(option_ids, skip_processed, incremental, budget, prioritize)
+
+        # 그래프 실행
         logger.info("그래프 실행 시작...")
         final_state = graph.invoke(
             initial_state,
@@ -66,17 +141,28 @@ def run_full_pipeline(
         logger.info("=== 파이프라인 실행 로그 ===")
         for log in logs:
             logger.info(log)
+        for log in hedging.summaries():
+            logger.info(log)
+        if budget is not None and budget.bounded:
+            logger.info(budget.summary())
 
         logger.info("파이프라인 완료")
 
     except Exception as e:
         logger.error(f"파이프라인 실행 중 오류: {e}", exc_info=True)
         raise
+    finally:
+        _stop_committer(committer)
+        _stop_profiler(profiler)
 
 
 async def run_full_pipeline_async(
     option_ids: Optional[List[str]] = None,
     skip_processed: bool = True,
+    incremental: bool = False,
+    budget: Optional[RunBudget] = None,
+    prioritize: bool = False,
+    profile: bool = False,
 ) -> None:
     """전체 파이프라인 실행 (비동기 버전)."""
     logger.info("파이프라인 시작 (비동기)")
@@ -84,41 +170,20 @@ async def run_full_pipeline_async(
     # DB 초기화
     init_db()
 
-    # 그래프 빌드
-    graph = build_graph()
-
-    # 초기 상태
-    initial_state: PipelineState = {
-        "options": [],
-        "processed_option_ids": [],
-        "current_option": None,
-        "papers": [],
-        "extracted_data": [],
-        "logs": [],
-    }
-
-    # 특정 옵션만 처리하는 경우
-    if option_ids:
-        from .survey_options import get_all_options
-
-        all_options = get_all_options()
-        filtered_options = [opt for opt in all_options if opt["option_id"] in option_ids]
-        initial_state["options"] = filtered_options
-        logger.info(f"특정 옵션만 처리: {len(filtered_options)}개")
+    # 프로파일러 (노드를 감싸므로 그래프 빌드 전에 준비)
+    profiler = _start_profiler() if profile else None
+    committer = None
+    try:
+        # 그래프 빌드
+        graph = build_graph(profiler)
 
-    # 이미 처리된 옵션 건너뛰기
-    if skip_processed:
-        from .db import get_db_session
-        from .models import SurveyOption
+        # 저널 committer (이전 실행의 미반영 결과를 먼저 반영해 처리된 옵션에 포함)
+        committer = _start_committer()
 
-        with get_db_session() as session:
-            processed = session.query(SurveyOption.option_id).all()
-            processed_ids = [row[0] for row in processed]
-            initial_state["processed_option_ids"] = processed_ids
-            logger.info(f"이미 처리된 옵션 {len(processed_ids)}개 건너뛰기")
+        # 초기 상태
+        initial_state = _build_initial_state(option_ids, skip_processed, incremental, budget, prioritize)
 
-    # 그래프 실행 (비동기)
-    try:
+        # 그래프 실행 (비동기)
         logger.info("그래프 실행 시작 (비동기)...")
         final_state = await graph.ainvoke(
             initial_state,
@@ -130,10 +195,17 @@ async def run_full_pipeline_async(
         logger.info("=== 파이프라인 실행 로그 ===")
         for log in logs:
             logger.info(log)
+        for log in hedging.summaries():
+            logger.info(log)
+        if budget is not None and budget.bounded:
+            logger.info(budget.summary())
 
         logger.info("파이프라인 완료")
 
     except Exception as e:
         logger.error(f"파이프라인 실행 중 오류: {e}", exc_info=True)
         raise
+    finally:
+        _stop_committer(committer)
+        _stop_profiler(profiler)
 
@@ -0,0 +1,331 @@
+"""실행 프로파일링 (run --profile): 노드별 샘플링 프로파일과 메모리 할당 리포트.
+
+- 샘플러 스레드가 ``PROFILE_SAMPLE_INTERVAL_MS``마다 모든 스레드의 스택(``sys._current_frames``)을
+  수집해 그 시점에 실행 중인 그래프 노드에 귀속시킨다. 추출/검색 스레드 풀의 스택도 함께 잡히므로
+  JSON 파싱, ORM, LangChain 체인, 네트워크 대기가 어느 노드에서 시간을 쓰는지 나뉘어 보인다.
+  벽시계 기준이라 I/O 대기도 포함되며, 일감을 기다리는 풀 스레드는 제외한다.
+- 외부 호출(검색 provider, LLM, 저널 DB 반영)은 ``section()``으로 감싸 호출 수/시간을 세고,
+  스택에 ``[search:pubmed]`` 같은 표시 프레임을 넣는다.
+- tracemalloc이 켜져 있으면 노드마다 할당 증가량과 최대 사용량을 세고, 노드별 처음
+  ``PROFILE_ALLOC_SNAPSHOTS``회 호출은 전후 스냅샷 차이를 소스 줄 단위로 누적한다
+  (스냅샷은 힙 크기에 비례해 느리므로 옵션마다 반복되는 노드 전체에 찍지 않는다).
+
+실행 디렉터리(``PROFILE_DIR/<시각>``)에 다음을 쓴다.
+
+- ``stacks-<노드>.txt``: collapsed stack (``a;b;c 횟수``, flamegraph.pl/speedscope 호환)
+- ``flame-<노드>.svg``: flamegraph SVG (``all``은 전체)
+- ``alloc-<노드>.txt``: 할당 증가가 큰 소스 줄 상위 ``PROFILE_TOP_ALLOCATIONS``개
+- ``summary.txt``: 노드/외부 호출별 횟수, 시간, 샘플 수
+"""
+
+import html
+import linecache
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import (
+    PROFILE_DIR,
+    PROFILE_SAMPLE_INTERVAL_MS,
+    PROFILE_TRACEMALLOC,
+    PROFILE_ALLOC_SNAPSHOTS,
+    PROFILE_TOP_ALLOCATIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# 노드 밖(그래프 전이 등)에서 잡힌 샘플
+OUTSIDE_NODES = "graph"
+# 일감을 기다리는 상태로 보고 샘플에서 뺄 (함수, 파일) — threading/queue 프레임 바로 바깥 기준
+_IDLE_FRAMES = {("_worker", "thread.py"), ("_run", "journal.py")}
+_WAIT_FILES = {"threading.py", "queue.py"}
+_IGNORED_ALLOCATION_FILES = {tracemalloc.__file__, __file__, "<unknown>"}
+
+_active: Optional["Profiler"] = None
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class _Timing:
+    __slots__ = ("calls", "seconds", "allocated", "peak")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.allocated = 0  # 노드 실행 전후 traced 메모리 증가 합계 (바이트)
+        self.peak = 0  # 노드 실행 중 traced 메모리 최대값 (바이트)
+
+
+class Profiler:
+    """한 번의 실행을 프로파일링. ``start()``/``stop()`` 사이의 노드와 외부 호출을 기록한다."""
+
+    def __init__(
+        self,
+        run_dir: Optional[Path] = None,
+        interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+        trace_memory: bool = PROFILE_TRACEMALLOC,
+        alloc_snapshots: int = PROFILE_ALLOC_SNAPSHOTS,
+        top_allocations: int = PROFILE_TOP_ALLOCATIONS,
+    ):
+        self.run_dir = Path(run_dir or PROFILE_DIR / datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.interval = interval_ms / 1000.0
+        self.trace_memory = trace_memory
+        self.alloc_snapshots = alloc_snapshots
+        self.top_allocations = top_allocations
+
+        self._lock = threading.Lock()
+        self._node: Optional[str] = None
+        self._sections: Dict[int, str] = {}  # 스레드 ident -> 진행 중인 외부 호출
+        self._stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._nodes: Dict[str, _Timing] = defaultdict(_Timing)
+        self._calls: Dict[str, _Timing] = defaultdict(_Timing)
+        self._allocations: Dict[str, Counter] = defaultdict(Counter)  # 노드 -> {(파일, 줄): 증가 바이트}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._started_tracing = False  # 이 프로파일러가 tracemalloc을 켰는지 (켠 경우만 끈다)
+        self.samples = 0
+
+    # --- 수집 ---
+
+    def _is_idle(self, frames: List) -> bool:
+        for code in frames:
+            name = Path(code.co_filename).name
+            if name not in _WAIT_FILES:
+                return (code.co_name, name) in _IDLE_FRAMES
+        return False
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        node = self._node or OUTSIDE_NODES
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if self._is_idle(codes):
+                continue
+            stack = [names.get(ident, f"thread-{ident}")]
+            section = self._sections.get(ident)
+            if section:
+                stack.append(f"[{section}]")
+            stack += [_frame_label(code) for code in reversed(codes)]
+            with self._lock:
+                self._stacks[node][";".join(stack)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        global _active
+        self._started = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        _active = self
+
+    def stop(self) -> Path:
+        """수집을 멈추고 리포트를 쓴 뒤 실행 디렉터리를 반환."""
+        global _active
+        _active = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._write(time.perf_counter() - self._started, peak)
+        return self.run_dir
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot()
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """그래프 노드 함수를 감싸 실행 시간, 샘플 귀속, 할당 차이를 기록."""
+
+        @wraps(fn)
+        def wrapped(state):
+            timing = self._nodes[name]
+            tracing = self.trace_memory and tracemalloc.is_tracing()
+            before = self._snapshot() if tracing and timing.calls < self.alloc_snapshots else None
+            if tracing:
+                tracemalloc.reset_peak()
+                memory = tracemalloc.get_traced_memory()[0]
+            self._node = name
+            started = time.perf_counter()
+            try:
+                return fn(state)
+            finally:
+                elapsed = time.perf_counter() - started
+                self._node = None
+                timing.calls += 1
+                timing.seconds += elapsed
+                if tracing:
+                    current, peak = tracemalloc.get_traced_memory()
+                    timing.allocated += current - memory
+                    timing.peak = max(timing.peak, peak)
+                if before is not None:
+                    for diff in self._snapshot().compare_to(before, "lineno"):
+                        frame = diff.traceback[0]
+                        # 프로파일러 자신과 import 시스템의 할당은 제외 (filter_traces는 느려서 여기서 거름)
+                        if frame.filename not in _IGNORED_ALLOCATION_FILES and not frame.filename.startswith("<frozen"):
+                            self._allocations[name][(frame.filename, frame.lineno)] += diff.size_diff
+
+        return wrapped
+
+    def record_call(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._calls[name]
+            timing.calls += 1
+            timing.seconds += seconds
+
+    # --- 리포트 ---
+
+    def _write(self, elapsed: float, peak: Optional[int]) -> None:
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        total: Counter = Counter()
+        for node, stacks in self._stacks.items():
+            total.update({f"{node};{stack}": count for stack, count in stacks.items()})
+            self._write_stacks(node, stacks)
+        self._write_stacks("all", total)
+        for node, allocations in self._allocations.items():
+            self._write_allocations(node, allocations)
+        self._write_summary(elapsed, peak)
+
+    def _write_stacks(self, name: str, stacks: Counter) -> None:
+        lines = [f"{stack} {count}" for stack, count in sorted(stacks.items())]
+        (self.run_dir / f"stacks-{name}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        (self.run_dir / f"flame-{name}.svg").write_text(
+            render_flamegraph(stacks, title=f"{name} ({sum(stacks.values())} samples)"), encoding="utf-8"
+        )
+
+    def _write_allocations(self, name: str, allocations: Counter) -> None:
+        calls = min(self._nodes[name].calls, self.alloc_snapshots)
+        lines = [f"# {name}: 노드 실행 전후 할당 증가 상위 {self.top_allocations}개 (처음 {calls}회 호출 누적)"]
+        for (filename, lineno), size in allocations.most_common(self.top_allocations):
+            if size <= 0:
+                break
+            source = linecache.getline(filename, lineno).strip()
+            lines.append(f"{size / 1024:10.1f} KiB  {filename}:{lineno}  {source}")
+        (self.run_dir / f"alloc-{name}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _write_summary(self, elapsed: float, peak: Optional[int]) -> None:
+        lines = [f"실행 시간 {elapsed:.2f}s, 샘플 {self.samples}회 (간격 {self.interval * 1000:g}ms)"]
+        if peak is not None:
+            lines.append(f"tracemalloc 최대 사용량 {peak / 1e6:.1f}MB")
+        lines += ["", f"{'node':<24}{'calls':>8}{'seconds':>10}{'samples':>10}{'alloc MB':>10}{'peak MB':>10}"]
+        for name, timing in sorted(self._nodes.items(), key=lambda item: -item[1].seconds):
+            samples = sum(self._stacks.get(name, Counter()).values())
+            if peak is not None:
+                memory = f"{timing.allocated / 1e6:>10.2f}{timing.peak / 1e6:>10.2f}"
+            else:
+                memory = f"{'-':>10}{'-':>10}"
+            lines.append(f"{name:<24}{timing.calls:>8}{timing.seconds:>10.2f}{samples:>10}{memory}")
+        if self._calls:
+            lines += ["", f"{'external call':<24}{'calls':>8}{'seconds':>10}{'avg ms':>10}"]
+            for name, timing in sorted(self._calls.items(), key=lambda item: -item[1].seconds):
+                average = timing.seconds / timing.calls * 1000
+                lines.append(f"{name:<24}{timing.calls:>8}{timing.seconds:>10.2f}{average:>10.1f}")
+        (self.run_dir / "summary.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@contextmanager
+def section(name: str):
+    """외부 호출 구간. 프로파일링 중이 아니면 아무것도 하지 않는다."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    ident = threading.get_ident()
+    previous = profiler._sections.get(ident)
+    profiler._sections[ident] = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_call(name, time.perf_counter() - started)
+        if previous is None:
+            profiler._sections.pop(ident, None)
+        else:
+            profiler._sections[ident] = previous
+
+
+# --- flamegraph SVG ---
+
+_FRAME_HEIGHT = 16
+_WIDTH = 1200
+_MIN_WIDTH = 0.5  # 이보다 좁은 프레임은 그리지 않음 (px)
+
+
+def _build_tree(stacks: Counter) -> Dict:
+    root: Dict = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["count"] += count
+        for frame in stack.split(";"):
+            node = node["children"].setdefault(frame, {"count": 0, "children": {}})
+            node["count"] += count
+    return root
+
+
+def _color(name: str) -> str:
+    """이름 해시로 정한 따뜻한 계열 색 (같은 함수는 같은 색)."""
+    h = sum(ord(c) * (i + 1) for i, c in enumerate(name))
+    return f"rgb({205 + h % 50},{80 + (h // 50) % 130},{40 + (h // 7) % 50})"
+
+
+def render_flamegraph(stacks: Counter, title: str = "") -> str:
+    """collapsed stack으로 flamegraph SVG를 만든다 (아래가 바깥 프레임, 폭은 샘플 비율)."""
+    tree = _build_tree(stacks)
+    total = tree["count"] or 1
+    rects: List[str] = []
+    depth_max = 0
+
+    def visit(children: Dict, x: float, depth: int) -> None:
+        nonlocal depth_max
+        for name, child in sorted(children.items()):
+            width = child["count"] / total * _WIDTH
+            if width >= _MIN_WIDTH:
+                depth_max = max(depth_max, depth)
+                rects.append((name, child["count"], x, depth, width))
+                visit(child["children"], x, depth + 1)
+            x += width
+
+    visit(tree["children"], 0.0, 0)
+    top = 24
+    height = top + (depth_max + 1) * _FRAME_HEIGHT + 8
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<text x="4" y="16" font-size="13">{html.escape(title)}</text>',
+    ]
+    for name, count, x, depth, width in rects:
+        y = height - 8 - (depth + 1) * _FRAME_HEIGHT
+        label = html.escape(name)
+        text = html.escape(name[: int(width / 7)]) if width > 21 else ""
+        parts.append(
+            f'<g><title>{label} ({count} samples, {count / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{_FRAME_HEIGHT - 1}" fill="{_color(name)}"/>'
+            + (f'<text x="{x + 2:.1f}" y="{y + 11}">{text}</text>' if text else "")
+            + "</g>"
+        )
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
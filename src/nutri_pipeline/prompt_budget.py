@@ -0,0 +1,131 @@
+"""추출 프롬프트용 초록 압축 (논문당 토큰 예산).
+
+초록이 ``PROMPT_TOKEN_BUDGET`` 토큰을 넘으면 문장 단위로 나눠, 영양소 키워드 밀도가 높은
+문장부터 예산 안에서 고른 뒤 원래 순서로 다시 잇는다. 영양소를 언급하는 문장이 우선이므로
+추출 결과는 유지하면서 LLM 호출의 입력 토큰(지연, 비용)을 줄인다.
+
+토큰 수는 tiktoken(로컬 BPE)으로 센다. tiktoken이나 인코딩 파일이 없으면(오프라인 등)
+단어 길이 기반 근사치를 쓴다.
+"""
+
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .config import LLM_MODEL, LLM_TOKENIZER
+from .lexicon import count_mentions
+
+logger = logging.getLogger(__name__)
+
+# 생략된 문장이 있음을 모델에 알리는 구분자
+OMISSION_MARK = " … "
+
+_counter: Optional[Callable[[str], int]] = None
+_counter_lock = threading.Lock()
+
+
+def approximate_token_count(text: str) -> int:
+    """BPE 토큰 수 근사치: 단어는 4글자당 1토큰, 구두점은 1토큰."""
+    return sum(max(1, math.ceil(len(piece) / 4)) if piece[0].isalnum() else 1 for piece in re.findall(r"\w+|[^\w\s]", text))
+
+
+def _load_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        if LLM_TOKENIZER:
+            encoding = tiktoken.get_encoding(LLM_TOKENIZER)
+        else:
+            try:
+                encoding = tiktoken.encoding_for_model(LLM_MODEL)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # 패키지 없음, 인코딩 파일 다운로드 실패 등
+        logger.warning(f"tiktoken 사용 불가, 근사 토큰 수 사용: {e}")
+        return approximate_token_count
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens(text: str) -> int:
+    """로컬 토크나이저로 토큰 수 계산 (첫 호출 시 토크나이저 로드)."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = _load_counter()
+    return _counter(text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 분리. 구조화 초록(BACKGROUND: ... 줄 단위)은 줄을 먼저 나눈다."""
+    sentences = []
+    for line in text.splitlines():
+        sentences += [s.strip() for s in re.split(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])", line) if s.strip()]
+    return sentences
+
+
+@dataclass
+class CompactionResult:
+    """초록 압축 결과."""
+
+    text: str
+    original_tokens: int
+    tokens: int
+    dropped_sentences: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def _truncate(text: str, budget: int, count: Callable[[str], int]) -> str:
+    """문장 하나가 예산보다 길 때 글자 수 비율로 자른다."""
+    tokens = count(text)
+    if tokens <= budget:
+        return text
+    cut = text[: max(1, len(text) * budget // tokens)]
+    while cut and count(cut) > budget:
+        cut = cut[: int(len(cut) * 0.9)]
+    return cut.rstrip() + "…"
+
+
+def compact_abstract(
+    abstract: str,
+    budget: int,
+    count: Callable[[str], int] = count_tokens,
+) -> CompactionResult:
+    """초록을 budget 토큰 이하로 압축. budget이 0 이하이거나 이미 예산 안이면 그대로 반환."""
+    original = count(abstract)
+    if budget <= 0 or original <= budget:
+        return CompactionResult(abstract, original, original)
+
+    sentences = split_sentences(abstract)
+    costs = [count(s) for s in sentences]
+    mentions = [count_mentions(s) for s in sentences]
+    # 영양소 언급 문장 → 키워드 밀도 높은 순 → 원문 앞쪽 순
+    order = sorted(range(len(sentences)), key=lambda i: (mentions[i] == 0, -mentions[i] / max(1, costs[i]), i))
+
+    mark_cost = count(OMISSION_MARK)
+    selected: List[int] = []
+    used = 0
+    for i in order:
+        if used + costs[i] + mark_cost <= budget:
+            selected.append(i)
+            used += costs[i] + mark_cost
+
+    if not selected:
+        # 가장 중요한 문장 하나도 예산을 넘으면 잘라서라도 넣는다
+        text = _truncate(sentences[order[0]], budget, count)
+        return CompactionResult(text, original, count(text), len(sentences) - 1)
+
+    selected.sort()
+    parts = [sentences[selected[0]]]
+    for prev, cur in zip(selected, selected[1:]):
+        parts.append((OMISSION_MARK if cur != prev + 1 else " ") + sentences[cur])
+    if selected[0] > 0:
+        parts.insert(0, OMISSION_MARK.lstrip())
+    text = "".join(parts)
+    return CompactionResult(text, original, count(text), len(sentences) - len(selected))
@@ -0,0 +1,247 @@
+"""임베딩 기반 검색 후보 재순위화 모듈.
+
+옵션 설명과 논문 제목+초록을 임베딩한 뒤 코사인 유사도로 상위 k개만 남긴다.
+논문 임베딩은 모델별 디렉토리의 memory-mapped ``.npy`` 파일에 논문 키 기준으로 캐시된다.
+numpy가 필요하다 (``pip install -e .[rerank]``).
+"""
+
+import json
+import logging
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    CPU_POOL_CHUNK_SIZE,
+    CPU_POOL_MIN_TEXTS,
+    EMBEDDING_CACHE_DIR,
+    RERANK_MODEL,
+    RERANK_MIN_SCORE,
+)
+from .cpu_pool import SharedArray, get_cpu_pool
+from .paper_search import PaperCandidate, build_search_query, paper_key
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_features(text: str) -> List[str]:
+    tokens = re.findall(r"\w+", text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _hash_rows(matrix: np.ndarray, texts: List[str]) -> None:
+    """texts의 해시 특징을 matrix의 각 행에 누적 (정규화 전)."""
+    dim = matrix.shape[1]
+    for row, text in enumerate(texts):
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in _hash_features(text)), dtype=np.uint32)
+        if not hashes.size:
+            continue
+        # 상위 비트로 부호를 정해 해시 충돌의 편향을 상쇄
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(matrix[row], hashes % dim, signs)
+
+
+def _hash_rows_shared(spec: tuple, start: int, texts: List[str]) -> None:
+    """프로세스 풀 작업: 공유 메모리 행렬의 [start, start+len(texts)) 행을 채움."""
+    shared = SharedArray.attach(spec)
+    try:
+        _hash_rows(shared.array[start:start + len(texts)], texts)
+    finally:
+        shared.close()
+
+
+class HashingEmbedder:
+    """토큰 unigram/bigram 해시 특징 벡터 임베더 (외부 모델 불필요).
+
+    텍스트가 ``pool_min_texts``(``CPU_POOL_MIN_TEXTS``)개 이상이고 CPU 프로세스 풀이 켜져 있으면, 워커들이
+    공유 메모리 행렬에 직접 써서 결과 배열을 복사 없이 넘긴다.
+    """
+
+    def __init__(self, dim: int = 1024, pool_min_texts: int = CPU_POOL_MIN_TEXTS):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self.pool_min_texts = pool_min_texts
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """텍스트 목록을 L2 정규화된 (N, dim) float32 행렬로 변환."""
+        pool = get_cpu_pool()
+        if pool is None or len(texts) < self.pool_min_texts:
+            matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+            _hash_rows(matrix, texts)
+            return _l2_normalize(matrix)
+
+        shared = SharedArray.create((len(texts), self.dim), "float32")
+        try:
+            chunk = max(1, CPU_POOL_CHUNK_SIZE)
+            futures = [
+                pool.submit(_hash_rows_shared, shared.spec, start, texts[start:start + chunk])
+                for start in range(0, len(texts), chunk)
+            ]
+            for future in futures:
+                future.result()
+            return _l2_normalize(shared.array)  # 새 배열을 반환하므로 공유 메모리 해제 가능
+        finally:
+            shared.unlink()
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 로컬 CPU 모델 임베더."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "RERANK_MODEL에 모델 이름을 지정하려면 sentence-transformers가 필요합니다: "
+                "pip install sentence-transformers"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = re.sub(r"[^\w.-]+", "_", model_name)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+        return _l2_normalize(vectors.astype(np.float32))
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingStore:
+    """논문 키 → 임베딩 캐시 (memory-mapped ``vectors.npy`` + ``index.json``)."""
+
+    def __init__(self, directory: Path, dim: int):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.vectors_path = self.directory / "vectors.npy"
+        self.index_path = self.directory / "index.json"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        if self.index_path.exists() and self.vectors_path.exists():
+            self._index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+            if self._vectors.shape[1] != dim or self._vectors.shape[0] < len(self._index):
+                logger.warning(f"임베딩 캐시 형식 불일치, 초기화: {self.directory}")
+                self._index, self._vectors = {}, None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_many(self, keys: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """캐시된 벡터 행렬과, 캐시에 없는 키의 위치 목록 반환."""
+        result = np.zeros((len(keys), self.dim), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            row = self._index.get(key)
+            if row is None:
+                missing.append(i)
+            else:
+                result[i] = self._vectors[row]
+        return result, missing
+
+    def add_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """새 벡터를 추가. 기존 파일을 복사한 더 큰 memmap을 만든 뒤 원자적으로 교체한다."""
+        new = [(k, v) for k, v in zip(keys, vectors) if k not in self._index]
+        if not new:
+            return
+
+        old_count = 0 if self._vectors is None else len(self._index)
+        tmp_path = self.directory / "vectors.tmp.npy"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(old_count + len(new), self.dim))
+        if old_count:
+            out[:old_count] = self._vectors[:old_count]
+        index = dict(self._index)
+        for offset, (key, vector) in enumerate(new):
+            out[old_count + offset] = vector
+            index[key] = old_count + offset
+        out.flush()
+        del out
+
+        self._vectors = None  # Windows에서는 열린 memmap을 교체할 수 없음
+        os.replace(tmp_path, self.vectors_path)
+        tmp_index = self.index_path.with_suffix(".tmp")
+        tmp_index.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp_index, self.index_path)
+
+        self._index = index
+        self._vectors = np.load(self.vectors_path, mmap_mode="r")
+
+
+def option_text(option: Dict[str, str]) -> str:
+    """옵션 임베딩용 텍스트 (영문 검색 쿼리 + 원문 라벨)."""
+    return f"{build_search_query(option)} {option.get('question_label', '')} {option.get('option_label', '')}"
+
+
+def paper_text(paper: PaperCandidate) -> str:
+    """논문 임베딩용 텍스트 (제목 + 초록)."""
+    return f"{paper.title}. {paper.abstract or ''}"
+
+
+class Reranker:
+    """옵션-논문 코사인 유사도 기반 재순위화기."""
+
+    def __init__(self, model: str = RERANK_MODEL, cache_dir: Path = EMBEDDING_CACHE_DIR):
+        self.embedder = HashingEmbedder() if model == "hashing" else SentenceTransformerEmbedder(model)
+        self.store = EmbeddingStore(Path(cache_dir) / self.embedder.name, self.embedder.dim)
+        # 누적 임베딩 캐시 적중/미스 수 (옵션별 통계는 호출 전후 차이로 계산)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def embed_papers(self, papers: List[PaperCandidate]) -> np.ndarray:
+        """논문 임베딩 (캐시 우선, 없는 것만 계산 후 캐시)."""
+        keys = [paper_key(p) for p in papers]
+        matrix, missing = self.store.get_many(keys)
+        if missing:
+            computed = self.embedder.embed([paper_text(papers[i]) for i in missing])
+            matrix[missing] = computed
+            self.store.add_many([keys[i] for i in missing], computed)
+        self.cache_hits += len(keys) - len(missing)
+        self.cache_misses += len(missing)
+        logger.info(f"논문 임베딩: {len(papers)}개 (신규 계산 {len(missing)}개)")
+        return matrix
+
+    def score(self, option: Dict[str, str], papers: List[PaperCandidate]) -> np.ndarray:
+        """각 논문의 옵션 대비 코사인 유사도."""
+        if not papers:
+            return np.zeros(0, dtype=np.float32)
+        query = self.embedder.embed([option_text(option)])[0]
+        return self.embed_papers(papers) @ query
+
+    def rerank(
+        self,
+        option: Dict[str, str],
+        papers: List[PaperCandidate],
+        top_k: int,
+        min_score: float = RERANK_MIN_SCORE,
+    ) -> List[PaperCandidate]:
+        """유사도 상위 top_k개 논문 반환 (min_score 미만 제외)."""
+        scores = self.score(option, papers)
+        if not scores.size:
+            return []
+
+        k = min(top_k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        selected = [papers[i] for i in top if scores[i] >= min_score]
+        logger.info(f"재순위화: 후보 {len(papers)}개 → {len(selected)}개 (최고 점수 {scores[top[0]]:.3f})")
+        return selected
+
+
+_reranker_instance: Optional[Reranker] = None
+
+
+def get_reranker() -> Reranker:
+    """재순위화기 싱글톤 인스턴스 반환."""
+    global _reranker_instance
+    if _reranker_instance is None:
+        _reranker_instance = Reranker()
+    return _reranker_instance
@@ -0,0 +1,135 @@
+"""예산/마감 제한 실행과 옵션/논문 우선순위.
+
+- ``RunBudget``: 실행 전체의 토큰(입력+출력), 추정 비용(USD), 마감 시각 한도. 추출 노드가 논문
+  묶음(LLM 동시성 크기)마다 사용량을 더하고, 예산이 남지 않으면 남은 논문과 옵션을 건너뛴다.
+  추출을 끝낸 논문은 옵션 단위 트랜잭션으로 저장하므로 중간에 멈춰도 DB는 일관된 상태다.
+- ``prioritize_options``: 기대 가치가 높은 옵션부터. 저장된 논문이 적을수록, 마지막 실행이
+  오래됐을수록, 초록 누락 비율이 높을수록 먼저 처리한다.
+- ``prioritize_papers``: 초록이 있는 논문, 최신 논문부터.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .config import LLM_COST_PER_1K_TOKENS, LLM_OUTPUT_COST_PER_1K_TOKENS, PROMPT_TOKEN_BUDGET
+
+# 이 일수 이상 지난 옵션은 오래된 정도를 최대로 본다
+STALENESS_HORIZON_DAYS = 30
+# 논문 1개 추출 응답(영양소 목록과 근거 JSON)의 예상 출력 토큰
+EXPECTED_OUTPUT_TOKENS = 200
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd])$")
+_DURATION_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_deadline(text: str, now: Optional[datetime] = None) -> datetime:
+    """마감 시각 파싱. 기간("90m", "2h", "1.5d") 또는 ISO 시각("2026-10-20T06:00")."""
+    now = now or datetime.now()
+    match = _DURATION.match(text.strip().lower())
+    if match:
+        return now + timedelta(seconds=float(match.group(1)) * _DURATION_SECONDS[match.group(2)])
+    try:
+        return datetime.fromisoformat(text.strip())
+    except ValueError as e:
+        raise ValueError(f"마감 형식 오류: {text} (예: 90m, 2h, 2026-10-20T06:00)") from e
+
+
+@dataclass
+class RunBudget:
+    """실행 예산. 한도가 None이면 제한 없음."""
+
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    deadline: Optional[datetime] = None
+    tokens: int = 0  # 사용한 토큰 (입력+출력)
+    cost: float = 0.0  # 사용한 추정 비용
+    stopped: Optional[str] = None  # 남은 예산으로 다음 논문을 처리할 수 없어 멈춘 사유
+
+    @property
+    def bounded(self) -> bool:
+        return self.max_tokens is not None or self.max_cost is not None or self.deadline is not None
+
+    def charge(self, tokens: int, cost: float) -> None:
+        self.tokens += tokens
+        self.cost += cost
+
+    def stop(self, reason: str) -> None:
+        self.stopped = self.stopped or reason
+
+    def exhausted_reason(self) -> Optional[str]:
+        """예산이 바닥났으면 사유, 아니면 None."""
+        if self.stopped:
+            return self.stopped
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return f"토큰 예산 소진 ({self.tokens:,}/{self.max_tokens:,})"
+        if self.max_cost is not None and self.cost >= self.max_cost:
+            return f"비용 예산 소진 (${self.cost:.4f}/${self.max_cost:.4f})"
+        if self.deadline is not None and datetime.now() >= self.deadline:
+            return f"마감 시각 도달 ({self.deadline.isoformat(timespec='seconds')})"
+        return None
+
+    def affordable(self, estimates: List[Tuple[int, int]]) -> int:
+        """예상 (입력, 출력) 토큰 목록 중 앞에서부터 남은 예산 안에 드는 개수."""
+        tokens, cost = self.tokens, self.cost
+        for count, (input_tokens, output_tokens) in enumerate(estimates):
+            tokens += input_tokens + output_tokens
+            cost += input_tokens / 1000 * LLM_COST_PER_1K_TOKENS + output_tokens / 1000 * LLM_OUTPUT_COST_PER_1K_TOKENS
+            if (self.max_tokens is not None and tokens > self.max_tokens) or (
+                self.max_cost is not None and cost > self.max_cost
+            ):
+                return count
+        return len(estimates)
+
+    def summary(self) -> str:
+        """실행 로그용 요약."""
+        parts = [f"토큰 {self.tokens:,}" + (f"/{self.max_tokens:,}" if self.max_tokens is not None else "")]
+        parts.append(f"비용 ${self.cost:.4f}" + (f"/${self.max_cost:.4f}" if self.max_cost is not None else ""))
+        if self.deadline is not None:
+            parts.append(f"마감 {self.deadline.isoformat(timespec='seconds')}")
+        return "[budget] " + ", ".join(parts)
+
+
+def estimate_paper_tokens(title: str, abstract: Optional[str], prompt_overhead: int = 0) -> Tuple[int, int]:
+    """논문 1개 추출의 예상 (입력, 출력) 토큰. 입력은 프롬프트 템플릿 + 제목 + 초록(압축 예산까지)."""
+    from .prompt_budget import count_tokens
+
+    tokens = count_tokens(abstract) if abstract else 0
+    if PROMPT_TOKEN_BUDGET > 0:
+        tokens = min(tokens, PROMPT_TOKEN_BUDGET)
+    return prompt_overhead + count_tokens(title) + tokens, EXPECTED_OUTPUT_TOKENS
+
+
+def option_value(summary: Optional[Dict], now: Optional[datetime] = None) -> float:
+    """옵션 처리의 기대 가치 점수 (클수록 먼저). 요약 통계가 없으면(처음) 최대."""
+    if summary is None:
+        return 3.0
+    now = now or datetime.now()
+    papers = summary.get("papers") or 0
+    scarcity = 1.0 / (1 + papers)
+    last_run_at = summary.get("last_run_at")
+    if last_run_at is None:
+        staleness = 1.0
+    else:
+        staleness = min(1.0, (now - last_run_at).total_seconds() / 86400 / STALENESS_HORIZON_DAYS)
+    missing_ratio = (summary.get("missing_abstracts") or 0) / papers if papers else 0.0
+    return scarcity + staleness + missing_ratio
+
+
+def prioritize_options(options: List[dict], summaries: Dict[Tuple[str, str], Dict]) -> List[dict]:
+    """기대 가치가 높은 순으로 옵션 정렬 (같으면 원래 순서)."""
+    now = datetime.now()
+    scored = [
+        (-option_value(summaries.get((option["question_id"], option["option_id"])), now), index, option)
+        for index, option in enumerate(options)
+    ]
+    return [option for _, _, option in sorted(scored, key=lambda item: item[:2])]
+
+
+def prioritize_papers(papers: list) -> list:
+    """초록이 있는 논문, 최신 논문 순으로 정렬."""
+    from .paper_search import paper_year
+
+    return sorted(papers, key=lambda paper: (not paper.abstract, -(paper_year(paper) or 0)))
+
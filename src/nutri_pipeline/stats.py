@@ -0,0 +1,149 @@
+"""DB/큐/캐시 상태 조회 (status, stats, cache 명령어용).
+
+LangChain/LangGraph를 import하지 않으므로 CLI에서 빠르게 실행된다.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import QUEUE_DB_PATH, EMBEDDING_CACHE_DIR
+
+
+def _database_exists() -> bool:
+    """SQLite 파일 DB는 파일이 있을 때만 True (없는 파일을 새로 만들지 않도록). Postgres는 항상 True."""
+    from .db import database_path
+
+    path = database_path()
+    return path is None or path.exists()
+
+
+def _summary_ready() -> bool:
+    """option_stats 테이블이 있는지 (이전 버전 DB에는 없다)."""
+    from sqlalchemy import inspect
+
+    from .db import get_engine
+
+    return inspect(get_engine()).has_table("option_stats")
+
+
+def _hit_rate(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 3) if total else None
+
+
+def collect_status() -> Dict[str, Any]:
+    """DB 요약(옵션 요약 테이블 기준), 큐 상태, 임베딩 캐시 요약.
+
+    papers/nutrients 전체를 세지 않고 option_stats 합계만 읽으므로 DB 크기와 무관하게 빠르다.
+    """
+    from .db import database_label, database_path
+
+    status: Dict[str, Any] = {"db": database_label(), "db_exists": _database_exists()}
+    if status["db_exists"]:
+        path = database_path()
+        if path is not None:
+            status["db_size_bytes"] = path.stat().st_size
+        if _summary_ready():
+            from sqlalchemy import func, select
+
+            from .db import get_db_session
+            from .models import OptionStat, SurveyOption
+
+            with get_db_session() as session:
+                row = session.execute(
+                    select(
+                        func.count(),
+                        func.coalesce(func.sum(OptionStat.papers), 0),
+                        func.coalesce(func.sum(OptionStat.nutrients), 0),
+                        func.coalesce(func.sum(OptionStat.cache_hits), 0),
+                        func.coalesce(func.sum(OptionStat.cache_misses), 0),
+                        func.max(OptionStat.last_run_at),
+                        func.coalesce(func.sum(OptionStat.prompt_tokens), 0),
+                        func.coalesce(func.sum(OptionStat.prompt_tokens_saved), 0),
+                    )
+                ).one()
+                survey_options = session.execute(select(func.count()).select_from(SurveyOption)).scalar_one()
+            options_with_papers, papers, nutrients, hits, misses, last_run_at, tokens, saved = row
+            status["counts"] = {"survey_options": survey_options, "papers": papers, "nutrients": nutrients}
+            status["options_with_papers"] = options_with_papers
+            status["last_run_at"] = last_run_at.isoformat(timespec="seconds") if last_run_at else None
+            status["embedding_cache_hit_rate"] = _hit_rate(hits, misses)
+            status["prompt_tokens"] = tokens
+            status["prompt_tokens_saved"] = saved
+        else:
+            status["summary_missing"] = True
+
+    if QUEUE_DB_PATH.exists():
+        from .work_queue import WorkQueue
+
+        status["queue"] = WorkQueue(QUEUE_DB_PATH).stats()
+
+    status["embedding_cache"] = collect_cache_info()
+    return status
+
+
+def collect_option_stats() -> List[Dict[str, Any]]:
+    """옵션별 논문/영양소 수, 초록 누락 비율, 마지막 실행 시간, 캐시 적중률 (option_stats 기준)."""
+    if not _database_exists() or not _summary_ready():
+        return []
+
+    from sqlalchemy import select
+
+    from .db import get_db_session
+    from .models import OptionStat
+
+    with get_db_session() as session:
+        stats = session.execute(
+            select(OptionStat).order_by(OptionStat.question_id, OptionStat.option_id)
+        ).scalars().all()
+        return [
+            {
+                "question_id": stat.question_id,
+                "option_id": stat.option_id,
+                "papers": stat.papers,
+                "nutrients": stat.nutrients,
+                "good_nutrients": stat.good_nutrients,
+                "bad_nutrients": stat.bad_nutrients,
+                "missing_abstract_ratio": round(stat.missing_abstracts / stat.papers, 3) if stat.papers else 0.0,
+                "last_run_at": stat.last_run_at.isoformat(timespec="seconds") if stat.last_run_at else None,
+                "last_run_seconds": round(stat.last_run_seconds, 2) if stat.last_run_seconds is not None else None,
+                "cache_hit_rate": _hit_rate(stat.cache_hits, stat.cache_misses),
+                "prompt_tokens": stat.prompt_tokens,
+                "prompt_tokens_saved": stat.prompt_tokens_saved,
+            }
+            for stat in stats
+        ]
+
+
+def rebuild_option_stats() -> int:
+    """옵션 요약 테이블/인덱스를 만들고 저장된 데이터로 다시 집계. 옵션 수 반환."""
+    from .db import get_db_session, init_db, rebuild_option_stats as rebuild
+
+    init_db()
+    with get_db_session() as session:
+        return rebuild(session)
+
+
+def collect_cache_info() -> List[Dict[str, Any]]:
+    """모델별 임베딩 캐시 (행 수, 파일 크기). numpy 없이 index.json만 읽는다."""
+    if not EMBEDDING_CACHE_DIR.exists():
+        return []
+    caches = []
+    for directory in sorted(p for p in EMBEDDING_CACHE_DIR.iterdir() if p.is_dir()):
+        index_path = directory / "index.json"
+        rows = len(json.loads(index_path.read_text(encoding="utf-8"))) if index_path.exists() else 0
+        size = sum(f.stat().st_size for f in directory.iterdir() if f.is_file())
+        caches.append({"model": directory.name, "rows": rows, "size_bytes": size})
+    return caches
+
+
+def clear_embedding_cache() -> int:
+    """임베딩 캐시 전체 삭제. 삭제한 모델 디렉토리 수 반환."""
+    if not EMBEDDING_CACHE_DIR.exists():
+        return 0
+    directories = [p for p in Path(EMBEDDING_CACHE_DIR).iterdir() if p.is_dir()]
+    for directory in directories:
+        shutil.rmtree(directory)
+    return len(directories)
@@ -1,6 +1,18 @@
-"""설문 보기(option) 정의."""
+"""설문 보기(option) 정의 및 (question_id, option_id) 키 기반 레지스트리."""
 
-from typing import List, Dict
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .config import SURVEY_OPTIONS_PATH
+
+logger = logging.getLogger(__name__)
+
+# 옵션 식별 키: option_id는 질문마다 중복될 수 있으므로 (question_id, option_id)로 식별
+OptionKey = Tuple[str, str]
+
+REQUIRED_FIELDS = ("question_id", "question_label", "option_id", "option_label")
 
 survey_options: List[Dict[str, str]] = [
     {
@@ -186,15 +198,128 @@ survey_options: List[Dict[str, str]] = [
 ]
 
 
+def option_key(option: Dict[str, str]) -> str:
+    """옵션의 문자열 키("question_id:option_id") 반환. 상태/로그/CLI 인자에 사용."""
+    return f"{option['question_id']}:{option['option_id']}"
+
+
+class OptionRegistry:
+    """(question_id, option_id)로 키잉된 설문 옵션 레지스트리."""
+
+    def __init__(self, options: Optional[List[Dict[str, str]]] = None):
+        self._options: List[Dict[str, str]] = []
+        self._by_key: Dict[OptionKey, Dict[str, str]] = {}
+        self._by_option_id: Dict[str, List[Dict[str, str]]] = {}
+        for option in options or []:
+            self.add(option)
+
+    def add(self, option: Dict[str, str]) -> None:
+        """옵션 추가. 필수 필드 누락 또는 키 중복 시 ValueError."""
+        missing = [field for field in REQUIRED_FIELDS if not option.get(field)]
+        if missing:
+            raise ValueError(f"옵션 필수 필드 누락 {missing}: {option}")
+
+        key = (option["question_id"], option["option_id"])
+        if key in self._by_key:
+            raise ValueError(f"중복된 옵션 키: {key}")
+
+        self._options.append(option)
+        self._by_key[key] = option
+        self._by_option_id.setdefault(option["option_id"], []).append(option)
+
+    def get(self, question_id: str, option_id: str) -> Optional[Dict[str, str]]:
+        """(question_id, option_id)로 옵션 조회 (O(1))."""
+        return self._by_key.get((question_id, option_id))
+
+    def find_by_option_id(self, option_id: str) -> List[Dict[str, str]]:
+        """option_id가 일치하는 모든 옵션 반환 (질문이 다르면 여러 개일 수 있음)."""
+        return list(self._by_option_id.get(option_id, []))
+
+    def resolve(self, ids: List[str]) -> List[Dict[str, str]]:
+        """CLI 인자("option_id" 또는 "question_id:option_id")를 옵션 목록으로 변환 (입력 순서 유지)."""
+        resolved: List[Dict[str, str]] = []
+        seen = set()
+        for raw in ids:
+            if ":" in raw:
+                question_id, option_id = raw.split(":", 1)
+                option = self.get(question_id, option_id)
+                matches = [option] if option else []
+            else:
+                matches = self.find_by_option_id(raw)
+
+            if not matches:
+                logger.warning(f"알 수 없는 옵션: {raw}")
+            for option in matches:
+                key = option_key(option)
+                if key not in seen:
+                    seen.add(key)
+                    resolved.append(option)
+        return resolved
+
+    def all(self) -> List[Dict[str, str]]:
+        """등록 순서대로 모든 옵션 반환."""
+        return list(self._options)
+
+    def __contains__(self, key: OptionKey) -> bool:
+        return key in self._by_key
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._options)
+
+    def __len__(self) -> int:
+        return len(self._options)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "OptionRegistry":
+        """YAML(.yaml/.yml) 또는 JSON 파일에서 옵션 로드.
+
+        파일은 옵션 dict의 리스트이거나, ``{"options": [...]}`` 형태여야 한다.
+        """
+        path = Path(path)
+        text = path.read_text(encoding="utf-8")
+
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML 옵션 파일을 읽으려면 PyYAML이 필요합니다: pip install pyyaml") from e
+            data = yaml.safe_load(text)
+        else:
+            data = json.loads(text)
+
+        if isinstance(data, dict):
+            data = data.get("options", [])
+        if not isinstance(data, list):
+            raise ValueError(f"옵션 파일 형식 오류 (리스트 필요): {path}")
+
+        registry = cls([{field: str(item[field]) for field in item} for item in data])
+        logger.info(f"옵션 파일 로드: {path} ({len(registry)}개)")
+        return registry
+
+
+_registry: Optional[OptionRegistry] = None
+
+
+def get_registry() -> OptionRegistry:
+    """옵션 레지스트리 싱글톤 반환. SURVEY_OPTIONS_PATH가 설정되어 있으면 파일에서 로드."""
+    global _registry
+    if _registry is None:
+        if SURVEY_OPTIONS_PATH:
+            _registry = OptionRegistry.from_file(SURVEY_OPTIONS_PATH)
+        else:
+            _registry = OptionRegistry(survey_options)
+    return _registry
+
+
 def get_all_options() -> List[Dict[str, str]]:
     """모든 설문 옵션 반환."""
-    return survey_options
-
+    return get_registry().all()
 
-def get_option_by_id(option_id: str) -> Dict[str, str] | None:
-    """option_id로 옵션 조회."""
-    for option in survey_options:
-        if option["option_id"] == option_id:
-            return option
-    return None
 
+def get_option_by_id(option_id: str, question_id: Optional[str] = None) -> Dict[str, str] | None:
+    """option_id로 옵션 조회. question_id가 없으면 첫 번째 일치 옵션 반환."""
+    registry = get_registry()
+    if question_id is not None:
+        return registry.get(question_id, option_id)
+    matches = registry.find_by_option_id(option_id)
+    return matches[0] if matches else None
@@ -0,0 +1,497 @@
+"""SQLite 기반 내구성 작업 큐와 워커.
+
+외부 브로커 없이 여러 워커 프로세스가 같은 큐 파일을 공유한다.
+
+- 작업은 lease(임대)로 가져가며, 워커는 처리 중 주기적으로 heartbeat로 lease를 연장한다.
+- lease가 만료된 작업(워커 크래시 등)은 visibility timeout이 지난 것으로 보고 다시 가져갈 수 있다.
+- 완료는 현재 lease 소유자만 할 수 있고, 이미 완료된 작업의 완료 요청은 무시된다 (멱등).
+- ``dedup_key``가 같은 작업은 대기/처리 중인 동안 중복 등록되지 않는다.
+
+작업 종류:
+
+- ``search_option``: 옵션의 논문 검색 후 논문별 ``extract_paper``와 ``persist_batch`` 등록
+- ``extract_paper``: 논문 1개 영양소 추출 (결과는 작업 result에 저장)
+- ``persist_batch``: 옵션의 추출 작업이 모두 끝나면 결과를 한 트랜잭션으로 DB에 저장.
+  검색 실행마다 dedup_key에 실행 id를 붙여 따로 등록하므로, 이전 저장 작업이 아직 대기/처리 중이어도
+  재검색으로 바뀐 추출 작업 목록이 버려지지 않는다 (저장은 DOI/제목 기준 upsert라 중복 실행해도 안전).
+
+여러 노드에서 사용할 때는 큐 파일이 로컬 디스크처럼 잠금을 지원하는 공유 스토리지에 있어야 한다.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import (
+    QUEUE_DB_PATH,
+    QUEUE_LEASE_SECONDS,
+    QUEUE_MAX_ATTEMPTS,
+    QUEUE_POLL_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedup_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    heartbeat_at REAL,
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_lease ON jobs (status, lease_expires_at);
+"""
+
+
+@dataclass
+class Job:
+    """큐에서 가져온 작업."""
+
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    dedup_key: Optional[str]
+    attempts: int
+    max_attempts: int
+
+
+class WorkQueue:
+    """SQLite 파일 기반 작업 큐 (프로세스/스레드 안전)."""
+
+    def __init__(self, path: Path = QUEUE_DB_PATH, lease_seconds: float = QUEUE_LEASE_SECONDS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (WAL 모드, 잠금 대기)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 잠금을 즉시 잡는 트랜잭션."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedup_key: Optional[str] = None,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+        delay: float = 0.0,
+    ) -> int:
+        """작업 등록 후 ID 반환.
+
+        같은 dedup_key의 작업이 대기/처리 중이면 새로 만들지 않고 기존 ID를 반환한다.
+        완료/실패한 작업이면 새 payload로 다시 대기 상태로 되돌린다.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (kind, payload, dedup_key, status, attempts, max_attempts,
+                                  available_at, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+                ON CONFLICT(dedup_key) DO UPDATE SET
+                    payload = excluded.payload,
+                    status = 'queued',
+                    attempts = 0,
+                    max_attempts = excluded.max_attempts,
+                    available_at = excluded.available_at,
+                    lease_owner = NULL,
+                    lease_expires_at = NULL,
+                    result = NULL,
+                    last_error = NULL,
+                    updated_at = excluded.updated_at
+                WHERE jobs.status IN ('done', 'failed')
+                """,
+                (kind, json.dumps(payload, ensure_ascii=False), dedup_key, max_attempts, now + delay, now, now),
+            )
+            if dedup_key is None:
+                return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return conn.execute("SELECT id FROM jobs WHERE dedup_key = ?", (dedup_key,)).fetchone()[0]
+
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Job]:
+        """처리 가능한 작업 1개를 lease로 가져옴. 없으면 None.
+
+        대기 중인 작업과 lease가 만료된 작업이 대상이며, 재시도 한도를 넘긴 작업은 실패 처리한다.
+        """
+        now = time.time()
+        kind_filter = ""
+        params: List[Any] = [now, now]
+        if kinds:
+            kind_filter = f"AND kind IN ({','.join('?' for _ in kinds)})"
+            params.extend(kinds)
+
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    f"""
+                    SELECT * FROM jobs
+                    WHERE ((status = 'queued' AND available_at <= ?)
+                           OR (status = 'leased' AND lease_expires_at < ?))
+                    {kind_filter}
+                    ORDER BY available_at, id
+                    LIMIT 1
+                    """,
+                    params,
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', lease_owner = NULL, updated_at = ?, "
+                        "last_error = COALESCE(last_error, 'lease 만료 반복') WHERE id = ?",
+                        (now, row["id"]),
+                    )
+                    logger.warning(f"작업 {row['id']}({row['kind']}) 재시도 한도 초과로 실패 처리")
+                    continue
+
+                if row["status"] == LEASED:
+                    logger.warning(f"작업 {row['id']}({row['kind']}) lease 만료 (이전 소유자 {row['lease_owner']}), 재할당")
+
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?,
+                                    lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (worker_id, now + self.lease_seconds, now, now, row["id"]),
+                )
+                return Job(
+                    id=row["id"],
+                    kind=row["kind"],
+                    payload=json.loads(row["payload"]),
+                    dedup_key=row["dedup_key"],
+                    attempts=row["attempts"] + 1,
+                    max_attempts=row["max_attempts"],
+                )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """lease 연장. 이미 다른 워커에게 넘어갔으면 False."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Any = None) -> bool:
+        """작업 완료 처리 (멱등). 현재 소유자가 아니면 False."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False), now, job_id, worker_id),
+            )
+            if cursor.rowcount == 1:
+                return True
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row is not None and row["status"] == DONE
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_delay: float = 0.0) -> None:
+        """작업 실패 처리. 재시도 한도 내면 retry_delay 후 다시 대기 상태로."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = ?, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (now + retry_delay, error[:2000], now, job_id, worker_id),
+            )
+
+    def defer(self, job_id: int, worker_id: str, delay: float) -> None:
+        """재시도 횟수를 소모하지 않고 나중에 다시 처리하도록 되돌림 (선행 작업 대기용)."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?, "
+                "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + delay, now, job_id, worker_id),
+            )
+
+    def results(self, dedup_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """dedup_key별 {status, payload, result} 조회."""
+        if not dedup_keys:
+            return {}
+        conn = self._connect()
+        found: Dict[str, Dict[str, Any]] = {}
+        # SQLite 바인드 변수 한도를 넘지 않도록 나눠서 조회
+        for start in range(0, len(dedup_keys), 500):
+            chunk = dedup_keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT dedup_key, status, payload, result FROM jobs WHERE dedup_key IN ({','.join('?' for _ in chunk)})",
+                chunk,
+            ).fetchall()
+            for row in rows:
+                found[row["dedup_key"]] = {
+                    "status": row["status"],
+                    "payload": json.loads(row["payload"]),
+                    "result": json.loads(row["result"]) if row["result"] else None,
+                }
+        return found
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {status: count}} 집계."""
+        rows = self._connect().execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status").fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            stats.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return stats
+
+    def pending_count(self) -> int:
+        """대기/처리 중인 작업 수."""
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')").fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# 작업 핸들러
+# ---------------------------------------------------------------------------
+
+
+class DeferJob(Exception):
+    """선행 작업이 끝나지 않아 나중에 다시 처리해야 함."""
+
+    def __init__(self, delay: float):
+        super().__init__(f"{delay}초 후 재처리")
+        self.delay = delay
+
+
+def _handle_search_option(queue: WorkQueue, job: Job) -> Dict[str, Any]:
+    from .paper_search import search_papers_for_option, paper_key
+    from .survey_options import option_key
+
+    option = job.payload["option"]
+    key = option_key(option)
+    started_at = time.time()
+    papers = search_papers_for_option(option)
+
+    extract_keys = []
+    for paper in papers:
+        dedup_key = f"extract:{key}:{paper_key(paper)}"
+        queue.enqueue("extract_paper", {"option": option, "paper": asdict(paper)}, dedup_key=dedup_key)
+        extract_keys.append(dedup_key)
+
+    if extract_keys:
+        # 옵션 단위 키를 쓰면 대기/처리 중인 이전 저장 작업과 충돌해 이번 extract_keys가 버려지므로
+        # 검색 실행마다 새 키로 등록한다
+        run_id = uuid.uuid4().hex
+        queue.enqueue(
+            "persist_batch",
+            {"option": option, "extract_keys": extract_keys, "started_at": started_at},
+            dedup_key=f"persist:{key}:{run_id}",
+            delay=QUEUE_POLL_INTERVAL,
+        )
+    logger.info(f"[queue] {key}: 논문 {len(papers)}개 추출 작업 등록")
+    return {"papers": len(papers)}
+
+
+def _handle_extract_paper(queue: WorkQueue, job: Job) -> Dict[str, Any]:
+    from .nutrient_extractor import get_extractor
+
+    paper = job.payload["paper"]
+    return get_extractor().extract_nutrients_from_paper(paper["title"], paper.get("abstract"))
+
+
+def _handle_persist_batch(queue: WorkQueue, job: Job) -> Dict[str, Any]:
+    from .db import get_db_session, save_extracted_data
+    from .paper_search import PaperCandidate
+
+    option = job.payload["option"]
+    extract_keys = job.payload["extract_keys"]
+    results = queue.results(extract_keys)
+
+    pending = [k for k in extract_keys if results.get(k, {}).get("status") in (QUEUED, LEASED)]
+    if pending:
+        raise DeferJob(max(QUEUE_POLL_INTERVAL, 1.0))
+
+    extracted_data = [
+        {"paper": PaperCandidate(**results[k]["payload"]["paper"]), "nutrients": results[k]["result"]}
+        for k in extract_keys
+        if results.get(k, {}).get("status") == DONE
+    ]
+
+    with get_db_session() as session:
+        started_at = job.payload.get("started_at")
+        saved_count = save_extracted_data(
+            session,
+            option,
+            extracted_data,
+            run_seconds=time.time() - started_at if started_at is not None else None,
+        )
+    skipped = len(extract_keys) - len(extracted_data)
+    logger.info(f"[queue] DB 저장 완료: {saved_count}개 논문 (실패한 추출 {skipped}개 제외)")
+    return {"saved": saved_count, "skipped": skipped}
+
+
+HANDLERS: Dict[str, Callable[[WorkQueue, Job], Any]] = {
+    "search_option": _handle_search_option,
+    "extract_paper": _handle_extract_paper,
+    "persist_batch": _handle_persist_batch,
+}
+
+
+def enqueue_options(options: List[Dict[str, str]], queue: Optional[WorkQueue] = None) -> int:
+    """옵션별 search_option 작업 등록. 등록한 작업 수 반환."""
+    from .survey_options import option_key
+
+    queue = queue or WorkQueue()
+    for option in options:
+        queue.enqueue("search_option", {"option": option}, dedup_key=f"search:{option_key(option)}")
+    logger.info(f"[queue] search_option 작업 {len(options)}개 등록: {queue.path}")
+    return len(options)
+
+
+# ---------------------------------------------------------------------------
+# 워커
+# ---------------------------------------------------------------------------
+
+
+class Worker:
+    """N개 스레드로 큐를 처리하는 워커 프로세스."""
+
+    def __init__(
+        self,
+        queue: Optional[WorkQueue] = None,
+        concurrency: int = 4,
+        kinds: Optional[List[str]] = None,
+        poll_interval: float = QUEUE_POLL_INTERVAL,
+        exit_when_empty: bool = False,
+    ):
+        self.queue = queue or WorkQueue()
+        self.concurrency = max(1, concurrency)
+        self.kinds = kinds
+        self.poll_interval = poll_interval
+        self.exit_when_empty = exit_when_empty
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._active: Dict[int, str] = {}
+        self._active_lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self) -> None:
+        """새 작업을 가져오지 않고 처리 중인 작업만 끝낸 뒤 종료."""
+        self._stop.set()
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            with self._active_lock:
+                active = list(self._active.items())
+            for job_id, owner in active:
+                if not self.queue.heartbeat(job_id, owner):
+                    logger.warning(f"[queue] 작업 {job_id} lease를 잃음 (완료 결과는 무시될 수 있음)")
+
+    def _run_one(self, job: Job, owner: str) -> None:
+        handler = HANDLERS.get(job.kind)
+        with self._active_lock:
+            self._active[job.id] = owner
+        try:
+            if handler is None:
+                raise ValueError(f"알 수 없는 작업 종류: {job.kind}")
+            result = handler(self.queue, job)
+            if not self.queue.complete(job.id, owner, result):
+                logger.warning(f"[queue] 작업 {job.id} 완료 거부됨 (lease 만료 후 재할당)")
+            with self._active_lock:
+                self.processed += 1
+        except DeferJob as e:
+            self.queue.defer(job.id, owner, e.delay)
+        except Exception as e:
+            with self._active_lock:
+                self.failed += 1
+            # 재시도 간격은 시도 횟수에 따라 지수적으로 증가
+            retry_delay = min(300.0, 2.0 ** job.attempts)
+            logger.error(f"[queue] 작업 {job.id}({job.kind}) 실패 {job.attempts}/{job.max_attempts}: {e}")
+            self.queue.fail(job.id, owner, f"{type(e).__name__}: {e}", retry_delay)
+        finally:
+            with self._active_lock:
+                self._active.pop(job.id, None)
+
+    def _loop(self, slot: int) -> None:
+        owner = f"{self.worker_id}:{slot}"
+        while not self._stop.is_set():
+            job = self.queue.claim(owner, self.kinds)
+            if job is None:
+                if self.exit_when_empty and self.queue.pending_count() == 0:
+                    self._stop.set()
+                    break
+                self._stop.wait(self.poll_interval)
+                continue
+            self._run_one(job, owner)
+
+    def run(self) -> None:
+        """워커 실행 (stop() 호출, 또는 exit_when_empty이고 큐가 비면 종료)."""
+        logger.info(f"[queue] 워커 시작: {self.worker_id} (동시성 {self.concurrency}, 큐 {self.queue.path})")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="queue-heartbeat", daemon=True)
+        heartbeat.start()
+        threads = [
+            threading.Thread(target=self._loop, args=(i,), name=f"queue-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            logger.info("[queue] 중단 요청, 처리 중인 작업 완료 후 종료...")
+            self.stop()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._stop.set()
+        logger.info(f"[queue] 워커 종료: 처리 {self.processed}건, 실패 {self.failed}건")
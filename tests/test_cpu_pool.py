@@ -0,0 +1,57 @@
+"""cpu_pool.py: 프로세스 풀 경로 (공유 메모리 행렬, 검색 결과 병합)."""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from nutri_pipeline import cpu_pool, paper_search
+from nutri_pipeline.paper_search import PaperCandidate, merge_by_doi
+from nutri_pipeline.rerank import HashingEmbedder
+
+TEXTS = [f"whole grain rice fiber {i} magnesium glycemic control trial" for i in range(40)]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(cpu_pool, "CPU_POOL_WORKERS", 2)
+    yield cpu_pool.get_cpu_pool()
+    cpu_pool.shutdown_cpu_pool()
+
+
+def test_hashing_embedder_pool_matches_inline_and_unlinks(pool, monkeypatch):
+    created = []
+    create = cpu_pool.SharedArray.create.__func__
+
+    def spy(cls, *args, **kwargs):
+        shared = create(cls, *args, **kwargs)
+        created.append(shared.spec[0])
+        return shared
+
+    monkeypatch.setattr(cpu_pool.SharedArray, "create", classmethod(spy))
+    monkeypatch.setattr("nutri_pipeline.rerank.CPU_POOL_CHUNK_SIZE", 8)
+
+    pooled = HashingEmbedder(dim=256, pool_min_texts=len(TEXTS)).embed(TEXTS)
+    inline = HashingEmbedder(dim=256, pool_min_texts=len(TEXTS) + 1).embed(TEXTS)
+
+    assert len(created) == 1  # 풀 경로는 공유 메모리로, 기준 미만은 현재 스레드에서
+    np.testing.assert_allclose(pooled, inline, rtol=1e-6)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
+
+
+def test_merge_runs_in_pool(pool, monkeypatch):
+    submitted = []
+    submit = pool.submit
+    monkeypatch.setattr(pool, "submit", lambda fn, *args: (submitted.append(fn), submit(fn, *args))[1])
+    monkeypatch.setattr(paper_search, "CPU_POOL_MIN_PAPERS", 2)
+    results = [
+        [PaperCandidate(title="A", url="", doi="https://doi.org/10.1/A"), PaperCandidate(title="B", url="")],
+        [PaperCandidate(title="A", url="u", doi="10.1/a", abstract="fiber"), PaperCandidate(title="b", url="")],
+    ]
+
+    merged = paper_search._merge(results, 10)
+
+    assert submitted == [merge_by_doi]
+    assert merged == merge_by_doi(results, 10)
+    assert [(p.title, p.abstract) for p in merged] == [("A", "fiber"), ("B", None)]
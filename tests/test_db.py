@@ -0,0 +1,211 @@
+"""db.py 저장 경로: 방언별 upsert, save_extracted_data, Postgres COPY."""
+
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from nutri_pipeline import db
+from nutri_pipeline.models import Nutrient, OptionStat, Paper, SurveyOption
+from nutri_pipeline.paper_search import PaperCandidate
+
+
+def _paper(doi, title="Whole grain rice and glycemic control", abstract="Fiber 5 g/day lowered HbA1c."):
+    return PaperCandidate(title=title, url=f"https://doi.org/{doi}" if doi else "", doi=doi, abstract=abstract)
+
+
+def _item(paper, good=("fiber",), bad=(), details=None):
+    return {
+        "paper": paper,
+        "nutrients": {"good_nutrients": list(good), "bad_nutrients": list(bad), "details": details or {}},
+    }
+
+
+def _count(session, column):
+    return session.execute(select(func.count(column))).scalar()
+
+
+def test_upsert_uses_dialect_insert(session, option):
+    stmt = db._upsert(session, SurveyOption).values(**option).on_conflict_do_nothing(
+        index_elements=["question_id", "option_id"]
+    )
+    session.execute(stmt)
+    session.execute(stmt)
+    session.commit()
+    assert _count(session, SurveyOption.id) == 1
+
+
+def test_upsert_do_update(session):
+    values = {"question_id": "disease", "option_id": "diabetes", "papers": 1}
+    for papers in (1, 3):
+        stmt = db._upsert(session, OptionStat).values(**{**values, "papers": papers})
+        session.execute(stmt.on_conflict_do_update(index_elements=["question_id", "option_id"], set_={"papers": papers}))
+    session.commit()
+    assert session.execute(select(OptionStat.papers)).scalar_one() == 3
+
+
+def test_upsert_rejects_unknown_dialect():
+    fake = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+    with pytest.raises(NotImplementedError):
+        db._upsert(fake, SurveyOption)
+
+
+def test_save_extracted_data_stores_papers_nutrients_and_stats(session, option):
+    details = {"fiber": {"confidence": 0.9, "span_start": 0, "span_end": 5, "quantity": 5.0, "unit": "g/day"}}
+    saved = db.save_extracted_data(
+        session,
+        option,
+        [_item(_paper("10.1/a"), good=("fiber",), bad=("sodium",), details=details), _item(_paper(None, abstract=None))],
+        run_seconds=1.5,
+        prompt_tokens=120,
+    )
+    session.commit()
+
+    assert saved == 2
+    assert _count(session, Paper.id) == 2
+    fiber = session.execute(
+        select(Nutrient).join(Paper).where(Paper.doi == "10.1/a", Nutrient.name == "fiber")
+    ).scalar_one()
+    assert (fiber.type, fiber.confidence, fiber.span_end, fiber.quantity, fiber.unit) == ("good", 0.9, 5, 5.0, "g/day")
+    sodium = session.execute(select(Nutrient).where(Nutrient.name == "sodium")).scalar_one()
+    assert sodium.type == "bad" and sodium.confidence is None
+
+    stat = session.get(OptionStat, ("disease", "diabetes"))
+    assert (stat.papers, stat.missing_abstracts, stat.nutrients, stat.good_nutrients, stat.bad_nutrients) == (
+        2, 1, 3, 2, 1,
+    )
+    assert stat.last_run_seconds == 1.5 and stat.prompt_tokens == 120
+
+
+def test_save_extracted_data_replaces_nutrients_on_same_doi(session, option):
+    db.save_extracted_data(session, option, [_item(_paper("10.1/a"), good=("fiber", "protein"))])
+    session.commit()
+    db.save_extracted_data(session, option, [_item(_paper("10.1/a"), good=("magnesium",))])
+    session.commit()
+
+    assert _count(session, Paper.id) == 1
+    assert session.execute(select(Nutrient.name)).scalars().all() == ["magnesium"]
+    assert session.get(OptionStat, ("disease", "diabetes")).nutrients == 1
+
+
+def test_save_extracted_data_reuses_paper_without_doi(session, option):
+    for good in (("fiber",), ("protein",)):
+        db.save_extracted_data(session, option, [_item(_paper(None), good=good)])
+        session.commit()
+
+    assert _count(session, Paper.id) == 1
+    assert session.execute(select(Nutrient.name)).scalars().all() == ["protein"]
+
+
+def test_save_extracted_data_refreshes_stats_of_option_owning_doi(session, option):
+    other = {**option, "option_id": "hypertension", "option_label": "고혈압"}
+    db.save_extracted_data(session, other, [_item(_paper("10.1/a"), good=("fiber",))])
+    session.commit()
+    # 같은 DOI가 다른 옵션에서 다시 나오면 논문은 원래 옵션 소속으로 두고 영양소만 갱신
+    db.save_extracted_data(session, option, [_item(_paper("10.1/a"), good=("fiber", "potassium"))])
+    session.commit()
+
+    assert session.execute(select(Paper.option_id)).scalar_one() == "hypertension"
+    assert session.get(OptionStat, ("disease", "hypertension")).nutrients == 2
+    assert session.get(OptionStat, ("disease", "diabetes")).papers == 0
+
+
+def test_save_extracted_data_marks_completion_only_when_complete(session, option):
+    db.save_extracted_data(session, option, [_item(_paper("10.1/a"))], completed=False)
+    session.commit()
+    completed_at = select(SurveyOption.completed_at)
+    assert session.execute(completed_at).scalar_one() is None
+
+    db.save_extracted_data(session, option, [_item(_paper("10.1/b"))])
+    session.commit()
+    assert session.execute(completed_at).scalar_one() is not None
+
+
+def test_bulk_insert_nutrients_uses_copy_only_on_postgres(session, option, monkeypatch):
+    copied = []
+    real_copy = db._copy_nutrients
+    monkeypatch.setattr(db, "_copy_nutrients", lambda s, rows: (copied.append(rows), real_copy(s, rows)))
+
+    db.save_extracted_data(session, option, [_item(_paper("10.1/a"), good=("fiber",), bad=("sugar",))])
+    session.commit()
+
+    postgres = session.get_bind().dialect.name == "postgresql"
+    assert bool(copied) == postgres
+    rows = session.execute(select(Nutrient.name, Nutrient.type, Nutrient.unit).order_by(Nutrient.name)).all()
+    assert [tuple(row) for row in rows] == [("fiber", "good", None), ("sugar", "bad", None)]
+
+
+# --- COPY 경로 (드라이버별 분기, Postgres 없이 가짜 커서로 확인) ---
+
+_ROWS = [
+    {"paper_id": 1, "name": "fiber", "type": "good", "extra_info": {"note": "a,b"}, "confidence": 0.8,
+     "span_start": 3, "span_end": 8, "quantity": 5.0, "unit": "g"},
+    {"paper_id": 1, "name": "sugar", "type": "bad", "extra_info": None, "confidence": None,
+     "span_start": None, "span_end": None, "quantity": None, "unit": None},
+]
+
+
+class _Psycopg3Cursor:
+    def __init__(self):
+        self.sql, self.rows, self.closed = None, [], False
+
+    def copy(self, sql):
+        self.sql = sql
+        cursor = self
+
+        class _Copy:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def write_row(self, row):
+                cursor.rows.append(row)
+
+        return _Copy()
+
+    def close(self):
+        self.closed = True
+
+
+class _Psycopg2Cursor:
+    def __init__(self):
+        self.sql, self.data, self.closed = None, None, False
+
+    def copy_expert(self, sql, buffer):
+        self.sql, self.data = sql, buffer.read()
+
+    def close(self):
+        self.closed = True
+
+
+def _fake_session(cursor):
+    dbapi = SimpleNamespace(cursor=lambda: cursor)
+    connection = SimpleNamespace(connection=SimpleNamespace(dbapi_connection=dbapi))
+    return SimpleNamespace(connection=lambda: connection)
+
+
+def test_copy_nutrients_psycopg3():
+    cursor = _Psycopg3Cursor()
+    db._copy_nutrients(_fake_session(cursor), _ROWS)
+
+    assert cursor.sql.startswith("COPY nutrients (paper_id, name, type, extra_info, confidence")
+    assert cursor.rows[0] == [1, "fiber", "good", json.dumps({"note": "a,b"}), 0.8, 3, 8, 5.0, "g"]
+    assert cursor.rows[1] == [1, "sugar", "bad", None, None, None, None, None, None]
+    assert cursor.closed
+
+
+def test_copy_nutrients_psycopg2_csv():
+    cursor = _Psycopg2Cursor()
+    db._copy_nutrients(_fake_session(cursor), _ROWS)
+
+    assert cursor.sql.endswith("FROM STDIN WITH (FORMAT csv)")
+    rows = list(csv.reader(io.StringIO(cursor.data)))
+    assert json.loads(rows[0][3]) == {"note": "a,b"}
+    # CSV COPY에서 따옴표 없는 빈 값이 NULL
+    assert cursor.data.splitlines()[1] == "1,sugar,bad,,,,,,"
+    assert cursor.closed
@@ -0,0 +1,74 @@
+"""journal.py: 저널 반영과 옵션 처리 완료 기록."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from nutri_pipeline import db
+from nutri_pipeline.journal import Journal, JournalCommitter, extraction_record, option_done_record
+from nutri_pipeline.paper_search import PaperCandidate
+
+NUTRIENTS = {"good_nutrients": ["fiber"], "bad_nutrients": [], "details": {}}
+
+
+@pytest.fixture
+def journal_dir(engine, tmp_path, monkeypatch):
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(db, "SessionLocal", factory)
+    return tmp_path / "journal"
+
+
+def _write(directory, records):
+    journal = Journal(directory)
+    for record in records:
+        journal.append(record)
+    journal.close()
+
+
+def test_final_drain_applies_orphans_without_marking_processed(journal_dir, option):
+    other = {**option, "option_id": "hypertension", "option_label": "고혈압"}
+    _write(journal_dir, [
+        extraction_record(option, PaperCandidate(title="Done", url="", doi="10.1/a"), NUTRIENTS),
+        option_done_record(option, {}),
+        # 완료 기록 없이 중단된 옵션
+        extraction_record(other, PaperCandidate(title="Orphan", url="", doi="10.1/b"), NUTRIENTS),
+    ])
+
+    assert JournalCommitter(journal_dir).drain(final=True) == 2
+    with db.get_db_session() as session:
+        assert session.query(db.Paper).count() == 2
+    assert db.load_processed_option_keys() == ["disease:diabetes"]
+
+
+def test_partial_option_done_is_not_processed(journal_dir, option):
+    _write(journal_dir, [
+        extraction_record(option, PaperCandidate(title="Cut", url="", doi="10.1/a"), NUTRIENTS),
+        option_done_record(option, {}, completed=False),
+    ])
+
+    JournalCommitter(journal_dir).drain(final=True)
+    assert db.load_processed_option_keys() == []
+
+
+def test_drain_past_orphan_terminates_and_applies_each_option_once(journal_dir, option):
+    orphan = {**option, "option_id": "obesity", "option_label": "비만"}
+    completed = [{**option, "option_id": f"option-{i}", "option_label": f"옵션 {i}"} for i in range(5)]
+    records = [extraction_record(orphan, PaperCandidate(title="Orphan", url=""), NUTRIENTS)]
+    for opt in completed:
+        # DOI 없는 논문: 다시 반영해도 행이 늘지 않아야 한다
+        records += [extraction_record(opt, PaperCandidate(title="No DOI", url=""), NUTRIENTS), option_done_record(opt, {})]
+    _write(journal_dir, records)
+
+    committer = JournalCommitter(journal_dir, max_options=2)
+    assert committer.drain() == 5
+    assert committer.drain() == 0
+    with db.get_db_session() as session:
+        assert session.query(db.Paper).count() == 5
+        assert session.query(db.Nutrient).count() == 5
+
+    assert committer.drain(final=True) == 1
+    assert committer.drain(final=True) == 0
+    assert JournalCommitter(journal_dir).drain(from_start=True, final=True) == 6
+    with db.get_db_session() as session:
+        assert session.query(db.Paper).count() == 6
+        assert session.query(db.Nutrient).count() == 6
+    assert sorted(db.load_processed_option_keys()) == sorted(f"disease:option-{i}" for i in range(5))
@@ -0,0 +1,117 @@
+"""migrations.py: baseline 스키마 DB를 최신 스키마로 올리기."""
+
+import pytest
+from sqlalchemy import JSON, Column, ForeignKey, Integer, MetaData, String, Table, Text, create_engine, inspect, select
+
+from nutri_pipeline import migrations
+from nutri_pipeline.models import Base, Nutrient, Paper, SurveyOption
+
+# 마이그레이션 도입 전 스키마 (option_id 단독 unique, papers.question_id 없음)
+baseline = MetaData()
+Table(
+    "survey_options",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("question_id", String(100), nullable=False),
+    Column("question_label", String(200), nullable=False),
+    Column("option_id", String(100), unique=True, index=True, nullable=False),
+    Column("option_label", String(200), nullable=False),
+)
+Table(
+    "papers",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("option_id", String(100), ForeignKey("survey_options.option_id"), index=True, nullable=False),
+    Column("title", String(500), nullable=False),
+    Column("url", String(1000)),
+    Column("source", String(100), nullable=False),
+    Column("doi", String(200), unique=True, index=True),
+    Column("abstract", Text),
+    Column("raw_metadata", JSON),
+)
+Table(
+    "nutrients",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("paper_id", Integer, ForeignKey("papers.id"), index=True, nullable=False),
+    Column("name", String(200), nullable=False),
+    Column("type", String(20), nullable=False),
+    Column("extra_info", JSON),
+)
+
+
+@pytest.fixture
+def baseline_engine(database_url):
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    migrations.schema_migrations.drop(engine, checkfirst=True)
+    baseline.drop_all(engine)
+    baseline.create_all(engine)
+    with engine.begin() as conn:
+        tables = baseline.tables
+        conn.execute(tables["survey_options"].insert(), [
+            {"question_id": "disease", "question_label": "질환", "option_id": "diabetes", "option_label": "당뇨"},
+            {"question_id": "grain", "question_label": "곡물", "option_id": "brown_rice", "option_label": "현미"},
+        ])
+        conn.execute(tables["papers"].insert(), [
+            {"option_id": "diabetes", "title": "Fiber and HbA1c", "source": "pubmed", "doi": "10.1/a",
+             "raw_metadata": {"year": 2021}},
+            {"option_id": "brown_rice", "title": "Brown rice magnesium", "source": "openalex", "doi": None,
+             "raw_metadata": None},
+        ])
+        conn.execute(tables["nutrients"].insert(), [{"paper_id": 1, "name": "fiber", "type": "good"}])
+    yield engine
+    Base.metadata.drop_all(engine)
+    migrations.schema_migrations.drop(engine, checkfirst=True)
+    engine.dispose()
+
+
+def test_upgrade_rekeys_baseline_schema(baseline_engine):
+    applied = migrations.upgrade(baseline_engine)
+
+    assert applied == [m.version for m in migrations.MIGRATIONS]
+    migrations.check_schema(baseline_engine)
+    with baseline_engine.connect() as conn:
+        papers = conn.execute(select(Paper.doi, Paper.question_id, Paper.option_id, Paper.year).order_by(Paper.id)).all()
+        assert [tuple(row) for row in papers] == [
+            ("10.1/a", "disease", "diabetes", 2021),
+            (None, "grain", "brown_rice", None),
+        ]
+        assert conn.execute(select(Nutrient.paper_id, Nutrient.name)).one() == (1, "fiber")
+        # 이전 실행에서 저장된 옵션은 처리 완료로 이어진다
+        assert all(conn.execute(select(SurveyOption.completed_at)).scalars())
+        assert len(conn.execute(select(SurveyOption.id)).all()) == 2
+
+
+def test_upgrade_allows_same_option_id_in_other_question(baseline_engine):
+    migrations.upgrade(baseline_engine)
+
+    with baseline_engine.begin() as conn:
+        conn.execute(SurveyOption.__table__.insert().values(
+            question_id="grain", question_label="곡물", option_id="diabetes", option_label="당뇨식",
+        ))
+        conn.execute(Paper.__table__.insert().values(
+            question_id="grain", option_id="diabetes", title="Diabetic diet grains", source="pubmed",
+        ))
+
+
+def test_upgrade_is_noop_when_up_to_date(engine):
+    migrations.upgrade(engine)
+    assert migrations.upgrade(engine) == []
+
+
+def test_check_schema_flags_retired_paper_indexes(engine):
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE INDEX ix_papers_option_doi ON papers (option_id, doi)")
+
+    with pytest.raises(migrations.SchemaDriftError, match="ix_papers_option_doi"):
+        migrations.check_schema(engine)
+
+
+def test_upgrade_replaces_option_indexes(baseline_engine):
+    migrations.upgrade(baseline_engine)
+
+    indexes = {index["name"]: index["column_names"] for index in inspect(baseline_engine).get_indexes("papers")}
+    assert indexes["ix_papers_question_option_doi"] == ["question_id", "option_id", "doi"]
+    assert "ix_papers_question_option" not in indexes and "ix_papers_option_doi" not in indexes
@@ -0,0 +1,76 @@
+"""nutrient_extractor.py: 사전 추출 신뢰도와 cascade 승격."""
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from nutri_pipeline.nutrient_extractor import NutrientExtractor, NutrientList, _unpack_output, lexicon_extract
+from nutri_pipeline.prompt_budget import count_tokens
+
+QUANTIFIED = "Dietary fiber intake of 5 g/day reduced HbA1c."
+UNQUANTIFIED = "Dietary fiber improved glycemic control."
+AMBIGUOUS = "Fiber did not improve glycemic control."
+
+
+@pytest.mark.parametrize(
+    "abstract, confidence",
+    [(QUANTIFIED, 0.85), (UNQUANTIFIED, 0.6), (AMBIGUOUS, 0.5)],
+)
+def test_lexicon_confidence_requires_quantity_and_no_ambiguity(abstract, confidence):
+    (evidence,) = lexicon_extract("Whole grain rice", abstract).evidence
+    assert (evidence.name, evidence.confidence) == ("fiber", confidence)
+
+
+@pytest.mark.parametrize("abstract, accepted", [(QUANTIFIED, True), (UNQUANTIFIED, False), (AMBIGUOUS, False)])
+def test_lexicon_cascade_accepts_only_quantity_backed_hits(monkeypatch, abstract, accepted):
+    monkeypatch.setattr("nutri_pipeline.nutrient_extractor.CASCADE_FAST_MODEL", "lexicon")
+    extractor = NutrientExtractor(backend="stub", cascade=True)
+
+    result = extractor._fast_extract("Whole grain rice", abstract, abstract)
+
+    assert (result is not None) == accepted
+    assert extractor.tiers["fast"].accepted == int(accepted)
+
+
+@pytest.fixture
+def extractor():
+    return NutrientExtractor(backend="stub")
+
+
+PARSED = NutrientList(good_nutrients=["fiber"], bad_nutrients=[])
+INPUTS = {"title": "Whole grain rice", "abstract": QUANTIFIED}
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        AIMessage(content="", usage_metadata={"input_tokens": 412, "output_tokens": 57, "total_tokens": 469}),
+        AIMessage(content="", response_metadata={"token_usage": {"prompt_tokens": 412, "completion_tokens": 57}}),
+    ],
+)
+def test_unpack_output_uses_response_token_usage(extractor, raw):
+    output = {"raw": raw, "parsed": PARSED, "parsing_error": None}
+    assert _unpack_output(extractor.chain, INPUTS, output) == (PARSED, 412, 57)
+
+
+def test_unpack_output_counts_full_prompt_without_usage(extractor):
+    result, input_tokens, output_tokens = _unpack_output(extractor.chain, INPUTS, PARSED)
+
+    assert result is PARSED
+    # 제목+초록만이 아니라 시스템/사용자 템플릿까지 센다
+    messages = extractor.prompt.format_messages(**INPUTS)
+    assert input_tokens == sum(count_tokens(str(m.content)) for m in messages)
+    assert input_tokens > count_tokens(INPUTS["title"]) + count_tokens(QUANTIFIED)
+    assert output_tokens == count_tokens(PARSED.model_dump_json())
+
+
+def test_unpack_output_raises_parsing_error(extractor):
+    error = ValueError("bad json")
+    with pytest.raises(ValueError):
+        _unpack_output(extractor.chain, INPUTS, {"raw": AIMessage(content="{"), "parsed": None, "parsing_error": error})
+
+
+def test_usage_prices_input_and_output_separately(extractor):
+    stats = extractor.tiers["large"]
+    stats.input_tokens, stats.output_tokens = 1000, 1000
+    assert stats.cost == pytest.approx(stats.cost_per_1k_tokens + stats.output_cost_per_1k_tokens)
+    assert extractor.usage() == (2000, stats.cost)
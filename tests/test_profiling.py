@@ -0,0 +1,45 @@
+"""profiling.py와 pipeline의 프로파일러 시작/정리."""
+
+import tracemalloc
+
+import pytest
+
+from nutri_pipeline import pipeline
+from nutri_pipeline.profiling import Profiler
+
+
+@pytest.mark.parametrize("already_tracing", [False, True])
+def test_stop_only_stops_tracemalloc_it_started(tmp_path, already_tracing):
+    if already_tracing:
+        tracemalloc.start()
+    try:
+        profiler = Profiler(tmp_path / "run", trace_memory=True)
+        profiler.start()
+        assert tracemalloc.is_tracing()
+        profiler.stop()
+
+        assert tracemalloc.is_tracing() == already_tracing
+        assert (tmp_path / "run" / "summary.txt").exists()
+    finally:
+        tracemalloc.stop()
+
+
+def test_profiler_stops_when_committer_recovery_fails(tmp_path, monkeypatch):
+    profiler = Profiler(tmp_path / "run", trace_memory=False)
+
+    def start_profiler():
+        profiler.start()
+        return profiler
+
+    def failing_committer():
+        raise RuntimeError("journal drain failed")
+
+    monkeypatch.setattr(pipeline, "init_db", lambda: None)
+    monkeypatch.setattr(pipeline, "_start_profiler", start_profiler)
+    monkeypatch.setattr(pipeline, "_start_committer", failing_committer)
+
+    with pytest.raises(RuntimeError):
+        pipeline.run_full_pipeline(profile=True)
+
+    assert not profiler._thread.is_alive()
+    assert (tmp_path / "run" / "summary.txt").exists()
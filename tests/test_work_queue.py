@@ -0,0 +1,49 @@
+"""work_queue.py: 재검색 시 저장 작업 등록과 옵션 단위 저장."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from nutri_pipeline import db, paper_search, work_queue
+from nutri_pipeline.paper_search import PaperCandidate
+from nutri_pipeline.work_queue import HANDLERS, WorkQueue
+
+NUTRIENTS = {"good_nutrients": ["fiber"], "bad_nutrients": [], "details": {}}
+
+
+@pytest.fixture
+def queue(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    return WorkQueue(tmp_path / "queue.sqlite3")
+
+
+def _run(queue, kind):
+    """kind 작업 1개를 처리하고 결과 반환 (추출은 고정 결과로 대체)."""
+    job = queue.claim("test", kinds=[kind])
+    assert job is not None
+    result = NUTRIENTS if kind == "extract_paper" else HANDLERS[kind](queue, job)
+    queue.complete(job.id, "test", result)
+    return job
+
+
+def test_research_while_persist_pending_keeps_new_extract_keys(queue, option, monkeypatch):
+    searches = iter([
+        [PaperCandidate(title="A", url="", doi="10.1/a")],
+        [PaperCandidate(title="A", url="", doi="10.1/a"), PaperCandidate(title="B", url="", doi="10.1/b")],
+    ])
+    monkeypatch.setattr(paper_search, "search_papers_for_option", lambda option: next(searches))
+    monkeypatch.setattr(work_queue, "QUEUE_POLL_INTERVAL", 0.0)
+
+    queue.enqueue("search_option", {"option": option}, dedup_key="search:disease:diabetes")
+    _run(queue, "search_option")
+    # 첫 저장 작업이 대기 중인 상태에서 같은 옵션을 다시 검색
+    queue.enqueue("search_option", {"option": option}, dedup_key="search:disease:diabetes")
+    _run(queue, "search_option")
+
+    assert queue.stats()["persist_batch"] == {"queued": 2}
+    _run(queue, "extract_paper")
+    _run(queue, "extract_paper")
+
+    persisted = [_run(queue, "persist_batch").payload["extract_keys"] for _ in range(2)]
+    assert sorted(map(len, persisted)) == [1, 2]
+    with db.get_db_session() as session:
+        assert sorted(p.title for p in session.query(db.Paper)) == ["A", "B"]